@@ -1,9 +1,15 @@
 # backend/favorites/admin.py
 from django.contrib import admin
-from .models import Favorite
+from .models import Favorite, Notification
 
 @admin.register(Favorite)
 class FavoriteAdmin(admin.ModelAdmin):
     list_display = ('user', 'city_name',)
     search_fields = ('user__username', 'city_name',) # Allows searching by username and city
-    list_filter = ('user',) # Allows filtering by user
\ No newline at end of file
+    list_filter = ('user',) # Allows filtering by user
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ('user', 'kind', 'title', 'created_at', 'read_at',)
+    search_fields = ('user__username', 'title',)
+    list_filter = ('kind',)
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class FavoritesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "favorites"
+
+    def ready(self):
+        # Keeps the subscriber index current and delivers alert notifications
+        from . import signals  # noqa: F401
@@ -14,4 +14,36 @@ class Favorite(models.Model):
         ordering = ['city_name'] # Order favorites alphabetically by city name
 
     def __str__(self):
-        return f"{self.city_name} (User: {self.user.username})"
\ No newline at end of file
+        return f"{self.city_name} (User: {self.user.username})"
+
+class Notification(models.Model):
+    """A message for one user, e.g. the weather alerts issued for their favorite districts."""
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='notifications')
+    kind = models.CharField(max_length=32, default='alert')
+    title = models.CharField(max_length=255)
+    # Structured details, e.g. {"alerts": [{"district": ..., "alert": {...}}]}
+    payload = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+    read_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [models.Index(fields=['user', '-created_at'])]
+
+    def __str__(self):
+        return f"{self.title} (User: {self.user_id})"
+
+
+class NotifiedAlert(models.Model):
+    """An alert a user has already been notified about, so it is never delivered to them twice."""
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='notified_alerts')
+    # forecast.alerts.alert_id of the alert
+    alert_id = models.CharField(max_length=500)
+    notified_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('user', 'alert_id',)
+        indexes = [models.Index(fields=['notified_at'])]
+
+    def __str__(self):
+        return f"{self.alert_id} (User: {self.user_id})"
@@ -1,9 +1,15 @@
 # backend/favorites/serializers.py
 from rest_framework import serializers
-from .models import Favorite
+from .models import Favorite, Notification
 
 class FavoriteSerializer(serializers.ModelSerializer):
     class Meta:
         model = Favorite
         fields = ['id', 'user', 'city_name'] # 'id' is good for frontend reference
-        read_only_fields = ['user'] # User is set automatically by the view
\ No newline at end of file
+        read_only_fields = ['user'] # User is set automatically by the view
+
+class NotificationSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Notification
+        fields = ['id', 'kind', 'title', 'payload', 'created_at', 'read_at']
+        read_only_fields = fields
@@ -0,0 +1,22 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from forecast.alerts import alerts_issued
+
+from .models import Favorite
+from .subscriptions import deliver_alerts, subscriber_index
+
+
+@receiver(post_save, sender=Favorite)
+def index_favorite(sender, instance, **kwargs):
+    subscriber_index.add(instance.city_name, instance.user_id)
+
+
+@receiver(post_delete, sender=Favorite)
+def unindex_favorite(sender, instance, **kwargs):
+    subscriber_index.remove(instance.city_name, instance.user_id)
+
+
+@receiver(alerts_issued)
+def notify_subscribers(sender, events, **kwargs):
+    deliver_alerts(events)
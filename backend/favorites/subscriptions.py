@@ -0,0 +1,152 @@
+import datetime
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from django.core.cache import cache as shared_cache
+from django.utils import timezone
+
+from forecast.alerts import alert_id
+from forecast.buffered_writer import BufferedWriter
+
+from .models import Favorite, Notification, NotifiedAlert
+
+logger = logging.getLogger(__name__)
+
+# Bumped on every favorite save/delete, in whichever process it happens
+SUBSCRIBER_INDEX_VERSION_KEY = 'favorites:subscriber_index_version'
+
+# Weatherbit alerts last days at most; older delivery records are dropped
+NOTIFIED_ALERT_RETENTION_DAYS = 30
+
+
+def _normalize(city_name):
+    return city_name.strip().lower()
+
+
+class SubscriberIndex:
+    """
+    Inverted index from a favorited city to the IDs of the users who saved it.
+
+    Built with one scan of the favorites table on first use, then kept
+    current by the Favorite save/delete signals, so looking up a district's
+    subscribers costs a set copy. Those signals fire in the web workers
+    while alerts are delivered by the poll_alerts process, so each change
+    also bumps a version in the shared cache; an index built under an older
+    version is rebuilt on its next lookup (and every `max_age` seconds
+    regardless).
+    """
+
+    def __init__(self, max_age=15 * 60):
+        self.max_age = max_age
+        self._users = None
+        self._built_at = 0.0
+        self._version = None
+        self._lock = threading.Lock()
+
+    def _is_current(self, version):
+        return (self._users is not None and self._version == version
+                and time.time() - self._built_at < self.max_age)
+
+    def _ensure_built(self):
+        version = shared_cache.get(SUBSCRIBER_INDEX_VERSION_KEY, 0)
+        if self._is_current(version):
+            return
+        with self._lock:
+            if self._is_current(version):
+                return
+            users = defaultdict(set)
+            for city_name, user_id in Favorite.objects.values_list('city_name', 'user_id').iterator():
+                users[_normalize(city_name)].add(user_id)
+            self._users = users
+            self._built_at = time.time()
+            self._version = version
+
+    def _changed(self):
+        # Tell every other process's index that the favorites table changed
+        if shared_cache.add(SUBSCRIBER_INDEX_VERSION_KEY, 1, None):
+            version = 1
+        else:
+            version = shared_cache.incr(SUBSCRIBER_INDEX_VERSION_KEY)
+        with self._lock:
+            # This index already has the change unless it also missed another one
+            if self._version == version - 1:
+                self._version = version
+
+    def subscribers(self, city_name):
+        self._ensure_built()
+        with self._lock:
+            return set(self._users.get(_normalize(city_name), ()))
+
+    def add(self, city_name, user_id):
+        with self._lock:
+            if self._users is not None:
+                self._users[_normalize(city_name)].add(user_id)
+        self._changed()
+
+    def remove(self, city_name, user_id):
+        with self._lock:
+            if self._users is not None:
+                self._users[_normalize(city_name)].discard(user_id)
+        self._changed()
+
+
+subscriber_index = SubscriberIndex()
+
+notification_writer = BufferedWriter(
+    lambda notifications: Notification.objects.bulk_create(notifications),
+    name='notification-writer',
+)
+
+
+def _alert_title(events):
+    if len(events) == 1:
+        event = events[0]
+        return f"{event['alert'].get('title') or 'Weather alert'} ({event['district']})"
+    districts = sorted({event['district'] for event in events})
+    return f"{len(events)} new weather alerts for {', '.join(districts)}"
+
+
+def deliver_alerts(events):
+    """
+    Queue one Notification per subscribed user for a batch of alert events
+    ({"district", "alert"} dicts). A user who follows several affected
+    districts gets a single notification listing all of them, and is never
+    notified twice about the same alert (see NotifiedAlert).
+    """
+    per_user = defaultdict(list)
+    for event in events:
+        for user_id in subscriber_index.subscribers(event['district']):
+            per_user[user_id].append(event)
+    if not per_user:
+        return 0
+
+    alert_ids = {alert_id(event['alert']) for event in events}
+    notified = set(NotifiedAlert.objects.filter(
+        user_id__in=list(per_user), alert_id__in=alert_ids,
+    ).values_list('user_id', 'alert_id'))
+    fresh = defaultdict(list)
+    for user_id, user_events in per_user.items():
+        for event in user_events:
+            if (user_id, alert_id(event['alert'])) not in notified:
+                fresh[user_id].append(event)
+    per_user = fresh
+    NotifiedAlert.objects.bulk_create([
+        NotifiedAlert(user_id=user_id, alert_id=alert_id(e['alert']))
+        for user_id, user_events in per_user.items() for e in user_events
+    ], ignore_conflicts=True)
+    NotifiedAlert.objects.filter(
+        notified_at__lt=timezone.now() - datetime.timedelta(days=NOTIFIED_ALERT_RETENTION_DAYS),
+    ).delete()
+
+    for user_id, user_events in per_user.items():
+        notification_writer.submit(Notification(
+            user_id=user_id,
+            kind='alert',
+            title=_alert_title(user_events)[:255],
+            payload={"alerts": [{"district": e['district'], "alert": e['alert']} for e in user_events]},
+        ))
+    if per_user:
+        logger.info(f"Queued alert notifications for {len(per_user)} users")
+    return len(per_user)
@@ -1,8 +1,10 @@
 # backend/favorites/urls.py
 from django.urls import path
-from .views import FavoriteListCreateView, FavoriteDestroyView
+from .views import FavoriteListCreateView, FavoriteDestroyView, NotificationListView, NotificationMarkReadView
 
 urlpatterns = [
     path('favorites/', FavoriteListCreateView.as_view(), name='favorite-list-create'),
     path('favorites/<int:pk>/', FavoriteDestroyView.as_view(), name='favorite-destroy'),
+    path('notifications/', NotificationListView.as_view(), name='notification-list'),
+    path('notifications/read/', NotificationMarkReadView.as_view(), name='notification-mark-read'),
 ]
\ No newline at end of file
@@ -1,7 +1,9 @@
 # backend/favorites/views.py
-from rest_framework import generics, permissions
-from .models import Favorite
-from .serializers import FavoriteSerializer
+from django.utils import timezone
+from rest_framework import generics, permissions, status
+from rest_framework.response import Response
+from .models import Favorite, Notification
+from .serializers import FavoriteSerializer, NotificationSerializer
 
 class FavoriteListCreateView(generics.ListCreateAPIView):
     serializer_class = FavoriteSerializer
@@ -27,4 +29,36 @@ class FavoriteDestroyView(generics.DestroyAPIView):
         """
         Ensures a user can only delete their own favorites.
         """
-        return Favorite.objects.filter(user=self.request.user)
\ No newline at end of file
+        return Favorite.objects.filter(user=self.request.user)
+
+class NotificationListView(generics.ListAPIView):
+    serializer_class = NotificationSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        """
+        The authenticated user's notifications, newest first (`?unread=1`
+        for only the unread ones).
+        """
+        notifications = Notification.objects.filter(user=self.request.user)
+        if self.request.query_params.get('unread'):
+            notifications = notifications.filter(read_at__isnull=True)
+        return notifications[:100]
+
+class NotificationMarkReadView(generics.GenericAPIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        """
+        Marks the given notification `ids` (or all of them, when omitted) as read.
+        """
+        ids = request.data.get('ids')
+        if ids is not None and (
+            not isinstance(ids, list) or not all(isinstance(i, int) and not isinstance(i, bool) for i in ids)
+        ):
+            return Response({"error": "ids must be a list of notification ids"}, status=status.HTTP_400_BAD_REQUEST)
+        notifications = Notification.objects.filter(user=request.user, read_at__isnull=True)
+        if ids:
+            notifications = notifications.filter(id__in=ids)
+        updated = notifications.update(read_at=timezone.now())
+        return Response({"marked_read": updated})
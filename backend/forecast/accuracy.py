@@ -0,0 +1,43 @@
+import json
+
+from .districts import pipeline_district_name
+from .edge_cache import purge
+from .ml_files import RefreshingArtifact
+
+ACCURACY_FILE = "accuracy_summary.json"
+
+# Rolling MAE (°C) at or below which a prediction is labelled high / medium
+# confidence; anything worse is low
+CONFIDENCE_LEVELS = [(1.5, 'high'), (3.0, 'medium')]
+
+
+accuracy_summary = RefreshingArtifact(
+    ACCURACY_FILE, json.loads, max_age=6 * 3600,
+    # Confidence labels are part of the prediction responses
+    on_change=lambda: purge(['prediction', 'offline_bundle']),
+)
+
+
+def district_accuracy(district):
+    """Accuracy aggregates for `district` from ml/steps/09_track_accuracy.py, or None."""
+    summary = accuracy_summary.get()
+    if not summary:
+        return None
+    return summary.get('districts', {}).get(pipeline_district_name(district))
+
+
+def prediction_confidence(district):
+    """
+    Confidence indicator for a district's predictions, based on the rolling
+    30-day error, e.g. {"level": "high", "mae": 0.9, "window_days": 30}.
+    """
+    accuracy = district_accuracy(district)
+    rolling = accuracy.get('rolling_30d') if accuracy else None
+    if not rolling or rolling.get('mae') is None:
+        return None
+    level = next((name for limit, name in CONFIDENCE_LEVELS if rolling['mae'] <= limit), 'low')
+    return {
+        "level": level,
+        "mae": rolling['mae'],
+        "window_days": accuracy_summary.get().get('rolling_days', 30),
+    }
@@ -0,0 +1,244 @@
+import asyncio
+import datetime
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.core.cache import cache as shared_cache
+from django.dispatch import Signal
+
+from .districts import DISTRICT_GEOLOCATION_MAP
+from .edge_cache import data_tag, purge
+from .tiered_cache import tiered_cache
+
+logger = logging.getLogger(__name__)
+
+# Latest Weatherbit alerts per district, written by the poller and the alert view
+ALERTS_CACHE_TIMEOUT = 3600
+alerts_cache = tiered_cache.namespace('district_alerts', ALERTS_CACHE_TIMEOUT, local_timeout=60)
+ALERTS_URL = "https://api.weatherbit.io/v2.0/alerts"
+ALERTS_TIMEOUT = 10
+
+# Sent once per poll with events=[{"type": "new", "district", "alert", "id"}, ...]
+alerts_issued = Signal()
+
+
+def remember_alerts(district, alerts):
+    if district not in DISTRICT_GEOLOCATION_MAP:
+        return
+    alerts = alerts or []
+    previous = alerts_cache.get(district)
+    alerts_cache.set(district, alerts)
+    if previous is not None and previous != alerts:
+        purge([data_tag('alerts', district), 'offline_bundle'])
+
+
+def cached_alerts():
+    """{district: [alert, ...]} for every district with a recent lookup."""
+    return alerts_cache.get_many(DISTRICT_GEOLOCATION_MAP)
+
+
+def fetch_alerts(lat, lon, api_key):
+    """Active Weatherbit alerts for (lat, lon). Raises requests.RequestException."""
+    response = requests.get(
+        ALERTS_URL, params={"lat": lat, "lon": lon, "key": api_key}, timeout=ALERTS_TIMEOUT,
+    )
+    response.raise_for_status()
+    return response.json().get('alerts', [])
+
+
+def alert_id(alert):
+    return alert.get('uri') or f"{alert.get('title')}|{alert.get('effective_utc')}"
+
+
+def _is_expired(alert, now):
+    expires = alert.get('expires_utc')
+    try:
+        return expires is not None and datetime.datetime.fromisoformat(expires) <= now
+    except ValueError:
+        return False
+
+
+def diff_alerts(previous, current, now=None):
+    """
+    (active, new, expired) for two alert lists of the same district. Alerts
+    past their expires_utc count as expired even if upstream still lists them.
+    """
+    now = now or datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+    current = [alert for alert in current if not _is_expired(alert, now)]
+    previous_ids = {alert_id(alert) for alert in previous}
+    current_ids = {alert_id(alert) for alert in current}
+    new = [alert for alert in current if alert_id(alert) not in previous_ids]
+    expired = [alert for alert in previous if alert_id(alert) not in current_ids]
+    return current, new, expired
+
+
+# Id of the newest logged alert event, advanced by the poller after storing it
+LAST_EVENT_ID_KEY = 'alert_events:last_id'
+
+
+class AlertEventLog:
+    """
+    Alert events numbered in the shared cache, so the single poll_alerts
+    process can hand them to the streams served by every web worker.
+
+    Only the poller appends, so ids are allocated without a race: events are
+    stored first and the last id is advanced after them. The last `history`
+    events are kept, enough for a reconnecting client to resume.
+    """
+
+    def __init__(self, history=200, timeout=24 * 3600):
+        self.history = history
+        # Events never change once stored, so every tier may keep them
+        self.events = tiered_cache.namespace('alert_events', timeout)
+
+    def last_id(self):
+        # Read from the shared cache every time: the relays poll it for changes
+        return shared_cache.get(LAST_EVENT_ID_KEY, 0)
+
+    def append(self, events):
+        """Number and store `events`; returns them with their ids."""
+        last_id = self.last_id()
+        events = [{**event, 'id': last_id + i} for i, event in enumerate(events, 1)]
+        if events:
+            self.events.set_many({event['id']: event for event in events})
+            shared_cache.set(LAST_EVENT_ID_KEY, events[-1]['id'], None)
+        return events
+
+    def since(self, last_id):
+        """Stored events after `last_id`, or None if it is no longer kept."""
+        current = self.last_id()
+        if last_id > current or current - last_id > self.history:
+            return None
+        found = self.events.get_many(range(last_id + 1, current + 1))
+        return [found[event_id] for event_id in sorted(found)]
+
+
+class AlertBroadcaster:
+    """
+    Fans the alert event log out to every connected stream in this process.
+
+    Each subscriber is an asyncio queue on the event loop that owns it. While
+    anyone is subscribed, a relay thread reads new events from the shared log
+    every `relay_interval` seconds and hands them to every loop with
+    call_soon_threadsafe, so one cache read serves all of a worker's streams.
+    """
+
+    def __init__(self, log, relay_interval=2, max_queued=100):
+        self.log = log
+        self.relay_interval = relay_interval
+        self.max_queued = max_queued
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._relay = None
+
+    def subscribe(self):
+        queue = asyncio.Queue(maxsize=self.max_queued)
+        with self._lock:
+            self._subscribers.add((asyncio.get_running_loop(), queue))
+            if self._relay is None:
+                self._relay = threading.Thread(target=self._run, name='alert-relay', daemon=True)
+                self._relay.start()
+        return queue
+
+    def unsubscribe(self, queue):
+        with self._lock:
+            self._subscribers = {(loop, q) for loop, q in self._subscribers if q is not queue}
+
+    def events_since(self, last_id):
+        """Logged events after `last_id`, or None if it is no longer kept."""
+        return self.log.since(last_id)
+
+    def _run(self):
+        last_id = self.log.last_id()
+        while True:
+            time.sleep(self.relay_interval)
+            with self._lock:
+                subscribers = list(self._subscribers)
+            try:
+                events = self.log.since(last_id) if subscribers else None
+            except Exception as e:
+                logger.error(f"Alert relay failed: {e}")
+                continue
+            if events is None:
+                # Nobody listening, or too far behind to catch up: skip ahead
+                last_id = self.log.last_id()
+                continue
+            for event in events:
+                last_id = event['id']
+                self._publish(subscribers, event)
+
+    def _publish(self, subscribers, event):
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._offer, queue, event)
+            except RuntimeError:
+                # The subscriber's event loop has shut down
+                self.unsubscribe(queue)
+
+    @staticmethod
+    def _offer(queue, event):
+        # A client that stops reading loses events instead of holding memory
+        if not queue.full():
+            queue.put_nowait(event)
+
+
+class AlertPoller:
+    """
+    Polls Weatherbit for every district, stores the result with
+    remember_alerts, appends new and expired alerts to the event log and
+    sends alerts_issued for the new ones. Run it in exactly one process
+    (the poll_alerts command); the previous poll's alerts are kept in the
+    shared cache, so a restart does not report every active alert again.
+    """
+
+    def __init__(self, log, max_workers=8):
+        self.log = log
+        self.max_workers = max_workers
+        self.state = tiered_cache.namespace('alert_poller_state', timeout=None)
+
+    def poll_once(self):
+        api_key = os.getenv('WEATHERBIT_API_KEY')
+        if not api_key:
+            logger.error("Weatherbit API key not configured; alerts not polled")
+            return 0
+        previous = self.state.get_many(DISTRICT_GEOLOCATION_MAP)
+        if not previous:
+            # First poll ever: start from what the alert view has already seen
+            previous = cached_alerts()
+
+        def fetch(district):
+            geo = DISTRICT_GEOLOCATION_MAP[district]
+            try:
+                return district, fetch_alerts(geo['latitude'], geo['longitude'], api_key)
+            except requests.RequestException as e:
+                logger.warning(f"Could not fetch alerts for {district}: {e}")
+                return district, None
+
+        changes, state = [], {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            for district, alerts in pool.map(fetch, DISTRICT_GEOLOCATION_MAP):
+                if alerts is None:
+                    continue
+                active, new, expired = diff_alerts(previous.get(district, []), alerts)
+                state[district] = active
+                remember_alerts(district, active)
+                changes += [{'type': 'new', 'district': district, 'alert': alert} for alert in new]
+                changes += [{'type': 'expired', 'district': district, 'alert': alert} for alert in expired]
+        if state:
+            self.state.set_many(state)
+
+        events = self.log.append(changes)
+        issued = [event for event in events if event['type'] == 'new']
+        if issued:
+            alerts_issued.send(sender=self.__class__, events=issued)
+        logger.info(f"Alert poll published {len(events)} changes")
+        return len(events)
+
+
+alert_event_log = AlertEventLog()
+alert_broadcaster = AlertBroadcaster(alert_event_log)
+alert_poller = AlertPoller(alert_event_log)
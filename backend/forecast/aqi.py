@@ -0,0 +1,147 @@
+import numpy as np
+
+# US EPA breakpoint tables: (C_lo, C_hi, I_lo, I_hi) in each pollutant's
+# reporting unit. Rows are sorted, so the row for a concentration is the
+# first one whose C_hi is >= it, found with searchsorted.
+BREAKPOINTS = {
+    # µg/m³, 24-hour
+    'pm2_5': [
+        (0.0, 12.0, 0, 50),
+        (12.1, 35.4, 51, 100),
+        (35.5, 55.4, 101, 150),
+        (55.5, 150.4, 151, 200),
+        (150.5, 250.4, 201, 300),
+        (250.5, 350.4, 301, 400),
+        (350.5, 500.4, 401, 500),
+    ],
+    # µg/m³, 24-hour
+    'pm10': [
+        (0, 54, 0, 50),
+        (55, 154, 51, 100),
+        (155, 254, 101, 150),
+        (255, 354, 151, 200),
+        (355, 424, 201, 300),
+        (425, 504, 301, 400),
+        (505, 604, 401, 500),
+    ],
+    # ppm, 8-hour up to 300, 1-hour above
+    'o3': [
+        (0.000, 0.054, 0, 50),
+        (0.055, 0.070, 51, 100),
+        (0.071, 0.085, 101, 150),
+        (0.086, 0.105, 151, 200),
+        (0.106, 0.200, 201, 300),
+        (0.405, 0.504, 301, 400),
+        (0.505, 0.604, 401, 500),
+    ],
+    # ppb, 1-hour
+    'no2': [
+        (0, 53, 0, 50),
+        (54, 100, 51, 100),
+        (101, 360, 101, 150),
+        (361, 649, 151, 200),
+        (650, 1249, 201, 300),
+        (1250, 1649, 301, 400),
+        (1650, 2049, 401, 500),
+    ],
+    # ppb, 1-hour
+    'so2': [
+        (0, 35, 0, 50),
+        (36, 75, 51, 100),
+        (76, 185, 101, 150),
+        (186, 304, 151, 200),
+        (305, 604, 201, 300),
+        (605, 804, 301, 400),
+        (805, 1004, 401, 500),
+    ],
+    # ppm, 8-hour
+    'co': [
+        (0.0, 4.4, 0, 50),
+        (4.5, 9.4, 51, 100),
+        (9.5, 12.4, 101, 150),
+        (12.5, 15.4, 151, 200),
+        (15.5, 30.4, 201, 300),
+        (30.5, 40.4, 301, 400),
+        (40.5, 50.4, 401, 500),
+    ],
+}
+BREAKPOINT_TABLES = {name: np.array(rows, dtype=np.float64).T for name, rows in BREAKPOINTS.items()}
+
+POLLUTANTS = tuple(BREAKPOINTS)
+
+# WeatherAPI reports every pollutant in µg/m³. Gases are converted with
+# ppb = µg/m³ * 24.45 / molecular weight (25 °C, 1 atm), then scaled to
+# the table's unit.
+MOLAR_VOLUME = 24.45
+UNIT_FACTORS = {
+    'pm2_5': 1.0,
+    'pm10': 1.0,
+    'o3': MOLAR_VOLUME / 48.00 / 1000,
+    'no2': MOLAR_VOLUME / 46.01,
+    'so2': MOLAR_VOLUME / 64.07,
+    'co': MOLAR_VOLUME / 28.01 / 1000,
+}
+
+# Concentrations are truncated to the tables' precision before lookup, so
+# values between two rows (e.g. 12.05 for PM2.5) fall into the lower one
+DECIMALS = {'pm2_5': 1, 'pm10': 0, 'o3': 3, 'no2': 0, 'so2': 0, 'co': 1}
+
+
+def pollutant_aqi(pollutant, concentrations):
+    """
+    AQI sub-index for one pollutant. `concentrations` is a scalar or array
+    in µg/m³; missing or out-of-range values come back as NaN.
+    """
+    c_lo, c_hi, i_lo, i_hi = BREAKPOINT_TABLES[pollutant]
+    scale = 10.0 ** DECIMALS[pollutant]
+    values = np.asarray(concentrations, dtype=np.float64) * UNIT_FACTORS[pollutant]
+    values = np.floor(values * scale + 1e-9) / scale
+
+    row = np.searchsorted(c_hi, values, side='left')
+    valid = (values >= 0) & (row < len(c_hi))
+    row = np.minimum(row, len(c_hi) - 1)
+    # Gaps between rows (O3 between the 8-hour and 1-hour tables) clamp up
+    values = np.maximum(values, c_lo[row])
+    index = (i_hi[row] - i_lo[row]) / (c_hi[row] - c_lo[row]) * (values - c_lo[row]) + i_lo[row]
+    return np.where(valid, np.round(index), np.nan)
+
+
+def score_readings(readings):
+    """
+    Score a batch of WeatherAPI `air_quality` dicts in one pass. Returns one
+    {"aqi", "dominant_pollutant", "pollutants"} dict per reading; the overall
+    AQI is the highest pollutant sub-index.
+    """
+    readings = [reading or {} for reading in readings]
+    if not readings:
+        return []
+    concentrations = np.array([
+        [np.nan if reading.get(name) is None else reading[name] for name in POLLUTANTS]
+        for reading in readings
+    ], dtype=np.float64)
+    sub_indices = np.column_stack([
+        pollutant_aqi(name, concentrations[:, column]) for column, name in enumerate(POLLUTANTS)
+    ])
+
+    scored = ~np.isnan(sub_indices)
+    has_any = scored.any(axis=1)
+    dominant = np.argmax(np.where(scored, sub_indices, -1), axis=1)
+
+    results = []
+    for row in range(len(readings)):
+        if not has_any[row]:
+            results.append({"aqi": None, "dominant_pollutant": None, "pollutants": {}})
+            continue
+        results.append({
+            "aqi": int(sub_indices[row, dominant[row]]),
+            "dominant_pollutant": POLLUTANTS[dominant[row]],
+            "pollutants": {
+                name: int(sub_indices[row, column])
+                for column, name in enumerate(POLLUTANTS) if scored[row, column]
+            },
+        })
+    return results
+
+
+def score_reading(air_quality):
+    return score_readings([air_quality])[0]
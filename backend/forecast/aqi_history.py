@@ -0,0 +1,151 @@
+import datetime
+import logging
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import F, Max, Sum
+from django.db.models.functions import Greatest, TruncMonth
+from django.utils import timezone
+
+from .aqi import POLLUTANTS
+from .buffered_writer import BufferedWriter
+from .districts import DISTRICT_GEOLOCATION_MAP
+from .models import AQIReading, AQIRollup
+
+logger = logging.getLogger(__name__)
+
+# Readings are stored per grid cell of this size (degrees)
+CELL_SIZE = 0.1
+RESOLUTIONS = ('hour', 'day', 'month')
+
+
+def _bucket(observed_at, granularity):
+    if granularity == AQIRollup.HOUR:
+        return observed_at.replace(minute=0, second=0, microsecond=0)
+    return observed_at.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _update_rollups(readings):
+    """
+    Fold a batch of readings into the hourly and daily rollups. The batch is
+    summed in memory first, so each touched bucket costs one UPDATE.
+    """
+    deltas = defaultdict(lambda: {"count": 0, "aqi_sum": 0.0, "aqi_max": 0, "pm2_5_sum": 0.0, "pm2_5_count": 0})
+    for reading in readings:
+        for granularity in (AQIRollup.HOUR, AQIRollup.DAY):
+            delta = deltas[(reading.district, granularity, _bucket(reading.observed_at, granularity))]
+            delta["count"] += 1
+            delta["aqi_sum"] += reading.aqi
+            delta["aqi_max"] = max(delta["aqi_max"], reading.aqi)
+            if reading.pm2_5 is not None:
+                delta["pm2_5_sum"] += reading.pm2_5
+                delta["pm2_5_count"] += 1
+
+    # Make sure every bucket row exists, then increment it in place
+    AQIRollup.objects.bulk_create(
+        [AQIRollup(district=d, granularity=g, bucket=b) for d, g, b in deltas],
+        ignore_conflicts=True,
+    )
+    for (district, granularity, bucket), delta in deltas.items():
+        AQIRollup.objects.filter(district=district, granularity=granularity, bucket=bucket).update(
+            sample_count=F('sample_count') + delta["count"],
+            aqi_sum=F('aqi_sum') + delta["aqi_sum"],
+            aqi_max=Greatest(F('aqi_max'), delta["aqi_max"]),
+            pm2_5_sum=F('pm2_5_sum') + delta["pm2_5_sum"],
+            pm2_5_count=F('pm2_5_count') + delta["pm2_5_count"],
+        )
+
+
+def _write_readings(readings):
+    with transaction.atomic():
+        AQIReading.objects.bulk_create(readings)
+        _update_rollups(readings)
+
+
+aqi_writer = BufferedWriter(_write_readings, name='aqi-writer')
+
+
+def record_aqi_reading(district, lat, lon, air_quality, result, observed_at=None):
+    """
+    Queue one scored reading (see aqi.score_reading) for storage. Readings
+    without a known district (see districts.district_for_point) are dropped.
+    """
+    if district not in DISTRICT_GEOLOCATION_MAP or result.get("aqi") is None:
+        return
+    aqi_writer.submit(AQIReading(
+        district=district,
+        cell_lat=round(round(float(lat) / CELL_SIZE) * CELL_SIZE, 1),
+        cell_lon=round(round(float(lon) / CELL_SIZE) * CELL_SIZE, 1),
+        observed_at=observed_at or timezone.now().replace(microsecond=0),
+        aqi=result["aqi"],
+        dominant_pollutant=result["dominant_pollutant"],
+        **{name: air_quality.get(name) for name in POLLUTANTS},
+    ))
+
+
+def recent_aqi_reading(district, max_age=datetime.timedelta(hours=1)):
+    """Latest stored reading for `district` newer than `max_age`, or None."""
+    return (
+        AQIReading.objects
+        .filter(district=district, observed_at__gte=timezone.now() - max_age)
+        .order_by('-observed_at')
+        .first()
+    )
+
+
+def choose_resolution(start, end):
+    span = end - start
+    if span <= datetime.timedelta(days=2):
+        return 'hour'
+    if span <= datetime.timedelta(days=92):
+        return 'day'
+    return 'month'
+
+
+def query_aqi_history(district, start, end, resolution):
+    """
+    AQI trend for `district` between two datetimes, read from the rollups.
+    Months are summed from the daily rollups, which is at most a few hundred
+    rows per district.
+    """
+    granularity = AQIRollup.HOUR if resolution == 'hour' else AQIRollup.DAY
+    rows = AQIRollup.objects.filter(
+        district=district, granularity=granularity, bucket__gte=start, bucket__lt=end,
+    )
+    if resolution == 'month':
+        rows = (
+            rows.annotate(period=TruncMonth('bucket'))
+            .values('period')
+            .annotate(
+                sample_count=Sum('sample_count'),
+                aqi_sum=Sum('aqi_sum'),
+                aqi_max=Max('aqi_max'),
+                pm2_5_sum=Sum('pm2_5_sum'),
+                pm2_5_count=Sum('pm2_5_count'),
+            )
+            .order_by('period')
+        )
+    else:
+        rows = rows.annotate(period=F('bucket')).values(
+            'period', 'sample_count', 'aqi_sum', 'aqi_max', 'pm2_5_sum', 'pm2_5_count',
+        ).order_by('period')
+
+    return [
+        {
+            "time": row['period'].isoformat(),
+            "avg_aqi": round(row['aqi_sum'] / row['sample_count'], 1),
+            "max_aqi": row['aqi_max'],
+            "avg_pm2_5": round(row['pm2_5_sum'] / row['pm2_5_count'], 1) if row['pm2_5_count'] else None,
+            "samples": row['sample_count'],
+        }
+        for row in rows if row['sample_count']
+    ]
+
+
+def prune_aqi_readings(days=30):
+    """Drop raw readings older than `days`; the rollups keep their trend."""
+    deleted, _ = AQIReading.objects.filter(
+        observed_at__lt=timezone.now() - datetime.timedelta(days=days),
+    ).delete()
+    logger.info(f"Pruned {deleted} AQI readings")
+    return deleted
@@ -0,0 +1,67 @@
+import atexit
+import logging
+import threading
+from collections import deque
+
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+
+class BufferedWriter:
+    """
+    Collects rows from request handlers and hands them to `flush_fn` in
+    batches on a background thread.
+
+    `submit()` only appends to an in-memory deque, so the request path never
+    waits on the database. The buffer is bounded: if the database falls
+    behind, the oldest pending rows are dropped rather than growing memory.
+    """
+
+    def __init__(self, flush_fn, name, batch_size=200, flush_interval=2.0, max_pending=10000):
+        self.flush_fn = flush_fn
+        self.name = name
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending = deque(maxlen=max_pending)
+        self._wakeup = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._thread = None
+
+    def submit(self, item):
+        self._pending.append(item)
+        self._ensure_started()
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+
+    def flush(self):
+        """Write everything currently buffered. Safe to call from any thread."""
+        with self._flush_lock:
+            while self._pending:
+                batch = []
+                while self._pending and len(batch) < self.batch_size:
+                    batch.append(self._pending.popleft())
+                try:
+                    self.flush_fn(batch)
+                except Exception as e:
+                    logger.error(f"{self.name}: failed to write batch of {len(batch)}: {e}")
+                finally:
+                    # Background threads don't get Django's request_finished cleanup
+                    close_old_connections()
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+                atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            if self._pending:
+                self.flush()
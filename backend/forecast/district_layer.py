@@ -0,0 +1,187 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from functools import lru_cache
+
+import numpy as np
+from django.conf import settings
+
+from .districts import DISTRICT_GEOLOCATION_MAP
+from .predictions import get_prediction
+from .snapshot import district_snapshot
+from .tiered_cache import tiered_cache
+
+logger = logging.getLogger(__name__)
+
+# Optional district boundaries; without it every district is a centroid point
+BOUNDARY_FILE = "nepal_districts.geojson"
+BOUNDARY_NAME_KEYS = ('DISTRICT', 'district', 'District', 'NAME', 'name')
+
+# Douglas-Peucker tolerance (degrees) per minimum map zoom level
+ZOOM_TOLERANCES = {5: 0.02, 7: 0.005, 9: 0.001}
+DEFAULT_ZOOM = 7
+
+# Latest AQI per district, written by the AQI views (other workers' writes
+# are seen here within a minute)
+AQI_CACHE_TIMEOUT = 3 * 3600
+aqi_cache = tiered_cache.namespace('district_aqi', AQI_CACHE_TIMEOUT, local_timeout=60)
+
+
+def remember_aqi(district, aqi):
+    if district in DISTRICT_GEOLOCATION_MAP and aqi is not None:
+        aqi_cache.set(district, aqi)
+
+
+def cached_aqi():
+    return aqi_cache.get_many(DISTRICT_GEOLOCATION_MAP)
+
+
+def simplify_line(points, tolerance):
+    """Douglas-Peucker on an (n, 2) array; returns the kept points."""
+    if len(points) < 3:
+        return points
+    keep = np.zeros(len(points), dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        start, end = points[first], points[last]
+        segment = end - start
+        inner = points[first + 1:last] - start
+        length = np.hypot(*segment)
+        if length == 0:
+            dist = np.hypot(inner[:, 0], inner[:, 1])
+        else:
+            dist = np.abs(segment[0] * inner[:, 1] - segment[1] * inner[:, 0]) / length
+        farthest = int(np.argmax(dist))
+        if dist[farthest] > tolerance:
+            index = first + 1 + farthest
+            keep[index] = True
+            stack.append((first, index))
+            stack.append((index, last))
+    return points[keep]
+
+
+def _simplify_ring(ring, tolerance):
+    simplified = simplify_line(np.asarray(ring, dtype=np.float64), tolerance)
+    # A ring needs at least four points (closed triangle) to stay valid
+    if len(simplified) < 4:
+        return ring
+    return np.round(simplified, 5).tolist()
+
+
+def _simplify_geometry(geometry, tolerance):
+    if geometry['type'] == 'Polygon':
+        rings = [_simplify_ring(r, tolerance) for r in geometry['coordinates']]
+        return {"type": "Polygon", "coordinates": rings}
+    if geometry['type'] == 'MultiPolygon':
+        polygons = [[_simplify_ring(r, tolerance) for r in p] for p in geometry['coordinates']]
+        return {"type": "MultiPolygon", "coordinates": polygons}
+    return geometry
+
+
+def _boundary_name(properties):
+    for key in BOUNDARY_NAME_KEYS:
+        if properties.get(key):
+            name = str(properties[key]).strip().title()
+            if name in DISTRICT_GEOLOCATION_MAP:
+                return name
+    return None
+
+
+@lru_cache(maxsize=1)
+def district_geometries():
+    """
+    {zoom: {district: geometry}} for every simplification level. Parsed and
+    simplified once per process; later calls are a dictionary lookup.
+    """
+    points = {
+        district: {"type": "Point", "coordinates": [geo['longitude'], geo['latitude']]}
+        for district, geo in DISTRICT_GEOLOCATION_MAP.items()
+    }
+    levels = {zoom: dict(points) for zoom in ZOOM_TOLERANCES}
+
+    path = os.path.join(settings.WEATHERWAVE_DATA_DIR, BOUNDARY_FILE)
+    try:
+        with open(path) as f:
+            boundaries = json.load(f)
+    except FileNotFoundError:
+        logger.info(f"{BOUNDARY_FILE} not found, district layer uses centroid points")
+        return levels
+    except ValueError as e:
+        logger.error(f"Could not parse {BOUNDARY_FILE}: {e}")
+        return levels
+
+    for feature in boundaries.get('features', []):
+        name = _boundary_name(feature.get('properties') or {})
+        if not name or not feature.get('geometry'):
+            continue
+        for zoom, tolerance in ZOOM_TOLERANCES.items():
+            levels[zoom][name] = _simplify_geometry(feature['geometry'], tolerance)
+    return levels
+
+
+def zoom_level(requested):
+    """Largest simplification level at or below the requested map zoom."""
+    eligible = [z for z in ZOOM_TOLERANCES if z <= requested]
+    return max(eligible) if eligible else min(ZOOM_TOLERANCES)
+
+
+def district_values():
+    snapshot = district_snapshot()
+    aqi = cached_aqi()
+    values = {}
+    for district in DISTRICT_GEOLOCATION_MAP:
+        current = snapshot.get(district, {})
+        prediction = get_prediction(district)
+        values[district] = {
+            "temp": current.get("temp"),
+            "observed_at": current["observed_at"].isoformat() if current.get("observed_at") else None,
+            "aqi": aqi.get(district),
+            "predicted_temp": prediction["predicted_temp"] if prediction else None,
+        }
+    return values
+
+
+_documents = {}
+_documents_lock = threading.Lock()
+
+
+def district_layer(zoom=DEFAULT_ZOOM):
+    """
+    Serialized FeatureCollection for `zoom` as (bytes, etag). The document is
+    only re-serialized when the district values differ from the last build.
+    """
+    zoom = zoom_level(zoom)
+    values = district_values()
+    fingerprint = hashlib.md5(json.dumps(values, sort_keys=True).encode()).hexdigest()
+
+    cached = _documents.get(zoom)
+    if cached and cached[0] == fingerprint:
+        return cached[1], cached[2]
+
+    with _documents_lock:
+        cached = _documents.get(zoom)
+        if cached and cached[0] == fingerprint:
+            return cached[1], cached[2]
+        geometries = district_geometries()[zoom]
+        collection = {
+            "type": "FeatureCollection",
+            "features": [
+                {
+                    "type": "Feature",
+                    "id": district,
+                    "geometry": geometries[district],
+                    "properties": {"district": district, **values[district]},
+                }
+                for district in DISTRICT_GEOLOCATION_MAP
+            ],
+        }
+        document = json.dumps(collection, separators=(',', ':')).encode()
+        etag = hashlib.md5(document).hexdigest()
+        _documents[zoom] = (fingerprint, document, etag)
+    return document, etag
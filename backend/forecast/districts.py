@@ -0,0 +1,145 @@
+# Districts of Nepal shared by the forecast views and background jobs
+
+import math
+
+# Define a manual dictionary for districts with their latitude and longitude
+DISTRICT_GEOLOCATION_MAP = {
+    "Achham": {"latitude": 29.1200, "longitude": 81.3000},
+    "Arghakhanchi": {"latitude": 27.9500, "longitude": 83.2000},
+    "Baglung": {"latitude": 28.2667, "longitude": 83.6167},
+    "Baitadi": {"latitude": 29.5167, "longitude": 80.5500},
+    "Bajhang": {"latitude": 29.8333, "longitude": 81.2500},
+    "Bajura": {"latitude": 29.4000, "longitude": 81.5000},
+    "Banke": {"latitude": 28.0500, "longitude": 81.6167},
+    "Bara": {"latitude": 27.2167, "longitude": 85.0167},
+    "Bardiya": {"latitude": 28.3000, "longitude": 81.4167},
+    "Bhaktapur": {"latitude": 27.6710, "longitude": 85.4298},
+    "Bhojpur": {"latitude": 27.1700, "longitude": 87.0500},
+    "Chitwan": {"latitude": 27.5291, "longitude": 84.3542},
+    "Dadeldhura": {"latitude": 29.3000, "longitude": 80.5833},
+    "Dailekh": {"latitude": 28.8442, "longitude": 81.7101},
+    "Dang": {"latitude": 28.0500, "longitude": 82.3000},
+    "Darchula": {"latitude": 30.1500, "longitude": 80.5833},
+    "Dhading": {"latitude": 27.9000, "longitude": 84.9167},
+    "Dhankuta": {"latitude": 26.9833, "longitude": 87.3500},
+    "Dhanusha": {"latitude": 26.8167, "longitude": 86.0333},
+    "Dolakha": {"latitude": 27.6667, "longitude": 86.0500},
+    "Dolpa": {"latitude": 29.0694, "longitude": 83.5800},
+    "Doti": {"latitude": 29.2667, "longitude": 80.9333},
+    "Eastern Rukum": {"latitude": 28.6260, "longitude": 83.3604},
+    "Gorkha": {"latitude": 28.0000, "longitude": 84.6333},
+    "Gulmi": {"latitude": 28.0833, "longitude": 83.2500},
+    "Humla": {"latitude": 29.9667, "longitude": 81.8333},
+    "Ilam": {"latitude": 26.9110, "longitude": 87.9286},
+    "Jajarkot": {"latitude": 28.7000, "longitude": 82.1833},
+    "Jhapa": {"latitude": 26.5456, "longitude": 87.9036},
+    "Jumla": {"latitude": 29.2806, "longitude": 82.3033},
+    "Kailali": {"latitude": 28.5300, "longitude": 80.6200},
+    "Kalikot": {"latitude": 29.1333, "longitude": 82.0000},
+    "Kanchanpur": {"latitude": 28.8333, "longitude": 80.3333},
+    "Kapilvastu": {"latitude": 27.5500, "longitude": 83.0500},
+    "Kaski": {"latitude": 28.2333, "longitude": 83.9833},
+    "Kathmandu": {"latitude": 27.7172, "longitude": 85.3240},
+    "Kavrepalanchok": {"latitude": 27.6333, "longitude": 85.5333},
+    "Khotang": {"latitude": 27.2038, "longitude": 86.7893},
+    "Lalitpur": {"latitude": 27.6766, "longitude": 85.3188},
+    "Lamjung": {"latitude": 28.2667, "longitude": 84.3667},
+    "Mahottari": {"latitude": 26.6500, "longitude": 85.8167},
+    "Makwanpur": {"latitude": 27.4333, "longitude": 85.0333},
+    "Manang": {"latitude": 28.6667, "longitude": 84.0167},
+    "Morang": {"latitude": 26.6667, "longitude": 87.5000},
+    "Mugu": {"latitude": 29.6167, "longitude": 82.3833},
+    "Mustang": {"latitude": 28.9985, "longitude": 83.8963},
+    "Myagdi": {"latitude": 28.3500, "longitude": 83.5667},
+    "Nawalpur": {"latitude": 27.6928, "longitude": 84.1272},
+    "Nuwakot": {"latitude": 27.8700, "longitude": 85.1400},
+    "Okhaldhunga": {"latitude": 27.3167, "longitude": 86.5000},
+    "Palpa": {"latitude": 27.8667, "longitude": 83.5500},
+    "Panchthar": {"latitude": 27.1167, "longitude": 87.9333},
+    "Parbat": {"latitude": 28.2333, "longitude": 83.7000},
+    "Parsa": {"latitude": 27.0000, "longitude": 84.8667},
+    "Pyuthan": {"latitude": 28.0833, "longitude": 82.8500},
+    "Ramechhap": {"latitude": 27.3833, "longitude": 86.0833},
+    "Rasuwa": {"latitude": 28.0500, "longitude": 85.3333},
+    "Rautahat": {"latitude": 26.9333, "longitude": 85.3000},
+    "Rolpa": {"latitude": 28.3500, "longitude": 82.8667},
+    "Rupandehi": {"latitude": 27.6333, "longitude": 83.5500},
+    "Salyan": {"latitude": 28.3833, "longitude": 82.1500},
+    "Sankhuwasabha": {"latitude": 27.5833, "longitude": 87.3000},
+    "Saptari": {"latitude": 26.6167, "longitude": 86.7500},
+    "Sarlahi": {"latitude": 26.9833, "longitude": 85.5667},
+    "Sindhuli": {"latitude": 27.2500, "longitude": 85.9167},
+    "Sindhupalchok": {"latitude": 27.8014, "longitude": 85.7006},
+    "Siraha": {"latitude": 26.6500, "longitude": 86.2000},
+    "Solukhumbu": {"latitude": 27.6690, "longitude": 86.7140},
+    "Sunsari": {"latitude": 26.6167, "longitude": 87.2500},
+    "Surkhet": {"latitude": 28.6000, "longitude": 81.6333},
+    "Syangja": {"latitude": 28.0069, "longitude": 83.8622},
+    "Tanahun": {"latitude": 27.9316, "longitude": 84.2570},
+    "Taplejung": {"latitude": 27.3543, "longitude": 87.6792},
+    "Terhathum": {"latitude": 27.0000, "longitude": 87.6000},
+    "Udayapur": {"latitude": 26.7911, "longitude": 86.6913},
+    "Western Rukum": {"latitude": 28.6274, "longitude": 82.3425}
+}
+
+# The ML pipeline (ml/data/fetchdata.py) spells a few districts differently
+# from the map above; translate before looking anything up in its datasets
+PIPELINE_DISTRICT_NAMES = {
+    "Eastern Rukum": "East Rukum",
+    "Western Rukum": "West Rukum",
+}
+
+
+def pipeline_district_name(district):
+    return PIPELINE_DISTRICT_NAMES.get(district, district)
+
+
+def nearest_district(lat, lon):
+    """Name of the district whose centroid is closest to (lat, lon)."""
+    min_dist = float('inf')
+    closest_district = None
+    for district, info in DISTRICT_GEOLOCATION_MAP.items():
+        dist = ((lat - info['latitude'])**2 + (lon - info['longitude'])**2)**0.5
+        if dist < min_dist:
+            min_dist = dist
+            closest_district = district
+    return closest_district
+
+
+# Points outside this box, or farther than MAX_DISTRICT_DISTANCE_KM from every
+# district centroid, are not in Nepal and are never attributed to a district
+NEPAL_BOUNDS = {"min_lat": 26.3, "max_lat": 30.5, "min_lon": 80.0, "max_lon": 88.3}
+MAX_DISTRICT_DISTANCE_KM = 60
+
+
+def parse_coordinates(lat, lon):
+    """(lat, lon) as floats. Raises ValueError unless both are valid coordinates."""
+    lat, lon = float(lat), float(lon)
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        raise ValueError(f"coordinates out of range: {lat}, {lon}")
+    return lat, lon
+
+
+def _distance_km(lat1, lon1, lat2, lon2):
+    # Haversine distance on a spherical Earth
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = (math.sin((phi2 - phi1) / 2) ** 2
+         + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2)
+    return 2 * 6371 * math.asin(math.sqrt(a))
+
+
+def district_for_point(lat, lon):
+    """
+    The district (lat, lon) belongs to, or None for a point outside Nepal.
+    Unlike nearest_district, which always answers, this is safe to use when
+    attributing a reading to a district.
+    """
+    if not (NEPAL_BOUNDS["min_lat"] <= lat <= NEPAL_BOUNDS["max_lat"]
+            and NEPAL_BOUNDS["min_lon"] <= lon <= NEPAL_BOUNDS["max_lon"]):
+        return None
+    district = nearest_district(lat, lon)
+    geo = DISTRICT_GEOLOCATION_MAP[district]
+    if _distance_km(lat, lon, geo['latitude'], geo['longitude']) > MAX_DISTRICT_DISTANCE_KM:
+        return None
+    return district
+
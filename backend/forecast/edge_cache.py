@@ -0,0 +1,103 @@
+import logging
+import threading
+import time
+
+import requests
+from django.conf import settings
+
+from .districts import DISTRICT_GEOLOCATION_MAP, district_for_point
+from .tiered_cache import VERSION_CHECK_SECONDS, tiered_cache
+
+logger = logging.getLogger(__name__)
+
+# Current version of every surrogate key. Response-cache keys include the
+# versions of their tags, so a purge also drops Django's own cached copies.
+# Other workers see a purge within VERSION_CHECK_SECONDS.
+tag_version_cache = tiered_cache.namespace('surrogate_version', timeout=None, local_timeout=VERSION_CHECK_SECONDS)
+PURGE_TIMEOUT = 3
+
+
+def _tag(kind, value):
+    # Surrogate-Key is a space separated header, so names cannot contain spaces
+    return f"{kind}:{value.replace(' ', '_')}"
+
+
+def district_tag(district):
+    return _tag('district', district)
+
+
+def data_tag(data_type, district=None):
+    return data_type if district is None else _tag(data_type, district)
+
+
+def request_district(request):
+    """The district a request's `city` or `lat`/`lon` refers to, or None."""
+    params = request.GET
+    if params.get('city') in DISTRICT_GEOLOCATION_MAP:
+        return params['city']
+    try:
+        return district_for_point(float(params['lat']), float(params['lon']))
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def surrogate_keys(data_type, provider=None, per_district=True):
+    """
+    A function mapping a request to its surrogate keys, for
+    response_cache.cached_response. A Kathmandu forecast from OpenWeather
+    is tagged `forecast forecast:Kathmandu district:Kathmandu
+    provider:openweather`.
+    """
+    def keys(request):
+        tags = [data_type]
+        district = request_district(request) if per_district else None
+        if district:
+            tags += [data_tag(data_type, district), district_tag(district)]
+        if provider:
+            tags.append(_tag('provider', provider))
+        return tags
+    return keys
+
+
+def tag_response(response, tags, edge_max_age):
+    """Surrogate headers for views that manage their own caching."""
+    response['Surrogate-Key'] = ' '.join(tags)
+    response['Surrogate-Control'] = f'max-age={edge_max_age}'
+    return response
+
+
+def tag_versions(tags):
+    if not tags:
+        return ()
+    versions = tag_version_cache.get_many(tags)
+    return tuple(versions.get(tag, 0) for tag in tags)
+
+
+def _send_purge(tags):
+    headers = {'Surrogate-Key': ' '.join(tags)}
+    if settings.EDGE_PURGE_TOKEN:
+        headers['Authorization'] = f"Bearer {settings.EDGE_PURGE_TOKEN}"
+    try:
+        requests.post(settings.EDGE_PURGE_URL, headers=headers, timeout=PURGE_TIMEOUT).raise_for_status()
+        logger.info(f"Purged surrogate keys: {' '.join(tags)}")
+    except requests.RequestException as e:
+        logger.warning(f"Edge purge failed for {' '.join(tags)}: {e}")
+
+
+def purge(tags, wait=False):
+    """
+    Invalidate everything tagged with any of `tags`: bump their versions for
+    the response cache and, when EDGE_PURGE_URL is set, ask the edge to drop
+    them. The edge call runs on a background thread unless `wait` is set.
+    """
+    tags = sorted(set(tags))
+    if not tags:
+        return
+    version = time.time_ns()
+    tag_version_cache.set_many({tag: version for tag in tags})
+    if not settings.EDGE_PURGE_URL:
+        return
+    if wait:
+        _send_purge(tags)
+    else:
+        threading.Thread(target=_send_purge, args=(tags,), name='edge-purge', daemon=True).start()
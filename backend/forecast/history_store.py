@@ -0,0 +1,139 @@
+import io
+
+import numpy as np
+
+from .districts import pipeline_district_name
+from .ml_files import RefreshingArtifact
+
+HISTORY_FILE = "raw_data_interpolated.csv"
+
+# Store column -> candidate column names in the pipeline dataset
+HISTORY_COLUMNS = {
+    'avg_temp': ['Temp_2m', 'Temp'],
+    'max_temp': ['MaxTemp_2m', 'MaxTemp'],
+    'min_temp': ['MinTemp_2m', 'MinTemp'],
+    'precip': ['Precip'],
+    'humidity': ['RH_2m', 'RelativeHumidity'],
+}
+# How each column is combined when several days fold into one bucket
+AGGREGATIONS = {
+    'avg_temp': 'mean',
+    'max_temp': 'max',
+    'min_temp': 'min',
+    'precip': 'sum',
+    'humidity': 'mean',
+}
+RESOLUTIONS = ('day', 'week', 'month')
+
+
+class DistrictSeries:
+    """One district's daily history as sorted, contiguous column arrays."""
+
+    def __init__(self, dates, columns):
+        self.dates = dates        # datetime64[D], ascending
+        self.columns = columns    # name -> float32 array aligned with dates
+
+    def slice(self, start, end):
+        # Binary search on the sorted date index instead of scanning rows
+        lo = np.searchsorted(self.dates, np.datetime64(start, 'D'), side='left')
+        hi = np.searchsorted(self.dates, np.datetime64(end, 'D'), side='right')
+        return self.dates[lo:hi], {name: values[lo:hi] for name, values in self.columns.items()}
+
+
+def _parse_history(file_bytes):
+    import pandas as pd
+
+    df = pd.read_csv(io.BytesIO(file_bytes))
+    df['Date'] = pd.to_datetime(df['Date'].astype(str), format='%Y%m%d', errors='coerce')
+    df = df.dropna(subset=['Date']).sort_values(['District', 'Date'])
+
+    resolved = {}
+    for name, candidates in HISTORY_COLUMNS.items():
+        resolved[name] = next((col for col in candidates if col in df.columns), None)
+
+    store = {}
+    for district, group in df.groupby('District', sort=False):
+        dates = group['Date'].to_numpy().astype('datetime64[D]')
+        columns = {}
+        for name, col in resolved.items():
+            if col is None:
+                columns[name] = np.full(len(group), np.nan, dtype=np.float32)
+            else:
+                columns[name] = pd.to_numeric(group[col], errors='coerce').to_numpy(dtype=np.float32)
+        store[district] = DistrictSeries(dates, columns)
+    return store
+
+
+history_store = RefreshingArtifact(HISTORY_FILE, _parse_history, max_age=24 * 3600)
+
+
+def choose_resolution(start, end):
+    span = (end - start).days
+    if span <= 92:
+        return 'day'
+    if span <= 2 * 366:
+        return 'week'
+    return 'month'
+
+
+def _bucket_keys(dates, resolution):
+    if resolution == 'month':
+        return dates.astype('datetime64[M]').astype('datetime64[D]')
+    # 1970-01-01 was a Thursday; shift so weeks start on Monday
+    days = dates.astype(np.int64)
+    return ((days + 3) // 7 * 7 - 3).astype('datetime64[D]')
+
+
+def _aggregate(values, starts, how):
+    # NaNs are excluded from every aggregate; an all-NaN bucket yields NaN
+    valid = ~np.isnan(values)
+    n_valid = np.add.reduceat(valid, starts)
+    if how == 'max':
+        result = np.maximum.reduceat(np.where(valid, values, -np.inf), starts)
+    elif how == 'min':
+        result = np.minimum.reduceat(np.where(valid, values, np.inf), starts)
+    else:
+        result = np.add.reduceat(np.where(valid, values, 0.0), starts, dtype=np.float64)
+        if how == 'mean':
+            result = result / np.maximum(n_valid, 1)
+    return np.where(n_valid > 0, result, np.nan)
+
+
+def query_history(district, start, end, resolution=None):
+    """
+    Daily, weekly or monthly history for `district` between `start` and
+    `end` (inclusive dates). Returns None if the dataset has no such district.
+    """
+    store = history_store.get()
+    series = store.get(pipeline_district_name(district)) if store else None
+    if series is None:
+        return None
+
+    resolution = resolution or choose_resolution(start, end)
+    dates, columns = series.slice(start, end)
+    if len(dates) == 0:
+        return {"resolution": resolution, "history": []}
+
+    if resolution == 'day':
+        bucket_dates = dates
+        aggregated = columns
+    else:
+        keys = _bucket_keys(dates, resolution)
+        # Dates are sorted, so each bucket is one contiguous run
+        bucket_dates, starts = np.unique(keys, return_index=True)
+        aggregated = {
+            name: _aggregate(values, starts, AGGREGATIONS[name])
+            for name, values in columns.items()
+        }
+
+    rounded = {name: np.round(values.astype(np.float64), 2) for name, values in aggregated.items()}
+    history = []
+    for i, date in enumerate(bucket_dates.astype(str)):
+        history.append({
+            "date": date,
+            "Weather": {
+                name: (None if np.isnan(values[i]) else float(values[i]))
+                for name, values in rounded.items()
+            },
+        })
+    return {"resolution": resolution, "history": history}
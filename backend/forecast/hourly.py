@@ -0,0 +1,109 @@
+import requests
+import numpy as np
+
+from .tiered_cache import tiered_cache
+
+# Upstream forecasts are shared by every request within the same 0.1° cell
+FORECAST_CACHE_SECONDS = 10 * 60
+FORECAST_TIMEOUT = 10
+forecast_cache = tiered_cache.namespace('forecast_columns', FORECAST_CACHE_SECONDS)
+
+# Decimal places each column is quantized to before it is served
+PRECISION = {
+    'temp': 1,
+    'humidity': 0,
+    'wind_speed': 1,
+    'precip': 1,
+}
+COLUMNS = tuple(PRECISION)
+SECONDS_PER_DAY = 86400
+
+
+def _columns(forecast_json):
+    """OpenWeather's 3-hourly list as parallel NumPy arrays, sorted by time."""
+    entries = forecast_json.get('list', [])
+    columns = {
+        'time': np.array([entry['dt'] for entry in entries], dtype=np.int64),
+        'temp': np.array([entry['main']['temp'] for entry in entries], dtype=np.float64),
+        'humidity': np.array([entry['main']['humidity'] for entry in entries], dtype=np.float64),
+        'wind_speed': np.array([entry.get('wind', {}).get('speed', np.nan) for entry in entries], dtype=np.float64),
+        # Rain and snow over the 3-hour step, mm
+        'precip': np.array([
+            (entry.get('rain') or {}).get('3h', 0.0) + (entry.get('snow') or {}).get('3h', 0.0)
+            for entry in entries
+        ], dtype=np.float64),
+    }
+    order = np.argsort(columns['time'], kind='stable')
+    return {name: values[order] for name, values in columns.items()}
+
+
+def forecast_columns(lat, lon, api_key):
+    """
+    Columnar 5-day/3-hour forecast for (lat, lon), floats validated by the
+    caller (see districts.parse_coordinates), cached per 0.1° cell.
+    Raises requests.RequestException when the upstream call fails.
+    """
+    key = f"{lat:.1f}:{lon:.1f}"
+    columns = forecast_cache.get(key)
+    if columns is None:
+        resp = requests.get(
+            "http://api.openweathermap.org/data/2.5/forecast",
+            params={"lat": lat, "lon": lon, "appid": api_key, "units": "metric"},
+            timeout=FORECAST_TIMEOUT,
+        )
+        resp.raise_for_status()
+        columns = _columns(resp.json())
+        forecast_cache.set(key, columns)
+    return columns
+
+
+def _quantize(values, decimals):
+    rounded = np.round(values, decimals)
+    # Integers serialize without a trailing ".0"; NaN becomes null
+    if decimals == 0:
+        return [None if np.isnan(v) else int(v) for v in rounded]
+    return [None if np.isnan(v) else float(v) for v in rounded]
+
+
+def compact_hourly(columns):
+    """
+    {"time": [...], "temp": [...], ...} with every column quantized to
+    PRECISION; `time` is Unix seconds. One key per column instead of one
+    dict per step keeps the JSON several times smaller.
+    """
+    payload = {"time": columns['time'].tolist()}
+    for name in COLUMNS:
+        payload[name] = _quantize(columns[name], PRECISION[name])
+    return payload
+
+
+def daily_rollups(columns, days=5):
+    """
+    Per-day aggregates of the 3-hourly columns, grouped by UTC date (the
+    date of OpenWeather's `dt_txt`). The arrays are sorted by time, so each
+    day is a contiguous run and reduceat aggregates every day in one call.
+    """
+    if not len(columns['time']):
+        return []
+    day = columns['time'] // SECONDS_PER_DAY
+    day_numbers, starts, counts = np.unique(day, return_index=True, return_counts=True)
+
+    temp = columns['temp']
+    avg_temp = np.add.reduceat(temp, starts) / counts
+    max_temp = np.maximum.reduceat(temp, starts)
+    min_temp = np.minimum.reduceat(temp, starts)
+    precip = np.add.reduceat(columns['precip'], starts)
+    dates = day_numbers.astype('datetime64[D]').astype(str)
+
+    return [
+        {
+            "date": str(dates[i]),
+            "Weather": {
+                "avg_temp": float(avg_temp[i]),
+                "max_temp": float(max_temp[i]),
+                "min_temp": float(min_temp[i]),
+                "precip": round(float(precip[i]), 1),
+            },
+        }
+        for i in range(min(days, len(starts)))
+    ]
@@ -0,0 +1,234 @@
+import datetime
+import logging
+import math
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from .districts import district_for_point, pipeline_district_name
+from .flat_forest import FlatForest
+from .ml_files import RefreshingArtifact
+from .models import Weather
+from .tiered_cache import tiered_cache
+
+logger = logging.getLogger(__name__)
+
+# Flattened forest written by ml/steps/06_train_model.py; evaluating it
+# needs only NumPy, so web workers never import scikit-learn
+MODEL_FILE = "weather_model.npz"
+
+# Live conditions are shared by every request within the same 0.1° cell
+CONDITIONS_CACHE_SECONDS = 10 * 60
+conditions_cache = tiered_cache.namespace('live_conditions', CONDITIONS_CACHE_SECONDS)
+# Wind profile power law exponent used to estimate the 50 m wind
+WIND_SHEAR_EXPONENT = 1 / 7
+
+
+weather_model = RefreshingArtifact(MODEL_FILE, FlatForest.from_npz, max_age=24 * 3600)
+
+
+def district_code(district):
+    """The integer step 05 encoded `district` as, or None."""
+    model = weather_model.get()
+    if model is None or 'district_names' not in model.metadata:
+        return None
+    names = model.metadata['district_names'].tolist()
+    name = pipeline_district_name(district)
+    return int(model.metadata['district_codes'][names.index(name)]) if name in names else None
+
+
+def live_conditions(lat, lon):
+    """Current OpenWeather conditions for (lat, lon), cached per 0.1° cell."""
+    from .views import get_weather
+
+    key = f"{lat:.1f}:{lon:.1f}"
+    conditions = conditions_cache.get(key)
+    if conditions is None:
+        api_key = os.getenv('OPENWEATHER_API_KEY')
+        conditions = get_weather(lat, lon, api_key) if api_key else None
+        if conditions:
+            conditions_cache.set(key, conditions)
+    return conditions
+
+
+def _recent_extremes(district):
+    """Daily max/min temperature and wind from the last 24h of stored observations."""
+    return Weather.objects.filter(
+        city=district, observed_at__gte=timezone.now() - datetime.timedelta(hours=24),
+    ).aggregate(
+        max_temp=Max('temperature'), min_temp=Min('temperature'),
+        max_wind=Max('wind_speed'), min_wind=Min('wind_speed'),
+    )
+
+
+def _specific_humidity(temp, rh, pressure_kpa):
+    """g/kg from temperature (°C), relative humidity (%) and pressure (kPa)."""
+    saturation = 0.61094 * math.exp(17.625 * temp / (temp + 243.04))
+    vapour = rh / 100 * saturation
+    return 622 * vapour / (pressure_kpa - 0.378 * vapour)
+
+
+def _wet_bulb(temp, rh):
+    """Stull (2011) wet-bulb approximation, °C."""
+    return (
+        temp * math.atan(0.151977 * math.sqrt(rh + 8.313659))
+        + math.atan(temp + rh) - math.atan(rh - 1.676331)
+        + 0.00391838 * rh ** 1.5 * math.atan(0.023101 * rh)
+        - 4.686035
+    )
+
+
+def build_features(lat, lon, district, conditions):
+    """
+    The model's feature values derived from live conditions, keyed like the
+    NASA POWER columns the model was trained on (see MODEL_FEATURES in
+    ml/steps/07_predict.py).
+    """
+    code = district_code(district)
+    if code is None:
+        raise LookupError(f"District '{district}' is unknown to the model")
+
+    extremes = _recent_extremes(district)
+    temp = conditions['temp']
+    rh = conditions['humidity']
+    wind = conditions['wind_speed']
+    pressure = (conditions.get('pressure') or 1013.25) / 10  # hPa -> kPa
+    max_wind = max(extremes['max_wind'] or wind, wind)
+    min_wind = min(extremes['min_wind'] or wind, wind)
+    wind_50m = (50 / 10) ** WIND_SHEAR_EXPONENT
+
+    return {
+        'Latitude': lat,
+        'Longitude': lon,
+        # Hourly rain rate scaled to a daily total, like PRECTOT
+        'Precip': (conditions.get('rain_1h') or 0.0) * 24,
+        'Pressure': pressure,
+        'Humidity_2m': _specific_humidity(temp, rh, pressure),
+        'RH_2m': rh,
+        'Temp_2m': temp,
+        'WetBulbTemp_2m': _wet_bulb(temp, rh),
+        'MaxTemp_2m': max(extremes['max_temp'] or temp, conditions.get('temp_max') or temp, temp),
+        'MinTemp_2m': min(extremes['min_temp'] or temp, conditions.get('temp_min') or temp, temp),
+        'EarthSkinTemp': temp,
+        'WindSpeed_10m': wind,
+        'MaxWindSpeed_10m': max_wind,
+        'MinWindSpeed_10m': min_wind,
+        'WindSpeed_50m': wind * wind_50m,
+        'MaxWindSpeed_50m': max_wind * wind_50m,
+        'MinWindSpeed_50m': min_wind * wind_50m,
+        'District_encoded': code,
+    }
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-row predictions into one model call.
+
+    Each `predict()` enqueues its row and blocks on a Future. A worker
+    thread takes the first waiting row, collects whatever else arrives within
+    `max_wait` seconds (up to `max_batch` rows) and runs `predict_fn` once on
+    the stacked batch.
+    """
+
+    def __init__(self, predict_fn, name, max_batch=64, max_wait=0.005):
+        self.predict_fn = predict_fn
+        self.name = name
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue = queue.Queue()
+        self._start_lock = threading.Lock()
+        self._thread = None
+
+    def predict(self, row, timeout=5.0):
+        future = Future()
+        self._queue.put((row, future))
+        self._ensure_started()
+        return future.result(timeout)
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                results = self.predict_fn(np.stack([row for row, _ in batch]))
+                for (_, future), result in zip(batch, results):
+                    future.set_result(result)
+            except Exception as e:
+                logger.error(f"{self.name}: batch of {len(batch)} failed: {e}")
+                for _, future in batch:
+                    future.set_exception(e)
+
+
+def _predict_batch(rows):
+    model = weather_model.get()
+    if model is None:
+        raise RuntimeError("Model is not available")
+    return model.predict(rows)
+
+
+batcher = MicroBatcher(_predict_batch, name='inference-batcher')
+
+
+def predict_live(lat, lon):
+    """
+    Next-day temperature for any (lat, lon) from current conditions.
+    Raises ValueError for a point outside Nepal, LookupError when conditions
+    or the district encoding are missing and RuntimeError when the model
+    cannot be loaded.
+    """
+    district = district_for_point(lat, lon)
+    if district is None:
+        raise ValueError(f"({lat}, {lon}) is not in Nepal")
+    model = weather_model.get()
+    if model is None:
+        raise RuntimeError("Model is not available")
+
+    conditions = live_conditions(lat, lon)
+    if not conditions:
+        raise LookupError("Could not fetch current conditions")
+
+    features = build_features(lat, lon, district, conditions)
+    missing = [name for name in model.feature_names_in_ if name not in features]
+    if missing:
+        raise LookupError(f"Cannot derive model features from live conditions: {', '.join(missing)}")
+    row = np.array([features[name] for name in model.feature_names_in_], dtype=np.float32)
+    # Multi-horizon models return day+1..day+N; the first is tomorrow
+    outputs = np.atleast_1d(batcher.predict(row))
+    result = {
+        "resolved_district": district,
+        "predicted_temp": round(float(outputs[0]), 2),
+        "current_temp": conditions['temp'],
+    }
+    if len(outputs) > 1:
+        today = timezone.localdate()
+        result["forecast"] = [
+            {
+                "horizon": horizon,
+                "date": (today + datetime.timedelta(days=horizon)).isoformat(),
+                "predicted_temp": round(float(value), 2),
+            }
+            for horizon, value in enumerate(outputs, start=1)
+        ]
+    return result
@@ -0,0 +1,81 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Dependencies that must stay out of worker startup (imported on first use)
+HEAVY_MODULES = ('pandas', 'supabase', 'feedparser')
+
+# Runs in a fresh interpreter so nothing is already imported
+PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+import django
+django.setup()
+setup_done = time.perf_counter()
+import {urlconf}
+done = time.perf_counter()
+maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({{
+    "setup_ms": (setup_done - start) * 1000,
+    "urls_ms": (done - setup_done) * 1000,
+    "total_ms": (done - start) * 1000,
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    "max_rss_mb": maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024),
+    "modules": len(sys.modules),
+    "heavy_modules": [name for name in {heavy!r} if name in sys.modules],
+}}))
+"""
+
+
+class Command(BaseCommand):
+    help = ("Measure worker startup: import time and peak RSS of django.setup() plus the URLconf "
+            "(which imports every view), each run in a fresh interpreter.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5)
+        parser.add_argument('--json', action='store_true', help="Print the raw results as JSON.")
+        parser.add_argument('--max-ms', type=float,
+                            help="Fail if the median startup time exceeds this many milliseconds.")
+        parser.add_argument('--max-rss-mb', type=float,
+                            help="Fail if the median peak RSS exceeds this many megabytes.")
+
+    def _probe(self):
+        code = PROBE.format(urlconf=settings.ROOT_URLCONF, heavy=HEAVY_MODULES)
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', settings.SETTINGS_MODULE)}
+        result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, env=env, cwd=settings.BASE_DIR)
+        if result.returncode:
+            raise CommandError(f"Startup probe failed:\n{result.stderr}")
+        return json.loads(result.stdout.strip().splitlines()[-1])
+
+    def handle(self, *args, **options):
+        runs = [self._probe() for _ in range(max(options['runs'], 1))]
+        summary = {
+            key: statistics.median(run[key] for run in runs)
+            for key in ('setup_ms', 'urls_ms', 'total_ms', 'max_rss_mb', 'modules')
+        }
+        heavy = sorted(set().union(*(run['heavy_modules'] for run in runs)))
+
+        if options['json']:
+            self.stdout.write(json.dumps({'runs': runs, 'median': summary, 'heavy_modules': heavy}, indent=2))
+        else:
+            for i, run in enumerate(runs, 1):
+                self.stdout.write(
+                    f"run {i}: {run['total_ms']:.0f} ms (setup {run['setup_ms']:.0f} ms, "
+                    f"urls {run['urls_ms']:.0f} ms), {run['max_rss_mb']:.1f} MB, {run['modules']} modules"
+                )
+            self.stdout.write(self.style.SUCCESS(
+                f"median: {summary['total_ms']:.0f} ms, {summary['max_rss_mb']:.1f} MB peak RSS, "
+                f"{summary['modules']:.0f} modules"
+            ))
+            if heavy:
+                self.stdout.write(self.style.WARNING(f"heavy modules imported at startup: {', '.join(heavy)}"))
+
+        if options['max_ms'] is not None and summary['total_ms'] > options['max_ms']:
+            raise CommandError(f"Median startup {summary['total_ms']:.0f} ms exceeds {options['max_ms']:.0f} ms")
+        if options['max_rss_mb'] is not None and summary['max_rss_mb'] > options['max_rss_mb']:
+            raise CommandError(f"Median peak RSS {summary['max_rss_mb']:.1f} MB exceeds {options['max_rss_mb']:.1f} MB")
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+import weatherwave_project.urls  # noqa: F401  (registers every view's cache namespace)
+from forecast.tiered_cache import STATS_FLUSH_SECONDS, tiered_cache
+
+
+class Command(BaseCommand):
+    help = (f"Show hit/miss totals per cache namespace across all workers (flushed every "
+            f"{STATS_FLUSH_SECONDS}s), or invalidate namespaces.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--invalidate', nargs='+', metavar='NAMESPACE',
+                            help="Drop every entry of these namespaces in all workers.")
+        parser.add_argument('--reset', action='store_true', help="Zero the collected statistics.")
+
+    def handle(self, *args, **options):
+        if options['invalidate']:
+            unknown = set(options['invalidate']) - set(tiered_cache.namespaces)
+            if unknown:
+                raise CommandError(f"Unknown namespaces: {', '.join(sorted(unknown))}")
+            tiered_cache.invalidate(*options['invalidate'])
+            self.stdout.write(self.style.SUCCESS(f"Invalidated: {', '.join(options['invalidate'])}"))
+            return
+        if options['reset']:
+            tiered_cache.reset_stats()
+            self.stdout.write(self.style.SUCCESS("Cache statistics reset"))
+            return
+
+        self.stdout.write(f"{'namespace':<20} {'local':>9} {'shared':>9} {'miss':>9} {'sets':>9} {'hit %':>6}")
+        for name, stats in sorted(tiered_cache.shared_stats().items()):
+            lookups = stats['local_hits'] + stats['shared_hits'] + stats['misses']
+            hit_rate = f"{100 * (lookups - stats['misses']) / lookups:.1f}" if lookups else '-'
+            self.stdout.write(
+                f"{name:<20} {stats['local_hits']:>9} {stats['shared_hits']:>9} "
+                f"{stats['misses']:>9} {stats['sets']:>9} {hit_rate:>6}"
+            )
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from forecast.aqi_history import prune_aqi_readings
+from forecast.observations import compact_observations
+
+
+class Command(BaseCommand):
+    help = "Downsample old weather observations into hourly/daily rows and drop expired ones and old AQI readings."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--raw-days', type=int, default=7,
+                            help="Keep raw observations for this many days before averaging them hourly.")
+        parser.add_argument('--hourly-days', type=int, default=90,
+                            help="Keep hourly rows for this many days before averaging them daily.")
+        parser.add_argument('--daily-days', type=int, default=3650,
+                            help="Drop daily rows older than this many days.")
+        parser.add_argument('--aqi-days', type=int, default=30,
+                            help="Keep raw AQI readings for this many days; the AQI rollups are kept.")
+
+    def handle(self, *args, **options):
+        stats = compact_observations(
+            raw_days=options['raw_days'],
+            hourly_days=options['hourly_days'],
+            daily_days=options['daily_days'],
+        )
+        stats['aqi_readings_deleted'] = prune_aqi_readings(days=options['aqi_days'])
+        for key, value in stats.items():
+            self.stdout.write(f"{key}: {value}")
+        self.stdout.write(self.style.SUCCESS("Observation store compacted."))
@@ -0,0 +1,149 @@
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+from django.core.management.base import BaseCommand
+
+PURGE_PATH = '/__purge'
+# Hop-by-hop headers and the ones an edge cache consumes itself
+DROPPED_HEADERS = {'connection', 'keep-alive', 'transfer-encoding', 'content-length',
+                   'surrogate-key', 'surrogate-control'}
+SURROGATE_MAX_AGE = re.compile(r'max-age=(\d+)')
+# Request headers every cache key varies on, before a response's Vary is known
+DEFAULT_VARY = ('accept', 'accept-encoding', 'origin')
+
+
+class EdgeCache:
+    """
+    Responses keyed by URL and the request headers named in their Vary
+    header (e.g. Origin for CORS), indexed by surrogate key.
+    """
+
+    def __init__(self):
+        self.entries = {}
+        self.by_tag = {}
+        self.vary = {}
+        self.lock = threading.Lock()
+
+    def key(self, path, request_headers, vary=None):
+        """The cache key for a request; `vary` defaults to what `path` last responded with."""
+        names = vary if vary is not None else self.vary.get(path, DEFAULT_VARY)
+        return (path,) + tuple(request_headers.get(name, '') for name in names)
+
+    def remember_vary(self, path, vary_header):
+        """Record the header names `path` varies on; None when it must not be cached (Vary: *)."""
+        names = {name.strip().lower() for name in vary_header.split(',') if name.strip()}
+        if '*' in names:
+            return None
+        names = tuple(sorted(names.union(DEFAULT_VARY)))
+        with self.lock:
+            self.vary[path] = names
+        return names
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and entry['expires'] > time.time():
+                return entry
+            return None
+
+    def put(self, key, entry, tags):
+        with self.lock:
+            self.entries[key] = entry
+            for tag in tags:
+                self.by_tag.setdefault(tag, set()).add(key)
+
+    def purge(self, tags):
+        with self.lock:
+            keys = set().union(*(self.by_tag.pop(tag, set()) for tag in tags))
+            for key in keys:
+                self.entries.pop(key, None)
+        return len(keys)
+
+
+def make_handler(upstream, edge_cache, log):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            log(format % args)
+
+        def _send(self, status, headers, body, cache_state):
+            self.send_response(status)
+            for name, value in headers:
+                self.send_header(name, value)
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('X-Edge-Cache', cache_state)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _forward(self, body=None):
+            headers = {k: v for k, v in self.headers.items() if k.lower() not in ('host', 'connection')}
+            resp = requests.request(
+                self.command, upstream + self.path, headers=headers, data=body,
+                stream=True, allow_redirects=False, timeout=30,
+            )
+            # Keep the upstream bytes as they are (e.g. already gzip encoded)
+            content = resp.raw.read(decode_content=False)
+            return resp, content
+
+        def do_GET(self):
+            entry = edge_cache.get(edge_cache.key(self.path, self.headers))
+            if entry:
+                return self._send(entry['status'], entry['headers'], entry['body'], 'HIT')
+
+            resp, content = self._forward()
+            headers = [(k, v) for k, v in resp.headers.items() if k.lower() not in DROPPED_HEADERS]
+            match = SURROGATE_MAX_AGE.search(resp.headers.get('Surrogate-Control', ''))
+            tags = resp.headers.get('Surrogate-Key', '').split()
+            vary = edge_cache.remember_vary(self.path, resp.headers.get('Vary', ''))
+            if resp.status_code == 200 and match and tags and vary is not None:
+                edge_cache.put(edge_cache.key(self.path, self.headers, vary), {
+                    'status': resp.status_code, 'headers': headers, 'body': content,
+                    'expires': time.time() + int(match.group(1)),
+                }, tags)
+            self._send(resp.status_code, headers, content, 'MISS')
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            body = self.rfile.read(length) if length else None
+            if self.path == PURGE_PATH:
+                tags = self.headers.get('Surrogate-Key', '').split()
+                purged = edge_cache.purge(tags)
+                log(f"purged {purged} responses for {' '.join(tags)}")
+                return self._send(200, [('Content-Type', 'text/plain')], f"purged {purged}\n".encode(), 'PURGE')
+            resp, content = self._forward(body)
+            headers = [(k, v) for k, v in resp.headers.items() if k.lower() not in DROPPED_HEADERS]
+            self._send(resp.status_code, headers, content, 'PASS')
+
+        do_PUT = do_PATCH = do_DELETE = do_POST
+
+    return Handler
+
+
+class Command(BaseCommand):
+    help = ("Run a minimal caching reverse proxy that honours Surrogate-Key / Surrogate-Control, "
+            "as a local stand-in for a CDN. Point EDGE_PURGE_URL at http://<bind>:<port>/__purge.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--port', type=int, default=8080)
+        parser.add_argument('--bind', default='127.0.0.1')
+        parser.add_argument('--upstream', default='http://127.0.0.1:8000',
+                            help="Django server the proxy forwards cache misses to.")
+
+    def handle(self, *args, **options):
+        upstream = options['upstream'].rstrip('/')
+        handler = make_handler(upstream, EdgeCache(), lambda message: self.stdout.write(message))
+        server = ThreadingHTTPServer((options['bind'], options['port']), handler)
+        self.stdout.write(self.style.SUCCESS(
+            f"Edge proxy on http://{options['bind']}:{options['port']} -> {upstream} "
+            f"(purge: POST {PURGE_PATH} with a Surrogate-Key header)"
+        ))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
@@ -0,0 +1,38 @@
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+
+from forecast.news import ingest_news
+from forecast.tiered_cache import shared_cache_is_process_local
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Fetch the configured Nepal news feeds in parallel and store new weather articles."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=int, default=0,
+                            help="Keep running and ingest every N seconds.")
+
+    def handle(self, *args, **options):
+        if shared_cache_is_process_local():
+            self.stderr.write(self.style.WARNING(
+                "CACHES['default'] is process-local (REDIS_URL not set): web workers will not see "
+                "this command's cache purges until their entries expire."
+            ))
+        if not options['interval']:
+            added = ingest_news()
+            self.stdout.write(self.style.SUCCESS(f"News ingested: {added} new articles"))
+            return
+        while True:
+            # A failed run (database or feed trouble) must not end the schedule
+            try:
+                added = ingest_news()
+            except Exception:
+                logger.exception("News ingest failed")
+                self.stderr.write(f"News ingest failed; retrying in {options['interval']}s")
+            else:
+                self.stdout.write(self.style.SUCCESS(f"News ingested: {added} new articles"))
+            time.sleep(options['interval'])
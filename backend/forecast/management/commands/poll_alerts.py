@@ -0,0 +1,45 @@
+import logging
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from forecast.alerts import alert_poller
+from forecast.tiered_cache import shared_cache_is_process_local
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = ("Poll Weatherbit alerts for every district, stream new and expired alerts to the "
+            "/api/alerts/stream/ clients of every worker and notify subscribed users. "
+            "Run exactly one of these.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=int, default=settings.ALERT_POLL_SECONDS,
+                            help="Poll every N seconds (default: ALERT_POLL_SECONDS); 0 polls once and exits.")
+
+    def handle(self, *args, **options):
+        if shared_cache_is_process_local():
+            # Events, poll state and purges would stay in this process's own cache
+            raise CommandError(
+                "CACHES['default'] is process-local (REDIS_URL not set): web workers could never "
+                "see the polled alerts. Set REDIS_URL to a cache shared with the web workers."
+            )
+        if not options['interval']:
+            changes = alert_poller.poll_once()
+            self.stdout.write(self.style.SUCCESS(f"Alerts polled: {changes} changes"))
+            return
+        while True:
+            # A failed poll (Weatherbit, cache or database trouble) must not end the schedule
+            try:
+                changes = alert_poller.poll_once()
+            except Exception:
+                logger.exception("Alert poll failed")
+                self.stderr.write(f"Alert poll failed; retrying in {options['interval']}s")
+            else:
+                self.stdout.write(self.style.SUCCESS(f"Alerts polled: {changes} changes"))
+            finally:
+                close_old_connections()
+            time.sleep(options['interval'])
@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from forecast.raster import refresh_rasters
+from forecast.snapshot import refresh_district_snapshot
+from forecast.tiered_cache import shared_cache_is_process_local
+
+
+class Command(BaseCommand):
+    help = "Interpolate current and predicted district temperatures onto the national raster grid."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fetch', action='store_true',
+                            help="Fetch current conditions for districts with stale observations first.")
+        parser.add_argument('--interval', type=int, default=0,
+                            help="Keep running and refresh every N seconds.")
+
+    def handle(self, *args, **options):
+        if shared_cache_is_process_local():
+            self.stderr.write(self.style.WARNING(
+                "CACHES['default'] is process-local (REDIS_URL not set): web workers will not see "
+                "this command's cache purges until their entries expire."
+            ))
+        while True:
+            if options['fetch']:
+                refresh_district_snapshot()
+            layers = refresh_rasters()
+            self.stdout.write(self.style.SUCCESS(f"Rasters refreshed: {', '.join(layers) or 'none'}"))
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
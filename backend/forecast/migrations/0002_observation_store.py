@@ -0,0 +1,67 @@
+# Generated by Django 5.2.1 on 2026-10-19 09:12
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forecast', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='weather',
+            options={'ordering': ['city', '-observed_at']},
+        ),
+        migrations.AddField(
+            model_name='weather',
+            name='observed_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='weather',
+            name='humidity',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='weather',
+            name='wind_speed',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='weather',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='weather',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='weather',
+            name='source',
+            field=models.CharField(default='openweather', max_length=50),
+        ),
+        migrations.AddField(
+            model_name='weather',
+            name='granularity',
+            field=models.CharField(choices=[('raw', 'Raw observation'), ('hour', 'Hourly average'), ('day', 'Daily average')], default='raw', max_length=4),
+        ),
+        migrations.AddField(
+            model_name='weather',
+            name='sample_count',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddConstraint(
+            model_name='weather',
+            constraint=models.UniqueConstraint(fields=('city', 'observed_at', 'granularity'), name='weather_city_observed_granularity_uniq'),
+        ),
+        migrations.AddIndex(
+            model_name='weather',
+            index=models.Index(fields=['granularity', 'observed_at'], name='weather_granularity_obs_idx'),
+        ),
+    ]
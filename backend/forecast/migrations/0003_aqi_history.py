@@ -0,0 +1,52 @@
+# Generated by Django 5.2.1 on 2026-10-19 10:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forecast', '0002_observation_store'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AQIReading',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('district', models.CharField(max_length=100)),
+                ('cell_lat', models.FloatField()),
+                ('cell_lon', models.FloatField()),
+                ('observed_at', models.DateTimeField()),
+                ('aqi', models.PositiveSmallIntegerField()),
+                ('dominant_pollutant', models.CharField(max_length=10)),
+                ('pm2_5', models.FloatField(blank=True, null=True)),
+                ('pm10', models.FloatField(blank=True, null=True)),
+                ('o3', models.FloatField(blank=True, null=True)),
+                ('no2', models.FloatField(blank=True, null=True)),
+                ('so2', models.FloatField(blank=True, null=True)),
+                ('co', models.FloatField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['district', 'observed_at'], name='aqireading_district_obs_idx'), models.Index(fields=['observed_at'], name='aqireading_obs_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='AQIRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('district', models.CharField(max_length=100)),
+                ('granularity', models.CharField(choices=[('hour', 'Hourly'), ('day', 'Daily')], max_length=4)),
+                ('bucket', models.DateTimeField()),
+                ('sample_count', models.PositiveIntegerField(default=0)),
+                ('aqi_sum', models.FloatField(default=0)),
+                ('aqi_max', models.PositiveSmallIntegerField(default=0)),
+                ('pm2_5_sum', models.FloatField(default=0)),
+                ('pm2_5_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['district', 'granularity', 'bucket'],
+                'constraints': [models.UniqueConstraint(fields=('district', 'granularity', 'bucket'), name='aqirollup_district_granularity_bucket_uniq')],
+            },
+        ),
+    ]
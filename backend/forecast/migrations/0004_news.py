@@ -0,0 +1,50 @@
+# Generated by Django 5.2.1 on 2026-10-19 12:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forecast', '0003_aqi_history'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.URLField(max_length=500, unique=True)),
+                ('source', models.CharField(max_length=100)),
+                ('etag', models.CharField(blank=True, max_length=255)),
+                ('last_modified', models.CharField(blank=True, max_length=64)),
+                ('last_fetched_at', models.DateTimeField(blank=True, null=True)),
+                ('last_status', models.PositiveSmallIntegerField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='NewsArticle',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('link', models.URLField(max_length=500, unique=True)),
+                ('source', models.CharField(max_length=100)),
+                ('title', models.CharField(max_length=500)),
+                ('summary', models.TextField(blank=True)),
+                ('published_at', models.DateTimeField()),
+                ('fetched_at', models.DateTimeField(auto_now_add=True)),
+                (
+                    'severity',
+                    models.CharField(
+                        choices=[('high', 'High'), ('moderate', 'Moderate'), ('low', 'Low')],
+                        default='low',
+                        max_length=8,
+                    ),
+                ),
+                ('location', models.CharField(default='Nepal', max_length=100)),
+            ],
+            options={
+                'ordering': ['-published_at'],
+                'indexes': [models.Index(fields=['-published_at'], name='newsarticle_published_idx')],
+            },
+        ),
+    ]
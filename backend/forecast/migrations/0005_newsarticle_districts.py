@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-19 13:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forecast', '0004_news'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='newsarticle',
+            name='districts',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
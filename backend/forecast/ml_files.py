@@ -0,0 +1,92 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+BUCKET_NAME = "ml-files"
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_supabase():
+    """Supabase client for the ML bucket, created on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from supabase import create_client
+                _client = create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_KEY"))
+    return _client
+
+
+def download_ml_file(filename):
+    return get_supabase().storage.from_(BUCKET_NAME).download(filename)
+
+
+class RefreshingArtifact:
+    """
+    An ML pipeline output kept parsed in process memory.
+
+    The first `get()` downloads and parses the file synchronously. After
+    `max_age` seconds the next `get()` still returns the cached value
+    immediately and triggers a refresh on a background thread, so request
+    handlers only ever pay for a dictionary lookup once the artifact is warm.
+    `on_change` is called when a refresh downloads different content from
+    the previous load (not on the first load).
+    """
+
+    def __init__(self, filename, parse, max_age=6 * 3600, retry_after=300, on_change=None):
+        self.filename = filename
+        self.parse = parse
+        self.max_age = max_age
+        self.retry_after = retry_after
+        self.on_change = on_change
+        self._digest = None
+        self._value = None
+        self._loaded_at = 0.0
+        self._next_refresh = 0.0
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    @property
+    def loaded_at(self):
+        return self._loaded_at
+
+    def get(self):
+        if self._value is None:
+            with self._lock:
+                if self._value is None and time.time() >= self._next_refresh:
+                    self._refresh()
+        elif time.time() >= self._next_refresh and not self._refreshing:
+            self._refreshing = True
+            threading.Thread(target=self._background_refresh, daemon=True).start()
+        return self._value
+
+    def _background_refresh(self):
+        try:
+            with self._lock:
+                self._refresh()
+        finally:
+            self._refreshing = False
+
+    def _refresh(self):
+        try:
+            file_bytes = download_ml_file(self.filename)
+            value = self.parse(file_bytes)
+        except Exception as e:
+            logger.error(f"Could not load {self.filename} from Supabase: {e}")
+            self._next_refresh = time.time() + self.retry_after
+            return
+        self._value = value
+        self._loaded_at = time.time()
+        self._next_refresh = self._loaded_at + self.max_age
+
+        digest = hashlib.md5(file_bytes).hexdigest()
+        changed = self._digest is not None and digest != self._digest
+        self._digest = digest
+        if changed and self.on_change:
+            self.on_change()
@@ -2,10 +2,166 @@ from django.db import models
 
 
 class Weather(models.Model):
+    """
+    One upstream weather observation for a location.
+
+    Rows start out at RAW granularity (one per upstream reading) and are
+    compacted into HOUR and then DAY rows by the `compact_observations`
+    management command, so trend queries stay cheap as the table grows.
+    """
+    RAW = 'raw'
+    HOUR = 'hour'
+    DAY = 'day'
+    GRANULARITY_CHOICES = [
+        (RAW, 'Raw observation'),
+        (HOUR, 'Hourly average'),
+        (DAY, 'Daily average'),
+    ]
+
     city = models.CharField(max_length=100)
     temperature = models.FloatField()
     description = models.CharField(max_length=255)
     date = models.DateField()
+    observed_at = models.DateTimeField()
+    humidity = models.FloatField(null=True, blank=True)
+    wind_speed = models.FloatField(null=True, blank=True)
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    source = models.CharField(max_length=50, default='openweather')
+    granularity = models.CharField(max_length=4, choices=GRANULARITY_CHOICES, default=RAW)
+    # Number of raw observations folded into this row (1 for raw rows)
+    sample_count = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        constraints = [
+            # Doubles as the composite (location, timestamp) index used by
+            # trend queries and as the conflict target for bulk upserts
+            models.UniqueConstraint(
+                fields=['city', 'observed_at', 'granularity'],
+                name='weather_city_observed_granularity_uniq',
+            ),
+        ]
+        indexes = [
+            # Used by the retention / downsampling jobs
+            models.Index(fields=['granularity', 'observed_at'], name='weather_granularity_obs_idx'),
+        ]
+        ordering = ['city', '-observed_at']
+
+    def __str__(self):
+        return f"{self.city} on {self.date}"
+
+
+class AQIReading(models.Model):
+    """
+    One scored air-quality reading, stored per 0.1° location cell.
+
+    The table is append-only: readings are only ever inserted in batches and
+    deleted by age, and trend queries read AQIRollup instead of scanning it.
+    """
+    district = models.CharField(max_length=100)
+    cell_lat = models.FloatField()
+    cell_lon = models.FloatField()
+    observed_at = models.DateTimeField()
+    aqi = models.PositiveSmallIntegerField()
+    dominant_pollutant = models.CharField(max_length=10)
+    pm2_5 = models.FloatField(null=True, blank=True)
+    pm10 = models.FloatField(null=True, blank=True)
+    o3 = models.FloatField(null=True, blank=True)
+    no2 = models.FloatField(null=True, blank=True)
+    so2 = models.FloatField(null=True, blank=True)
+    co = models.FloatField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['district', 'observed_at'], name='aqireading_district_obs_idx'),
+            models.Index(fields=['observed_at'], name='aqireading_obs_idx'),
+        ]
 
     def __str__(self):
-        return f"{self.city} on {self.date}"
\ No newline at end of file
+        return f"AQI {self.aqi} in {self.district} at {self.observed_at}"
+
+
+class AQIRollup(models.Model):
+    """
+    Hourly or daily AQI aggregate for a district, kept up to date
+    incrementally as readings are written.
+    """
+    HOUR = 'hour'
+    DAY = 'day'
+    GRANULARITY_CHOICES = [
+        (HOUR, 'Hourly'),
+        (DAY, 'Daily'),
+    ]
+
+    district = models.CharField(max_length=100)
+    granularity = models.CharField(max_length=4, choices=GRANULARITY_CHOICES)
+    bucket = models.DateTimeField()
+    sample_count = models.PositiveIntegerField(default=0)
+    aqi_sum = models.FloatField(default=0)
+    aqi_max = models.PositiveSmallIntegerField(default=0)
+    pm2_5_sum = models.FloatField(default=0)
+    pm2_5_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['district', 'granularity', 'bucket'],
+                name='aqirollup_district_granularity_bucket_uniq',
+            ),
+        ]
+        ordering = ['district', 'granularity', 'bucket']
+
+    def __str__(self):
+        return f"{self.district} {self.granularity} {self.bucket}"
+
+
+class FeedState(models.Model):
+    """Conditional-GET validators for one news feed, kept between ingest runs."""
+    url = models.URLField(max_length=500, unique=True)
+    source = models.CharField(max_length=100)
+    etag = models.CharField(max_length=255, blank=True)
+    last_modified = models.CharField(max_length=64, blank=True)
+    last_fetched_at = models.DateTimeField(null=True, blank=True)
+    last_status = models.PositiveSmallIntegerField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.source} ({self.url})"
+
+
+class NewsArticle(models.Model):
+    """A Nepal weather news item, normalized by the news ingester."""
+    SEVERITY_CHOICES = [
+        ('high', 'High'),
+        ('moderate', 'Moderate'),
+        ('low', 'Low'),
+    ]
+
+    link = models.URLField(max_length=500, unique=True)
+    source = models.CharField(max_length=100)
+    title = models.CharField(max_length=500)
+    summary = models.TextField(blank=True)
+    published_at = models.DateTimeField()
+    fetched_at = models.DateTimeField(auto_now_add=True)
+    severity = models.CharField(max_length=8, choices=SEVERITY_CHOICES, default='low')
+    location = models.CharField(max_length=100, default='Nepal')
+    # Every district named in the title or summary
+    districts = models.JSONField(default=list, blank=True)
+    # The first article of this one's near-duplicate cluster (see near_duplicates)
+    duplicate_of = models.ForeignKey(
+        'self', on_delete=models.SET_NULL, null=True, blank=True, related_name='duplicates',
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-published_at'], name='newsarticle_published_idx'),
+        ]
+        ordering = ['-published_at']
+
+    def __str__(self):
+        return f"{self.source}: {self.title}"
+
+
+class NewsBucket(models.Model):
+    """An article's membership of one MinHash LSH bucket (one row per band)."""
+    key = models.BigIntegerField(db_index=True)
+    article = models.ForeignKey(NewsArticle, on_delete=models.CASCADE, related_name='lsh_buckets')
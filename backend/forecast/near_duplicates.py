@@ -0,0 +1,100 @@
+import hashlib
+import zlib
+
+import numpy as np
+
+from .models import NewsArticle, NewsBucket
+from .news_index import tokenize
+
+SHINGLE_SIZE = 2
+# 30 bands of 4 rows: pairs at the duplicate threshold share a bucket ~97%
+# of the time, while unrelated articles rarely do
+BANDS = 30
+ROWS = 4
+# Candidates sharing a bucket are confirmed on their actual shingle sets
+DUPLICATE_THRESHOLD = 0.5
+
+_rng = np.random.default_rng(20261019)
+_A = _rng.integers(1, 2 ** 63, size=BANDS * ROWS, dtype=np.uint64) | np.uint64(1)
+_B = _rng.integers(0, 2 ** 63, size=BANDS * ROWS, dtype=np.uint64)
+
+
+def shingles(article):
+    """Word pairs of an article's title and summary."""
+    tokens = tokenize(f"{article.title} {article.summary}")
+    if len(tokens) <= SHINGLE_SIZE:
+        return {' '.join(tokens)} if tokens else set()
+    return {' '.join(tokens[i:i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1)}
+
+
+def signature(shingle_set):
+    """MinHash signature: the minimum of each hash permutation over the shingles."""
+    hashes = np.fromiter((zlib.crc32(s.encode()) for s in shingle_set), dtype=np.uint64, count=len(shingle_set))
+    # Multiply-shift hashing; uint64 arithmetic wraps, which is intended
+    permuted = (_A[:, None] * hashes[None, :] + _B[:, None]) >> np.uint64(32)
+    return permuted.min(axis=1)
+
+
+def bucket_keys(sig):
+    """One LSH bucket key per band of a signature."""
+    keys = []
+    for band, rows in enumerate(sig.reshape(BANDS, ROWS)):
+        digest = hashlib.blake2b(rows.tobytes(), digest_size=8, salt=band.to_bytes(2, 'big')).digest()
+        keys.append(int.from_bytes(digest, 'big', signed=True))
+    return keys
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b) if a and b else 0.0
+
+
+def assign_duplicates(articles):
+    """
+    Mark each of the newly stored `articles` that is a near-duplicate of an
+    earlier article (stored before, or earlier in this batch) as a
+    duplicate_of that article's cluster, and add the articles to the LSH
+    buckets. Each article costs one bucket lookup per band, independent of
+    the archive size. Returns the number of duplicates found.
+    """
+    articles = sorted(articles, key=lambda article: (article.published_at, article.pk))
+    shingle_sets = {article.pk: shingles(article) for article in articles}
+    keys = {
+        article.pk: bucket_keys(signature(shingle_sets[article.pk]))
+        for article in articles if shingle_sets[article.pk]
+    }
+
+    members = {}
+    for key, article_id in NewsBucket.objects.filter(
+        key__in={key for article_keys in keys.values() for key in article_keys},
+    ).values_list('key', 'article_id'):
+        members.setdefault(key, set()).add(article_id)
+
+    # Stored candidates are loaded once for the whole batch
+    stored_ids = set().union(*members.values()) if members else set()
+    stored = NewsArticle.objects.filter(pk__in=stored_ids).only('pk', 'title', 'summary', 'duplicate_of')
+    canonical = {article.pk: article.duplicate_of_id or article.pk for article in stored}
+    shingle_sets.update({article.pk: shingles(article) for article in stored})
+
+    duplicates = []
+    for article in articles:
+        if article.pk not in keys:
+            continue
+        candidates = set().union(*(members.get(key, ()) for key in keys[article.pk])) - {article.pk}
+        best, best_similarity = None, DUPLICATE_THRESHOLD
+        for candidate in candidates:
+            similarity = jaccard(shingle_sets[article.pk], shingle_sets[candidate])
+            if similarity >= best_similarity:
+                best, best_similarity = candidate, similarity
+        if best is not None:
+            article.duplicate_of_id = canonical[best]
+            duplicates.append(article)
+        canonical[article.pk] = article.duplicate_of_id or article.pk
+        for key in keys[article.pk]:
+            members.setdefault(key, set()).add(article.pk)
+
+    NewsArticle.objects.bulk_update(duplicates, ['duplicate_of'])
+    NewsBucket.objects.bulk_create([
+        NewsBucket(key=key, article_id=article_id)
+        for article_id, article_keys in keys.items() for key in article_keys
+    ])
+    return len(duplicates)
@@ -0,0 +1,369 @@
+import datetime
+import logging
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.db import transaction
+from django.utils import timezone
+
+from .districts import DISTRICT_GEOLOCATION_MAP
+from .edge_cache import purge
+from .models import FeedState, NewsArticle
+from .near_duplicates import assign_duplicates
+
+logger = logging.getLogger(__name__)
+
+NEWS_FEEDS = {
+    'Kathmandu Post': 'https://kathmandupost.com/rss',
+    'The Himalayan Times': 'https://thehimalayantimes.com/rss',
+    'My Republica': 'https://myrepublica.nagariknetwork.com/rss',
+    'Online Khabar': 'https://www.onlinekhabar.com/feed',
+}
+FEED_TIMEOUT = 10
+# Entries read per feed; feeds list newest first
+FEED_ENTRIES = 30
+NEWSAPI_URL = "https://newsapi.org/v2/everything"
+NEWSAPI_QUERY = 'Nepal weather OR Nepal monsoon'
+# Articles older than this are dropped by the ingester; the rest stay searchable
+RETENTION_DAYS = 365
+
+WEATHER_KEYWORDS = [
+    'weather', 'monsoon', 'rainfall', 'rain', 'flood', 'drought',
+    'temperature', 'climate', 'storm', 'landslide', 'avalanche',
+    'forecast', 'thunderstorm', 'heavy rain', 'heat wave', 'cold wave',
+]
+NEPAL_LOCATIONS = [
+    'nepal', 'kathmandu', 'pokhara', 'chitwan', 'humla', 'mustang',
+    'biratnagar', 'bharatpur', 'birgunj', 'janakpur', 'bagmati',
+    'gandaki', 'karnali', 'terai', 'himalaya', 'everest',
+]
+HIGH_SEVERITY_TERMS = ['disaster', 'emergency', 'destroyed', 'killed']
+MODERATE_SEVERITY_TERMS = ['flood', 'storm', 'damage', 'affected']
+# Locations an article is attributed to, in order of preference
+ARTICLE_LOCATIONS = ['humla', 'kathmandu', 'pokhara', 'chitwan']
+
+TERM_CATEGORIES = {}
+for _category, _terms in (
+    ('weather', WEATHER_KEYWORDS),
+    ('nepal', NEPAL_LOCATIONS),
+    ('high', HIGH_SEVERITY_TERMS),
+    ('moderate', MODERATE_SEVERITY_TERMS),
+):
+    for _term in _terms:
+        TERM_CATEGORIES.setdefault(_term, set()).add(_category)
+
+# Every term in one pattern. The lookahead makes matches overlap, so one
+# scan finds "storm" inside "thunderstorm" just as a substring test would.
+TERM_PATTERN = re.compile(
+    '(?=(' + '|'.join(re.escape(term) for term in sorted(TERM_CATEGORIES, key=len, reverse=True)) + '))'
+)
+
+
+DISTRICT_NAMES = {name.lower(): name for name in DISTRICT_GEOLOCATION_MAP}
+DISTRICT_PATTERN = re.compile(
+    r'\b(' + '|'.join(re.escape(name) for name in sorted(DISTRICT_NAMES, key=len, reverse=True)) + r')\b'
+)
+
+
+def article_districts(title, summary):
+    """Every district named in an article, in order of first mention."""
+    content = f"{title} {summary}".lower()
+    return list(dict.fromkeys(DISTRICT_NAMES[name] for name in DISTRICT_PATTERN.findall(content)))
+
+
+def classify(title, summary):
+    """
+    (severity, location) for a Nepal weather article, or None when the text
+    is not about weather in Nepal.
+    """
+    content = f"{title} {summary}".lower()
+    terms = {match.group(1) for match in TERM_PATTERN.finditer(content)}
+    categories = set().union(*(TERM_CATEGORIES[term] for term in terms))
+    if 'weather' not in categories or 'nepal' not in categories:
+        return None
+
+    if 'high' in categories:
+        severity = 'high'
+    elif 'moderate' in categories:
+        severity = 'moderate'
+    else:
+        severity = 'low'
+    location = next((loc for loc in ARTICLE_LOCATIONS if loc in terms), None)
+    if location is None:
+        location = 'Nepal'
+    else:
+        location = location.title() + (' District' if location != 'kathmandu' else ' Valley')
+    return severity, location
+
+
+def _entry_time(entry):
+    parsed = entry.get('published_parsed') or entry.get('updated_parsed')
+    if not parsed:
+        return timezone.now()
+    return datetime.datetime(*parsed[:6], tzinfo=datetime.timezone.utc)
+
+
+def _feed_articles(source, entries):
+    articles = []
+    for entry in entries:
+        title = entry.get('title', '')
+        summary = entry.get('summary', entry.get('description', ''))
+        link = entry.get('link')
+        matched = classify(title, summary)
+        if not link or not matched:
+            continue
+        severity, location = matched
+        articles.append(NewsArticle(
+            link=link[:500], source=source, title=title[:500] or 'Weather Update', summary=summary,
+            published_at=_entry_time(entry), severity=severity, location=location,
+            districts=article_districts(title, summary),
+        ))
+    return articles
+
+
+def fetch_feed(state):
+    """
+    Conditional GET of one feed. Returns (status, etag, last_modified,
+    articles); a 304 means nothing changed since the stored validators.
+    """
+    import feedparser
+
+    headers = {}
+    if state.etag:
+        headers['If-None-Match'] = state.etag
+    if state.last_modified:
+        headers['If-Modified-Since'] = state.last_modified
+    response = requests.get(state.url, headers=headers, timeout=FEED_TIMEOUT)
+    if response.status_code == 304:
+        return 304, state.etag, state.last_modified, []
+    response.raise_for_status()
+    feed = feedparser.parse(response.content)
+    return (
+        response.status_code,
+        response.headers.get('ETag', ''),
+        response.headers.get('Last-Modified', ''),
+        _feed_articles(state.source, feed.entries[:FEED_ENTRIES]),
+    )
+
+
+def fetch_newsapi(api_key):
+    """Nepal weather articles from NewsAPI (no conditional GET support)."""
+    response = requests.get(NEWSAPI_URL, params={
+        'q': NEWSAPI_QUERY,
+        'language': 'en',
+        'sortBy': 'publishedAt',
+        'pageSize': 20,
+        'apiKey': api_key,
+    }, timeout=FEED_TIMEOUT)
+    response.raise_for_status()
+    articles = []
+    for article in response.json().get('articles', []):
+        title = article.get('title') or ''
+        description = article.get('description') or ''
+        link = article.get('url')
+        if not link or not classify(title, description + ' weather'):
+            continue
+        published = article.get('publishedAt')
+        try:
+            published_at = datetime.datetime.fromisoformat(published.replace('Z', '+00:00'))
+        except (AttributeError, ValueError):
+            published_at = timezone.now()
+        articles.append(NewsArticle(
+            link=link[:500], source=(article.get('source') or {}).get('name') or 'News Source',
+            title=title[:500] or 'Weather Update', summary=description,
+            published_at=published_at, severity='moderate', location='Nepal',
+            districts=article_districts(title, description),
+        ))
+    return articles
+
+
+def ingest_news():
+    """
+    Fetch every configured feed (and NewsAPI, when NEWS_API_KEY is set) in
+    parallel, store the new matching articles and prune old ones. Only the
+    HTTP requests and parsing run on worker threads; all database writes
+    happen here. Returns the number of articles added.
+    """
+    states = {state.url: state for state in FeedState.objects.filter(url__in=NEWS_FEEDS.values())}
+    states = [states.get(url) or FeedState(url=url, source=source) for source, url in NEWS_FEEDS.items()]
+
+    def fetch(state):
+        try:
+            return state, fetch_feed(state)
+        except requests.RequestException as e:
+            logger.warning(f"News feed {state.source} failed: {e}")
+            return state, None
+
+    articles = []
+    news_api_key = os.getenv('NEWS_API_KEY')
+    with ThreadPoolExecutor(max_workers=len(states) + 1) as pool:
+        newsapi = pool.submit(fetch_newsapi, news_api_key) if news_api_key else None
+        for state, result in pool.map(fetch, states):
+            state.last_fetched_at = timezone.now()
+            if result is None:
+                state.last_status = None
+            else:
+                state.last_status, state.etag, state.last_modified, feed_articles = result
+                articles += feed_articles
+            state.save()
+        if newsapi is not None:
+            try:
+                articles += newsapi.result()
+            except requests.RequestException as e:
+                logger.warning(f"NewsAPI failed: {e}")
+
+    # Feeds repeat items across runs; only insert the links not stored yet
+    by_link = {article.link: article for article in articles}
+    existing = set(NewsArticle.objects.filter(link__in=list(by_link)).values_list('link', flat=True))
+    new = [article for link, article in by_link.items() if link not in existing]
+    # One transaction, so readers (and the search index) never see a new
+    # article before its duplicate_of is set
+    with transaction.atomic():
+        NewsArticle.objects.bulk_create(new, ignore_conflicts=True)
+        # Reloaded for their primary keys, which bulk_create does not set on every backend
+        duplicates = assign_duplicates(NewsArticle.objects.filter(link__in=[article.link for article in new]))
+
+        _, deleted = NewsArticle.objects.filter(
+            published_at__lt=timezone.now() - datetime.timedelta(days=RETENTION_DAYS),
+        ).delete()
+    pruned = deleted.get(NewsArticle._meta.label, 0)
+    if new or pruned:
+        purge(['news'])
+    logger.info(f"News ingest: {len(new)} new articles ({duplicates} near-duplicates), {pruned} pruned")
+    return len(new)
+
+
+def article_payloads(articles):
+    """
+    Stored articles in the news endpoints' format, each listing the sources
+    of its near-duplicate cluster (its own first).
+    """
+    sources = {article.pk: [{'source': article.source, 'link': article.link}] for article in articles}
+    for canonical_id, source, link in (
+        NewsArticle.objects
+        .filter(duplicate_of__in=list(sources))
+        .order_by('published_at')
+        .values_list('duplicate_of', 'source', 'link')
+    ):
+        sources[canonical_id].append({'source': source, 'link': link})
+    return [
+        {
+            'id': f'news_{article.pk}',
+            'title': article.title,
+            'description': (article.summary[:180] + '...').replace('\n', ' '),
+            'source': ', '.join(dict.fromkeys(entry['source'] for entry in sources[article.pk])),
+            'sources': sources[article.pk],
+            'timestamp': article.published_at.strftime('%B %d, %Y'),
+            'severity': article.severity,
+            'location': article.location,
+            'link': article.link,
+        }
+        for article in articles
+    ]
+
+
+def latest_articles(limit=3, max_age=datetime.timedelta(days=7)):
+    """The newest stored stories (one per near-duplicate cluster) in the news endpoint's format."""
+    rows = NewsArticle.objects.filter(
+        published_at__gte=timezone.now() - max_age, duplicate_of__isnull=True,
+    )[:limit]
+    return article_payloads(list(rows))
+
+
+def dhm_reports(now, observation=None):
+    """
+    DHM-style reports used to fill the news list, based on the latest stored
+    Kathmandu observation when there is one.
+    """
+    reports = []
+    if observation is not None:
+        current_temp = observation.temperature
+        humidity = observation.humidity or 0
+        description = observation.description.lower()
+
+        if 'rain' in description or 'thunderstorm' in description or humidity > 80:
+            reports.append({
+                'id': 'dhm_monsoon',
+                'title': f'Monsoon Activity Continues Across Nepal - {current_temp:.1f}°C in Kathmandu',
+                'description': f'Department of Hydrology and Meteorology reports active monsoon conditions with {humidity:.0f}% humidity. Current temperature in Kathmandu Valley is {current_temp:.1f}°C with ongoing precipitation patterns affecting multiple regions.',
+                'source': 'DHM Nepal',
+                'timestamp': now.strftime('%B %d, %Y'),
+                'severity': 'moderate',
+                'location': 'Nepal'
+            })
+        elif current_temp > 30:
+            reports.append({
+                'id': 'dhm_heat',
+                'title': f'Above Average Temperatures Recorded - {current_temp:.1f}°C in Capital',
+                'description': f'Weather monitoring stations across Nepal record elevated temperatures. Kathmandu Valley currently at {current_temp:.1f}°C. DHM advises precautionary measures during peak daytime hours.',
+                'source': 'DHM Nepal',
+                'timestamp': now.strftime('%B %d, %Y'),
+                'severity': 'low',
+                'location': 'Nepal'
+            })
+        elif current_temp < 15:
+            reports.append({
+                'id': 'dhm_cold',
+                'title': f'Cooler Weather Patterns Observed - {current_temp:.1f}°C in Kathmandu',
+                'description': f'Temperature readings show cooler conditions across Nepal. Kathmandu Valley currently experiencing {current_temp:.1f}°C with similar patterns in other regions.',
+                'source': 'DHM Nepal',
+                'timestamp': now.strftime('%B %d, %Y'),
+                'severity': 'low',
+                'location': 'Nepal'
+            })
+        else:
+            reports.append({
+                'id': 'dhm_normal',
+                'title': f'Stable Weather Conditions - {current_temp:.1f}°C in Kathmandu Valley',
+                'description': f'Current weather conditions remain stable across most regions. Kathmandu Valley recording {current_temp:.1f}°C with {humidity:.0f}% humidity. No significant weather warnings in effect.',
+                'source': 'DHM Nepal',
+                'timestamp': now.strftime('%B %d, %Y'),
+                'severity': 'low',
+                'location': 'Nepal'
+            })
+
+        # Add seasonal context
+        if now.month in [6, 7, 8, 9]:  # Monsoon season
+            reports.append({
+                'id': 'dhm_seasonal',
+                'title': 'Monsoon Season Weather Advisory for Nepal',
+                'description': 'Department of Hydrology and Meteorology continues monitoring monsoon patterns. Citizens advised to stay updated on local weather conditions and follow safety guidelines for flood-prone areas.',
+                'source': 'DHM Nepal',
+                'timestamp': now.strftime('%B %d, %Y'),
+                'severity': 'moderate',
+                'location': 'All Nepal'
+            })
+        elif now.month in [12, 1, 2]:  # Winter season
+            reports.append({
+                'id': 'dhm_winter',
+                'title': 'Winter Weather Monitoring Across Nepal',
+                'description': 'Cold weather patterns continue across Nepal. Mountain regions may experience significant temperature drops. DHM advises appropriate seasonal precautions.',
+                'source': 'DHM Nepal',
+                'timestamp': now.strftime('%B %d, %Y'),
+                'severity': 'low',
+                'location': 'Mountain Regions'
+            })
+
+    reports += [
+        {
+            'id': 'dhm_general',
+            'title': 'Nepal Weather Monitoring and Forecasting Services',
+            'description': 'Department of Hydrology and Meteorology provides continuous weather monitoring across all 77 districts of Nepal. Real-time data collection and analysis for public safety.',
+            'source': 'DHM Nepal',
+            'timestamp': now.strftime('%B %d, %Y'),
+            'severity': 'low',
+            'location': 'Nepal'
+        },
+        {
+            'id': 'dhm_districts',
+            'title': 'Multi-District Weather Data Collection Network',
+            'description': 'Comprehensive weather station network across Nepal continues operational monitoring. Data from mountain, hill, and Terai regions processed for accurate forecasting.',
+            'source': 'DHM Nepal',
+            'timestamp': (now - datetime.timedelta(hours=3)).strftime('%B %d, %Y'),
+            'severity': 'low',
+            'location': 'All Regions'
+        },
+    ]
+    return reports
@@ -0,0 +1,155 @@
+import math
+import re
+import threading
+import time
+from collections import Counter
+
+import numpy as np
+
+from .edge_cache import tag_versions
+from .models import NewsArticle
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+STOPWORDS = frozenset(
+    'a an and are as at be by for from has have in is it its of on or that the this to was were will with'.split()
+)
+# Title words count this many times towards an article's term frequencies
+TITLE_WEIGHT = 2
+
+
+def tokenize(text):
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+def _top(candidates, primary, secondary, k):
+    """The `k` best candidates by `primary`, ties broken by `secondary`, both descending."""
+    if len(candidates) > k > 0:
+        # Partition first so only the top k (and any ties at the cut) are sorted
+        cut = np.partition(-primary[candidates], k - 1)[k - 1]
+        candidates = candidates[-primary[candidates] <= cut]
+    return candidates[np.lexsort((-secondary[candidates], -primary[candidates]))][:k]
+
+
+class NewsIndex:
+    """
+    In-memory BM25 inverted index over stored news titles and summaries,
+    one entry per near-duplicate cluster.
+
+    Only article IDs, term frequencies, publish times and districts are kept;
+    result rows are loaded by primary key. New articles are appended as soon
+    as the ingester purges the `news` surrogate key (or every
+    `refresh_interval` seconds at the latest), and the whole index is rebuilt
+    every `max_age` seconds so pruned articles drop out.
+    """
+
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self, refresh_interval=5 * 60, max_age=6 * 3600):
+        self.refresh_interval = refresh_interval
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._built_at = 0.0
+        self._reset()
+
+    def _reset(self):
+        self._ids = []
+        self._published = []
+        self._lengths = []
+        self._postings = {}
+        self._district_docs = {}
+        self._arrays = {}
+        self._last_pk = 0
+        self._checked_at = 0.0
+        self._version = None
+
+    def _add(self, article):
+        doc = len(self._ids)
+        tokens = tokenize(article.title) * TITLE_WEIGHT + tokenize(article.summary)
+        for term, tf in Counter(tokens).items():
+            docs, tfs = self._postings.setdefault(term, ([], []))
+            docs.append(doc)
+            tfs.append(tf)
+        for district in article.districts:
+            self._district_docs.setdefault(district, []).append(doc)
+        self._ids.append(article.pk)
+        self._published.append(article.published_at.timestamp())
+        self._lengths.append(len(tokens))
+
+    def _refresh(self):
+        now = time.time()
+        version = tag_versions(['news'])
+        if version == self._version and now - self._checked_at < self.refresh_interval:
+            return
+        with self._lock:
+            if now - self._built_at >= self.max_age:
+                self._reset()
+                self._built_at = now
+            rows = (
+                NewsArticle.objects
+                .filter(pk__gt=self._last_pk, duplicate_of__isnull=True)
+                .order_by('pk')
+                .only('pk', 'title', 'summary', 'published_at', 'districts')
+            )
+            added = 0
+            for article in rows.iterator():
+                self._add(article)
+                self._last_pk = article.pk
+                added += 1
+            if added:
+                self._arrays = {}
+            self._version = version
+            self._checked_at = now
+
+    def _array(self, name, values, dtype):
+        # numpy copies of the growing lists, rebuilt after each refresh
+        if name not in self._arrays:
+            self._arrays[name] = np.asarray(values, dtype=dtype)
+        return self._arrays[name]
+
+    def search(self, query='', district=None, start=None, end=None, offset=0, limit=20):
+        """
+        (total, article IDs) for one page of results. Articles matching any
+        query term are ranked by BM25, then by recency; without a query the
+        filtered articles are returned newest first. `start`/`end` are epoch
+        seconds bounding published_at (end exclusive).
+        """
+        self._refresh()
+        with self._lock:
+            n = len(self._ids)
+            if not n:
+                return 0, []
+            ids = self._array('ids', self._ids, np.int64)
+            published = self._array('published', self._published, np.float64)
+            lengths = self._array('lengths', self._lengths, np.float64)
+
+            mask = np.ones(n, dtype=bool)
+            if district:
+                in_district = np.zeros(n, dtype=bool)
+                in_district[self._district_docs.get(district, [])] = True
+                mask &= in_district
+            if start is not None:
+                mask &= published >= start
+            if end is not None:
+                mask &= published < end
+
+            terms = set(tokenize(query or ''))
+            if terms:
+                scores = np.zeros(n)
+                norm = self.K1 * (1 - self.B + self.B * lengths / max(lengths.mean(), 1))
+                for term in terms:
+                    if term not in self._postings:
+                        continue
+                    docs = self._array(('docs', term), self._postings[term][0], np.int64)
+                    tfs = self._array(('tfs', term), self._postings[term][1], np.float64)
+                    idf = math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+                    scores[docs] += idf * tfs * (self.K1 + 1) / (tfs + norm[docs])
+                candidates = np.flatnonzero(mask & (scores > 0))
+                page = _top(candidates, scores, published, offset + limit)
+            else:
+                candidates = np.flatnonzero(mask)
+                page = _top(candidates, published, published, offset + limit)
+            return len(candidates), ids[page[offset:]].tolist()
+
+
+news_index = NewsIndex()
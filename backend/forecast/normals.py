@@ -0,0 +1,52 @@
+import calendar
+import io
+import math
+
+from django.utils import timezone
+
+from .districts import pipeline_district_name
+from .ml_files import RefreshingArtifact
+
+NORMALS_FILE = "climate_normals.csv"
+
+
+def _parse_normals(file_bytes):
+    # (District, DayOfYear) -> row of precomputed statistics, so a lookup is
+    # a single dict access
+    import pandas as pd
+
+    df = pd.read_csv(io.BytesIO(file_bytes))
+    return df.set_index(['District', 'DayOfYear']).to_dict('index')
+
+
+climate_normals = RefreshingArtifact(NORMALS_FILE, _parse_normals, max_age=24 * 3600)
+
+
+def day_of_year(date):
+    """Same fixed 366-day calendar as ml/steps/08_compute_normals.py"""
+    doy = date.timetuple().tm_yday
+    if not calendar.isleap(date.year) and date.month > 2:
+        doy += 1
+    return doy
+
+
+def get_normals(district, date=None):
+    normals = climate_normals.get()
+    if not normals or not district:
+        return None
+    date = date or timezone.localdate()
+    return normals.get((pipeline_district_name(district), day_of_year(date)))
+
+
+def temperature_anomaly(district, temp, date=None):
+    """
+    Extra response fields comparing `temp` with the district's normal for the
+    day, e.g. {"normal_temp": 18.4, "temp_anomaly": 2.1}. Empty if unknown.
+    """
+    normals = get_normals(district, date)
+    if not normals or temp is None or normals.get('temp_mean') is None or math.isnan(normals['temp_mean']):
+        return {}
+    return {
+        "normal_temp": round(normals['temp_mean'], 1),
+        "temp_anomaly": round(temp - normals['temp_mean'], 1),
+    }
@@ -0,0 +1,175 @@
+import datetime
+import logging
+
+from django.db import DatabaseError, transaction
+from django.db.models import F, FloatField, Max, Sum
+from django.db.models.functions import TruncDay, TruncHour
+from django.utils import timezone
+
+from .buffered_writer import BufferedWriter
+from .models import Weather
+
+logger = logging.getLogger(__name__)
+
+UPSERT_FIELDS = ['temperature', 'description', 'date', 'humidity', 'wind_speed',
+                 'latitude', 'longitude', 'source', 'sample_count']
+
+
+def _write_observations(rows):
+    # Postgres refuses to upsert the same key twice in one statement, so
+    # keep only the last reading per (city, observed_at) in the batch
+    latest = {}
+    for row in rows:
+        latest[(row.city, row.observed_at, row.granularity)] = row
+    try:
+        with transaction.atomic():
+            _upsert(list(latest.values()))
+    except DatabaseError as e:
+        # One bad row (e.g. an over-long city on Postgres) fails the whole
+        # statement; write the rest one by one and drop only the bad ones
+        logger.warning(f"Observation batch failed ({e}); retrying row by row")
+        for row in latest.values():
+            try:
+                with transaction.atomic():
+                    _upsert([row])
+            except DatabaseError as e:
+                logger.error(f"Dropped observation for {row.city!r}: {e}")
+
+
+def _upsert(rows):
+    Weather.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=['city', 'observed_at', 'granularity'],
+        update_fields=UPSERT_FIELDS,
+    )
+
+
+observation_writer = BufferedWriter(_write_observations, name='observation-writer')
+
+
+def record_observation(city, weather, lat=None, lon=None, source='openweather'):
+    """
+    Queue one upstream observation for storage. Never blocks on the database.
+
+    `weather` is the dict returned by the OpenWeather helpers; `observed_at`
+    is the provider's own timestamp (epoch seconds) when available, so the
+    same reading fetched twice collapses into one row.
+    """
+    if not city or not weather or weather.get('temp') is None:
+        return
+    observed_epoch = weather.get('observed_at')
+    if observed_epoch:
+        observed_at = datetime.datetime.fromtimestamp(observed_epoch, tz=datetime.timezone.utc)
+    else:
+        observed_at = timezone.now().replace(microsecond=0)
+    observation_writer.submit(Weather(
+        city=city,
+        temperature=weather['temp'],
+        description=weather.get('description') or '',
+        date=observed_at.date(),
+        observed_at=observed_at,
+        humidity=weather.get('humidity'),
+        wind_speed=weather.get('wind_speed'),
+        latitude=float(lat) if lat else None,
+        longitude=float(lon) if lon else None,
+        source=source,
+    ))
+
+
+def recent_observation(city, max_age=datetime.timedelta(hours=1)):
+    """Latest raw observation for `city` newer than `max_age`, or None."""
+    return (
+        Weather.objects
+        .filter(city=city, granularity=Weather.RAW, observed_at__gte=timezone.now() - max_age)
+        .order_by('-observed_at')
+        .first()
+    )
+
+
+def latest_observations(cities, max_age=datetime.timedelta(hours=3)):
+    """Newest raw observation per city among `cities`, as {city: Weather}."""
+    latest = {}
+    rows = (
+        Weather.objects
+        .filter(city__in=list(cities), granularity=Weather.RAW, observed_at__gte=timezone.now() - max_age)
+        .order_by('city', '-observed_at')
+    )
+    for row in rows.iterator():
+        latest.setdefault(row.city, row)
+    return latest
+
+
+def _downsample(source_granularity, target_granularity, trunc, cutoff):
+    """
+    Fold every `source_granularity` row older than `cutoff` into one
+    `target_granularity` row per city and bucket. Averages are weighted by
+    sample_count so repeated compaction doesn't skew them.
+    """
+    old_rows = Weather.objects.filter(granularity=source_granularity, observed_at__lt=cutoff)
+    buckets = (
+        old_rows
+        .annotate(bucket=trunc('observed_at'))
+        .values('city', 'bucket')
+        .annotate(
+            samples=Sum('sample_count'),
+            temp_sum=Sum(F('temperature') * F('sample_count'), output_field=FloatField()),
+            humidity_sum=Sum(F('humidity') * F('sample_count'), output_field=FloatField()),
+            wind_sum=Sum(F('wind_speed') * F('sample_count'), output_field=FloatField()),
+            description=Max('description'),
+            latitude=Max('latitude'),
+            longitude=Max('longitude'),
+            source=Max('source'),
+        )
+    )
+    compacted = [
+        Weather(
+            city=b['city'],
+            temperature=b['temp_sum'] / b['samples'],
+            description=b['description'] or '',
+            date=b['bucket'].date(),
+            observed_at=b['bucket'],
+            humidity=b['humidity_sum'] / b['samples'] if b['humidity_sum'] is not None else None,
+            wind_speed=b['wind_sum'] / b['samples'] if b['wind_sum'] is not None else None,
+            latitude=b['latitude'],
+            longitude=b['longitude'],
+            source=b['source'],
+            granularity=target_granularity,
+            sample_count=b['samples'],
+        )
+        for b in buckets
+    ]
+    with transaction.atomic():
+        Weather.objects.bulk_create(
+            compacted,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=['city', 'observed_at', 'granularity'],
+            update_fields=UPSERT_FIELDS,
+        )
+        deleted, _ = old_rows.delete()
+    return len(compacted), deleted
+
+
+def compact_observations(raw_days=7, hourly_days=90, daily_days=3650):
+    """
+    Retention and downsampling for the observation store:
+    raw rows older than `raw_days` become hourly averages, hourly rows older
+    than `hourly_days` become daily averages, and daily rows older than
+    `daily_days` are dropped.
+    """
+    now = timezone.now()
+    # Cutoffs are aligned to bucket boundaries so a bucket is always compacted
+    # in a single run and never split across two target rows
+    hour_cutoff = (now - datetime.timedelta(days=raw_days)).replace(minute=0, second=0, microsecond=0)
+    day_cutoff = (now - datetime.timedelta(days=hourly_days)).replace(hour=0, minute=0, second=0, microsecond=0)
+
+    stats = {}
+    stats['hourly_created'], stats['raw_deleted'] = _downsample(Weather.RAW, Weather.HOUR, TruncHour, hour_cutoff)
+    stats['daily_created'], stats['hourly_deleted'] = _downsample(Weather.HOUR, Weather.DAY, TruncDay, day_cutoff)
+    stats['daily_deleted'], _ = Weather.objects.filter(
+        granularity=Weather.DAY,
+        observed_at__lt=now - datetime.timedelta(days=daily_days),
+    ).delete()
+    logger.info(f"Observation compaction finished: {stats}")
+    return stats
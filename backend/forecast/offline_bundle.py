@@ -0,0 +1,111 @@
+import datetime
+import hashlib
+import json
+import threading
+import time
+
+from .accuracy import prediction_confidence
+from .alerts import cached_alerts
+from .district_layer import cached_aqi
+from .districts import DISTRICT_GEOLOCATION_MAP
+from .predictions import get_ml_forecast, get_prediction
+from .snapshot import district_snapshot
+from .tiered_cache import tiered_cache
+
+# Bundle state shared by every worker: {version, built_at, hashes, changed_at, entries}
+BUNDLE_STATE_KEY = "state"
+BUNDLE_STATE_TIMEOUT = 24 * 3600
+# The entries are recomputed at most this often
+BUNDLE_REBUILD_SECONDS = 60
+bundle_cache = tiered_cache.namespace(
+    'offline_bundle', BUNDLE_STATE_TIMEOUT, local_timeout=BUNDLE_REBUILD_SECONDS,
+)
+
+_rebuild_lock = threading.Lock()
+
+
+def district_entry(district, snapshot, aqi, alerts):
+    """Everything the PWA shows for one district while offline."""
+    current = dict(snapshot.get(district) or {})
+    if current.get("observed_at"):
+        current["observed_at"] = current["observed_at"].isoformat()
+    prediction = get_prediction(district)
+    if prediction:
+        prediction = {
+            "date": prediction["date"].isoformat(),
+            "predicted_temp": prediction["predicted_temp"],
+            "confidence": prediction_confidence(district),
+        }
+    return {
+        "current": current or None,
+        "aqi": aqi.get(district),
+        "prediction": prediction,
+        "forecast": get_ml_forecast(district),
+        "alerts": alerts.get(district, []),
+    }
+
+
+def _entry_hash(entry):
+    return hashlib.md5(json.dumps(entry, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _rebuild(state):
+    """
+    Recompute every entry and bump the version for the ones whose content
+    changed. Versions are epoch seconds, so they keep increasing even if
+    the cached state is evicted and rebuilt from scratch.
+    """
+    snapshot = district_snapshot()
+    aqi = cached_aqi()
+    alerts = cached_alerts()
+    entries = {district: district_entry(district, snapshot, aqi, alerts) for district in DISTRICT_GEOLOCATION_MAP}
+    hashes = {district: _entry_hash(entry) for district, entry in entries.items()}
+
+    changed = [d for d in entries if not state or state["hashes"].get(d) != hashes[d]]
+    version = state["version"] if state else 0
+    if changed:
+        version = max(version + 1, int(time.time()))
+    changed_at = dict(state["changed_at"]) if state else {}
+    changed_at.update({district: version for district in changed})
+
+    return {
+        "version": version,
+        "built_at": time.time(),
+        "hashes": hashes,
+        "changed_at": changed_at,
+        "entries": entries,
+    }
+
+
+def bundle_state():
+    state = bundle_cache.get(BUNDLE_STATE_KEY)
+    if state and time.time() - state["built_at"] < BUNDLE_REBUILD_SECONDS:
+        return state
+    with _rebuild_lock:
+        state = bundle_cache.get(BUNDLE_STATE_KEY)
+        if state and time.time() - state["built_at"] < BUNDLE_REBUILD_SECONDS:
+            return state
+        state = _rebuild(state)
+        bundle_cache.set(BUNDLE_STATE_KEY, state)
+    return state
+
+
+def bundle_payload(since=None):
+    """
+    The offline bundle as a dict. With `since` (a version the client already
+    holds) only the districts changed after it are included; a `since` the
+    server does not know (newer than the current version, e.g. after the
+    state was lost) gets the full bundle.
+    """
+    state = bundle_state()
+    full = since is None or since > state["version"]
+    entries = state["entries"]
+    if not full:
+        entries = {d: entry for d, entry in entries.items() if state["changed_at"].get(d, 0) > since}
+    return {
+        "version": state["version"],
+        "full": full,
+        "since": None if full else since,
+        "generated_at": datetime.datetime.fromtimestamp(state["built_at"], datetime.timezone.utc).isoformat(),
+        "entries": entries,
+    }
@@ -0,0 +1,53 @@
+import io
+import json
+
+from .districts import pipeline_district_name
+from .edge_cache import purge
+from .ml_files import RefreshingArtifact
+
+PREDICTION_FILE = "predictions.csv"
+HORIZONS_FILE = "forecast_horizons.json"
+
+
+def _parse_predictions(file_bytes):
+    import pandas as pd
+
+    # Only the newest row per district is ever served, so keep just that
+    df = pd.read_csv(io.BytesIO(file_bytes))
+    df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
+    df = df.dropna(subset=['Date'])
+    latest = df.sort_values('Date').groupby('District').tail(1)
+    return {
+        row['District']: {
+            "date": row['Date'].date(),
+            "predicted_temp": round(float(row['predicted_Temp_2m_tomorrow']), 2),
+        }
+        for row in latest.to_dict('records')
+    }
+
+
+def _purge_predictions():
+    # A new pipeline run was published; everything showing predictions is stale
+    purge(['prediction', 'snapshot', 'offline_bundle'])
+
+
+latest_predictions = RefreshingArtifact(PREDICTION_FILE, _parse_predictions, max_age=3600, on_change=_purge_predictions)
+
+
+def get_prediction(district):
+    """Latest batch prediction for `district`, or None."""
+    predictions = latest_predictions.get()
+    if not predictions:
+        return None
+    return predictions.get(pipeline_district_name(district))
+
+
+forecast_horizons = RefreshingArtifact(HORIZONS_FILE, json.loads, max_age=3600, on_change=_purge_predictions)
+
+
+def get_ml_forecast(district):
+    """Day+1..day+5 batch forecast for `district` as {"base_date", "forecast"}, or None."""
+    horizons = forecast_horizons.get()
+    if not horizons:
+        return None
+    return horizons.get('districts', {}).get(pipeline_district_name(district))
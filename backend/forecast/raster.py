@@ -0,0 +1,174 @@
+import datetime
+import hashlib
+import io
+import json
+import logging
+import os
+from functools import lru_cache
+
+import numpy as np
+from django.conf import settings
+
+from .districts import DISTRICT_GEOLOCATION_MAP
+from .edge_cache import purge
+from .predictions import get_prediction
+from .snapshot import district_snapshot
+
+logger = logging.getLogger(__name__)
+
+# Fixed grid over Nepal; rows run north to south so row 0 is the top of an image
+GRID_STEP = 0.05
+GRID_LAT = np.round(np.arange(30.50, 26.30 - 1e-9, -GRID_STEP), 4)
+GRID_LON = np.round(np.arange(80.00, 88.25 + 1e-9, GRID_STEP), 4)
+IDW_POWER = 2
+LAYERS = ('current', 'predicted')
+
+# Binary encoding: little-endian int16 in tenths of a degree
+BINARY_SCALE = 10
+BINARY_NODATA = -32768
+
+# PNG colour ramp (degrees C -> RGB)
+COLOR_STOPS = np.array([-20.0, 0.0, 10.0, 20.0, 30.0, 40.0])
+COLOR_VALUES = np.array([
+    [49, 54, 149],
+    [69, 117, 180],
+    [171, 217, 233],
+    [254, 224, 144],
+    [244, 109, 67],
+    [165, 0, 38],
+], dtype=np.float64)
+
+
+@lru_cache(maxsize=1)
+def idw_weights():
+    """
+    Inverse-distance weights from every district centroid to every grid cell,
+    as a (cells, districts) float32 matrix. Computed once per process, so
+    each refresh is a matrix-vector product rather than a distance loop.
+    """
+    names = list(DISTRICT_GEOLOCATION_MAP)
+    station_lat = np.array([DISTRICT_GEOLOCATION_MAP[n]['latitude'] for n in names])
+    station_lon = np.array([DISTRICT_GEOLOCATION_MAP[n]['longitude'] for n in names])
+
+    cell_lat, cell_lon = np.meshgrid(GRID_LAT, GRID_LON, indexing='ij')
+    cell_lat = cell_lat.ravel()[:, None]
+    cell_lon = cell_lon.ravel()[:, None]
+
+    # Equirectangular distance in km is plenty accurate at this scale
+    dy = (cell_lat - station_lat[None, :]) * 111.0
+    dx = (cell_lon - station_lon[None, :]) * 111.0 * np.cos(np.radians(cell_lat))
+    dist_sq = np.maximum(dx * dx + dy * dy, 1e-6)
+    weights = dist_sq ** (-IDW_POWER / 2)
+    return names, weights.astype(np.float32)
+
+
+def interpolate(values_by_district):
+    """IDW-interpolate {district: value} onto the grid. None if no values."""
+    names, weights = idw_weights()
+    values = np.array([values_by_district.get(n, np.nan) for n in names], dtype=np.float32)
+    known = ~np.isnan(values)
+    if not known.any():
+        return None
+    # Districts without a value drop out by zeroing their term; dividing by
+    # the weight mass of the known districts renormalises every cell
+    numerator = weights @ np.where(known, values, 0.0).astype(np.float32)
+    denominator = weights @ known.astype(np.float32)
+    return (numerator / denominator).reshape(len(GRID_LAT), len(GRID_LON))
+
+
+def encode_binary(grid):
+    scaled = np.where(np.isnan(grid), BINARY_NODATA, np.round(grid * BINARY_SCALE))
+    return scaled.astype('<i2').tobytes()
+
+
+def encode_png(grid):
+    from PIL import Image
+
+    rgb = np.stack([
+        np.interp(grid, COLOR_STOPS, COLOR_VALUES[:, channel]) for channel in range(3)
+    ], axis=-1)
+    alpha = np.where(np.isnan(grid), 0, 255)[..., None]
+    pixels = np.concatenate([rgb, alpha], axis=-1).astype(np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels, mode='RGBA').save(buffer, format='PNG', optimize=True)
+    return buffer.getvalue()
+
+
+def raster_metadata(layer):
+    return {
+        "layer": layer,
+        "shape": [len(GRID_LAT), len(GRID_LON)],
+        "lat_max": float(GRID_LAT[0]),
+        "lat_min": float(GRID_LAT[-1]),
+        "lon_min": float(GRID_LON[0]),
+        "lon_max": float(GRID_LON[-1]),
+        "step": GRID_STEP,
+        "scale": BINARY_SCALE,
+        "nodata": BINARY_NODATA,
+    }
+
+
+def raster_path(layer, fmt):
+    return os.path.join(settings.WEATHERWAVE_DATA_DIR, f"temperature_{layer}.{fmt}")
+
+
+def _write_atomic(path, data):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def layer_values(layer):
+    if layer == 'current':
+        return {district: obs['temp'] for district, obs in district_snapshot().items()}
+    values = {}
+    for district in DISTRICT_GEOLOCATION_MAP:
+        prediction = get_prediction(district)
+        if prediction:
+            values[district] = prediction['predicted_temp']
+    return values
+
+
+def refresh_rasters():
+    """Rebuild every raster layer and write it to WEATHERWAVE_DATA_DIR."""
+    os.makedirs(settings.WEATHERWAVE_DATA_DIR, exist_ok=True)
+    written, changed = [], []
+    for layer in LAYERS:
+        grid = interpolate(layer_values(layer))
+        if grid is None:
+            logger.warning(f"No values for raster layer '{layer}', keeping the previous one")
+            continue
+        binary = encode_binary(grid)
+        meta = raster_metadata(layer)
+        meta["generated_at"] = datetime.datetime.now(datetime.timezone.utc).isoformat()
+        meta["etag"] = hashlib.md5(binary).hexdigest()
+        previous, _ = read_raster(layer, 'json')
+        _write_atomic(raster_path(layer, 'bin'), binary)
+        _write_atomic(raster_path(layer, 'png'), encode_png(grid))
+        _write_atomic(raster_path(layer, 'json'), json.dumps(meta).encode())
+        written.append(layer)
+        if not previous or json.loads(previous).get("etag") != meta["etag"]:
+            changed.append(f"raster:{layer}")
+    purge(changed)
+    return written
+
+
+_file_cache = {}
+
+
+def read_raster(layer, fmt):
+    """(bytes, etag) for a generated raster file, or (None, None) if missing."""
+    path = raster_path(layer, fmt)
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None, None
+    cached = _file_cache.get(path)
+    if cached and cached[0] == stat.st_mtime_ns:
+        return cached[1], cached[2]
+    with open(path, 'rb') as f:
+        data = f.read()
+    etag = hashlib.md5(data).hexdigest()
+    _file_cache[path] = (stat.st_mtime_ns, data, etag)
+    return data, etag
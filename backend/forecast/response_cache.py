@@ -0,0 +1,174 @@
+import gzip
+import hashlib
+import time
+from functools import wraps
+
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import http_date, parse_http_date_safe
+
+from .edge_cache import tag_versions
+from .tiered_cache import tiered_cache
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+# Entries are keyed by their tags' versions, so a purge is seen as soon as
+# those versions are; each call passes its own lifetime
+response_cache = tiered_cache.namespace('response', timeout=None, local_timeout=60)
+# Headers regenerated for every served variant rather than replayed
+ENCODING_HEADERS = {'content-type', 'content-length', 'content-encoding', 'vary',
+                    'etag', 'last-modified', 'cache-control'}
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_SIZE = 256
+
+
+def _encoders():
+    encoders = {'gzip': lambda body: gzip.compress(body, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        encoders['br'] = lambda body: brotli.compress(body, quality=11)
+    return encoders
+
+
+def accepted_encodings(request):
+    """Content codings the client accepts, ignoring any with q=0."""
+    accepted = set()
+    for part in request.headers.get('Accept-Encoding', '').split(','):
+        coding, _, params = part.strip().partition(';')
+        q = params.strip()
+        if q.startswith('q=') and q[2:].strip() in ('0', '0.0', '0.00', '0.000'):
+            continue
+        if coding:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def _cache_key(request, versions=()):
+    # The Accept header picks the renderer, so it is part of the key; the
+    # surrogate key versions change on purge, which orphans the old entry
+    raw = "|".join([request.path, request.GET.urlencode(), request.headers.get('Accept', ''), repr(versions)])
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def encode_response(response, timeout):
+    """
+    The rendered body of `response` in every available content coding, with
+    its validators: {"content_type", "headers", "variants", "etag",
+    "generated_at", "expires_at"}. `variants` maps identity/gzip/br to bytes.
+    """
+    body = response.content
+    variants = {'identity': body}
+    if len(body) >= MIN_COMPRESS_SIZE:
+        for coding, compress in _encoders().items():
+            encoded = compress(body)
+            if len(encoded) < len(body):
+                variants[coding] = encoded
+    headers = {name: value for name, value in response.items() if name.lower() not in ENCODING_HEADERS}
+    now = int(time.time())
+    return {
+        "content_type": response['Content-Type'],
+        "headers": headers,
+        "variants": variants,
+        # Weak: the same ETag is served for every content coding
+        "etag": f'W/"{hashlib.md5(body).hexdigest()}"',
+        "generated_at": now,
+        "expires_at": now + timeout,
+    }
+
+
+def etag_matches(header, etag):
+    """If-None-Match comparison: weak, and against every tag in the list."""
+    if header.strip() == '*':
+        return True
+    opaque = etag.removeprefix('W/')
+    return any(tag.strip().removeprefix('W/') == opaque for tag in header.split(','))
+
+
+def is_not_modified(request, entry):
+    """RFC 9110 rules: If-None-Match wins over If-Modified-Since when present."""
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match:
+        return etag_matches(if_none_match, entry["etag"])
+    since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+    return since is not None and entry["generated_at"] <= since
+
+
+def _set_validators(response, entry, stale_while_revalidate):
+    # Clients may reuse the body for as long as the server-side copy lives
+    max_age = max(entry["expires_at"] - int(time.time()), 0)
+    response['ETag'] = entry["etag"]
+    response['Last-Modified'] = http_date(entry["generated_at"])
+    response['Cache-Control'] = f'public, max-age={max_age}, stale-while-revalidate={stale_while_revalidate}'
+    response['Vary'] = 'Accept, Accept-Encoding'
+    return response
+
+
+def serve_encoded(request, entry, stale_while_revalidate=0):
+    """A 304 when the client's copy is current, else the best encoded variant."""
+    if is_not_modified(request, entry):
+        return _set_validators(HttpResponseNotModified(), entry, stale_while_revalidate)
+
+    accepted = accepted_encodings(request)
+    variants = entry["variants"]
+    # Prefer the smallest variant the client can decode
+    coding = next((c for c in ('br', 'gzip') if c in variants and c in accepted), 'identity')
+    response = HttpResponse(variants[coding], content_type=entry["content_type"])
+    for name, value in entry["headers"].items():
+        response[name] = value
+    if coding != 'identity':
+        response['Content-Encoding'] = coding
+    return _set_validators(response, entry, stale_while_revalidate)
+
+
+def cached_response(timeout, stale_while_revalidate=None, surrogate_keys=None, edge_max_age=None):
+    """
+    Cache a GET view's final bytes, already compressed, for `timeout`
+    seconds. Apply it above @api_view so the cached bytes are the rendered
+    output; hits skip the view, serialization and compression entirely, and
+    a matching If-None-Match / If-Modified-Since gets a 304. Responses carry
+    ETag, Last-Modified and Cache-Control with `stale_while_revalidate`
+    (default: `timeout`). Only 200 responses are cached.
+
+    `surrogate_keys(request)` lists the response's tags (see
+    edge_cache.surrogate_keys); they are sent as Surrogate-Key, with
+    Surrogate-Control allowing an edge cache to keep the response for
+    `edge_max_age` seconds (default: `timeout`) or until a tag is purged.
+    A view can shorten that for one response by setting Surrogate-Control
+    itself.
+    """
+    if stale_while_revalidate is None:
+        stale_while_revalidate = timeout
+    if edge_max_age is None:
+        edge_max_age = timeout
+
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if request.method != 'GET':
+                return view(request, *args, **kwargs)
+
+            tags = surrogate_keys(request) if surrogate_keys else []
+            key = _cache_key(request, tag_versions(tags))
+            entry = response_cache.get(key)
+            # A local copy can outlive the shared entry it was read from
+            if entry is not None and entry["expires_at"] > time.time():
+                response = serve_encoded(request, entry, stale_while_revalidate)
+                response['X-Cache'] = 'HIT'
+                return response
+
+            response = view(request, *args, **kwargs)
+            if response.status_code != 200 or response.streaming:
+                return response
+            if hasattr(response, 'render'):
+                response.render()
+            if tags:
+                response['Surrogate-Key'] = ' '.join(tags)
+                response.setdefault('Surrogate-Control', f'max-age={edge_max_age}')
+            entry = encode_response(response, timeout)
+            response_cache.set(key, entry, timeout)
+            response = serve_encoded(request, entry, stale_while_revalidate)
+            response['X-Cache'] = 'MISS'
+            return response
+        return wrapped
+    return decorator
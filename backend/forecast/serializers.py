@@ -3,7 +3,9 @@ from .models import Weather
 class WeatherSerializer(serializers.ModelSerializer):
     class Meta:
         model = Weather
-        fields = ['id', 'city', 'temperature', 'description', 'date']
+        fields = ['id', 'city', 'temperature', 'description', 'date', 'observed_at',
+                  'humidity', 'wind_speed', 'latitude', 'longitude', 'source',
+                  'granularity', 'sample_count']
         read_only_fields = ['id']
     
     def validate_temperature(self, value):
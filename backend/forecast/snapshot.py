@@ -0,0 +1,59 @@
+import datetime
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from .districts import DISTRICT_GEOLOCATION_MAP
+from .edge_cache import data_tag, purge
+from .observations import latest_observations, observation_writer, record_observation
+
+logger = logging.getLogger(__name__)
+
+# Observations older than this are refreshed from upstream by the job
+SNAPSHOT_MAX_AGE = datetime.timedelta(minutes=30)
+
+
+def district_snapshot(max_age=datetime.timedelta(hours=3)):
+    """Latest stored conditions for every district: {district: {...}}."""
+    return {
+        district: {
+            "temp": row.temperature,
+            "humidity": row.humidity,
+            "wind_speed": row.wind_speed,
+            "description": row.description,
+            "observed_at": row.observed_at,
+        }
+        for district, row in latest_observations(DISTRICT_GEOLOCATION_MAP, max_age).items()
+    }
+
+
+def refresh_district_snapshot(max_workers=8):
+    """
+    Fetch current conditions for every district whose stored observation is
+    older than SNAPSHOT_MAX_AGE, in parallel, and write them to the store.
+    Returns the list of districts that were refreshed.
+    """
+    from .views import get_weather
+
+    api_key = os.getenv('OPENWEATHER_API_KEY')
+    if not api_key:
+        logger.error("OpenWeather API key not configured; district snapshot not refreshed")
+        return []
+
+    fresh = latest_observations(DISTRICT_GEOLOCATION_MAP, SNAPSHOT_MAX_AGE)
+    stale = [district for district in DISTRICT_GEOLOCATION_MAP if district not in fresh]
+
+    def fetch(district):
+        geo = DISTRICT_GEOLOCATION_MAP[district]
+        weather = get_weather(geo['latitude'], geo['longitude'], api_key)
+        if weather:
+            record_observation(district, weather, geo['latitude'], geo['longitude'])
+        return district if weather else None
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        refreshed = [district for district in pool.map(fetch, stale) if district]
+    observation_writer.flush()
+    logger.info(f"Refreshed {len(refreshed)}/{len(stale)} stale districts")
+    if refreshed:
+        purge([data_tag('current', district) for district in refreshed] + ['snapshot', 'offline_bundle'])
+    return refreshed
@@ -0,0 +1,247 @@
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache as shared_cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+# Namespace versions live in the shared cache; each process rereads them at
+# most this often, which bounds how long another worker's invalidation
+# takes to be seen here
+VERSION_CHECK_SECONDS = 2
+# Per-process counters are added to the shared totals this often
+STATS_FLUSH_SECONDS = 30
+STATS_KINDS = ('local_hits', 'shared_hits', 'misses', 'sets')
+
+_MISSING = object()
+
+
+def shared_cache_is_process_local():
+    """
+    True when CACHES['default'] is not shared between processes (no
+    REDIS_URL), so nothing a background job caches, logs or purges is seen
+    by the web workers.
+    """
+    return isinstance(caches['default'], (LocMemCache, DummyCache))
+
+
+def _version_key(namespace):
+    return f"cache_ns_version:{namespace}"
+
+
+def _stats_key(namespace, kind):
+    return f"cache_stats:{namespace}:{kind}"
+
+
+def _incr(key, delta):
+    # incr() raises ValueError for missing keys on most backends
+    try:
+        shared_cache.incr(key, delta)
+    except ValueError:
+        if not shared_cache.add(key, delta, None):
+            shared_cache.incr(key, delta)
+
+
+class TieredCache:
+    """
+    A bounded in-process LRU in front of Django's shared cache.
+
+    Values are grouped in namespaces. Keys are versioned by namespace, so
+    invalidating a namespace is a single version bump; the stale entries in
+    every tier simply stop being reachable and age out. A local hit costs a
+    dictionary lookup; a local miss falls through to the shared cache (Redis
+    when REDIS_URL is set) and fills the local tier, so one worker's fetch
+    warms every other worker's second tier.
+
+    Values are shared between the callers in a process, so they must not
+    be mutated after being stored.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.namespaces = {}
+        self._local = OrderedDict()
+        self._versions = {}
+        self._stats = {}
+        self._flushed_at = time.time()
+        self._lock = threading.Lock()
+
+    def namespace(self, name, timeout, local_timeout=None):
+        """
+        The namespace `name` with its default lifetimes: `timeout` in the
+        shared cache (None: no expiry) and `local_timeout` in this process
+        (default: the same). Keep `local_timeout` short for values that
+        other processes overwrite by key.
+        """
+        if name not in self.namespaces:
+            self.namespaces[name] = CacheNamespace(self, name, timeout, local_timeout)
+        return self.namespaces[name]
+
+    def invalidate(self, *names):
+        """Drop every entry of the given namespaces, in all processes."""
+        for name in names:
+            _incr(_version_key(name), 1)
+        with self._lock:
+            for name in names:
+                self._versions.pop(name, None)
+
+    def version(self, name):
+        now = time.time()
+        with self._lock:
+            cached = self._versions.get(name)
+            if cached and now - cached[1] < VERSION_CHECK_SECONDS:
+                return cached[0]
+        version = shared_cache.get(_version_key(name), 0)
+        with self._lock:
+            self._versions[name] = (version, now)
+        return version
+
+    def _local_get(self, key):
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return _MISSING
+            if entry[1] is not None and entry[1] <= time.time():
+                del self._local[key]
+                return _MISSING
+            self._local.move_to_end(key)
+            return entry[0]
+
+    def _local_set(self, key, value, timeout):
+        expires = None if timeout is None else time.time() + timeout
+        with self._lock:
+            self._local[key] = (value, expires)
+            self._local.move_to_end(key)
+            while len(self._local) > self.max_entries:
+                self._local.popitem(last=False)
+
+    def _local_delete(self, key):
+        with self._lock:
+            self._local.pop(key, None)
+
+    def _count(self, name, kind, n=1):
+        flush = None
+        with self._lock:
+            self._stats.setdefault(name, Counter())[kind] += n
+            if time.time() - self._flushed_at >= STATS_FLUSH_SECONDS:
+                flush, self._stats = self._stats, {}
+                self._flushed_at = time.time()
+        if flush:
+            self._flush(flush)
+
+    def _flush(self, stats):
+        for name, counts in stats.items():
+            for kind, n in counts.items():
+                if n:
+                    _incr(_stats_key(name, kind), n)
+
+    def local_stats(self):
+        """Counts since the last flush in this process, per namespace."""
+        with self._lock:
+            return {name: dict(counts) for name, counts in self._stats.items()}
+
+    def shared_stats(self, names=None):
+        """Flushed totals from every process, per namespace."""
+        names = list(names or self.namespaces)
+        keys = {_stats_key(name, kind): (name, kind) for name in names for kind in STATS_KINDS}
+        totals = {name: dict.fromkeys(STATS_KINDS, 0) for name in names}
+        for key, value in shared_cache.get_many(list(keys)).items():
+            name, kind = keys[key]
+            totals[name][kind] = value
+        return totals
+
+    def reset_stats(self, names=None):
+        with self._lock:
+            self._stats = {}
+        shared_cache.delete_many([_stats_key(name, kind) for name in (names or self.namespaces) for kind in STATS_KINDS])
+
+
+class CacheNamespace:
+    """get/set/delete on one namespace of a TieredCache."""
+
+    def __init__(self, tiered, name, timeout, local_timeout):
+        self.tiered = tiered
+        self.name = name
+        self.timeout = timeout
+        self.local_timeout = timeout if local_timeout is None else local_timeout
+
+    def _key(self, key, version=None):
+        # Shared cache keys must not contain spaces ("Eastern Rukum")
+        version = self.tiered.version(self.name) if version is None else version
+        return f"{self.name}:{version}:{str(key).replace(' ', '_')}"
+
+    def _local_timeout(self, timeout):
+        if timeout is None:
+            return self.local_timeout
+        return timeout if self.local_timeout is None else min(timeout, self.local_timeout)
+
+    def get(self, key, default=None):
+        full_key = self._key(key)
+        value = self.tiered._local_get(full_key)
+        if value is not _MISSING:
+            self.tiered._count(self.name, 'local_hits')
+            return value
+        value = shared_cache.get(full_key, _MISSING)
+        if value is _MISSING:
+            self.tiered._count(self.name, 'misses')
+            return default
+        self.tiered._count(self.name, 'shared_hits')
+        self.tiered._local_set(full_key, value, self.local_timeout)
+        return value
+
+    def get_many(self, keys):
+        version = self.tiered.version(self.name)
+        full_keys = {self._key(key, version): key for key in keys}
+        found, remote = {}, []
+        for full_key, key in full_keys.items():
+            value = self.tiered._local_get(full_key)
+            if value is _MISSING:
+                remote.append(full_key)
+            else:
+                found[key] = value
+        shared = shared_cache.get_many(remote) if remote else {}
+        for full_key, value in shared.items():
+            found[full_keys[full_key]] = value
+            self.tiered._local_set(full_key, value, self.local_timeout)
+        self.tiered._count(self.name, 'local_hits', len(full_keys) - len(remote))
+        self.tiered._count(self.name, 'shared_hits', len(shared))
+        self.tiered._count(self.name, 'misses', len(remote) - len(shared))
+        return found
+
+    def set(self, key, value, timeout=_MISSING):
+        timeout = self.timeout if timeout is _MISSING else timeout
+        full_key = self._key(key)
+        shared_cache.set(full_key, value, timeout)
+        self.tiered._local_set(full_key, value, self._local_timeout(timeout))
+        self.tiered._count(self.name, 'sets')
+
+    def set_many(self, mapping, timeout=_MISSING):
+        timeout = self.timeout if timeout is _MISSING else timeout
+        version = self.tiered.version(self.name)
+        full = {self._key(key, version): value for key, value in mapping.items()}
+        shared_cache.set_many(full, timeout)
+        for full_key, value in full.items():
+            self.tiered._local_set(full_key, value, self._local_timeout(timeout))
+        self.tiered._count(self.name, 'sets', len(full))
+
+    def delete(self, key):
+        full_key = self._key(key)
+        shared_cache.delete(full_key)
+        self.tiered._local_delete(full_key)
+
+    def get_or_set(self, key, compute, timeout=_MISSING):
+        """The cached value for `key`, computing and storing it on a miss (None is not stored)."""
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            if value is not None:
+                self.set(key, value, timeout)
+        return value
+
+    def invalidate(self):
+        self.tiered.invalidate(self.name)
+
+
+tiered_cache = TieredCache(max_entries=settings.CACHE_LOCAL_MAX_ENTRIES)
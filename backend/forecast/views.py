@@ -4,96 +4,67 @@ from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework import status
 import requests
-from dotenv import load_dotenv
 import os
 import datetime
-import pandas as pd
 import io
 import re
+import gzip
+import asyncio
+import logging
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 
-# Define a manual dictionary for districts with their latitude and longitude
-DISTRICT_GEOLOCATION_MAP = {
-    "Achham": {"latitude": 29.1200, "longitude": 81.3000},
-    "Arghakhanchi": {"latitude": 27.9500, "longitude": 83.2000},
-    "Baglung": {"latitude": 28.2667, "longitude": 83.6167},
-    "Baitadi": {"latitude": 29.5167, "longitude": 80.5500},
-    "Bajhang": {"latitude": 29.8333, "longitude": 81.2500},
-    "Bajura": {"latitude": 29.4000, "longitude": 81.5000},
-    "Banke": {"latitude": 28.0500, "longitude": 81.6167},
-    "Bara": {"latitude": 27.2167, "longitude": 85.0167},
-    "Bardiya": {"latitude": 28.3000, "longitude": 81.4167},
-    "Bhaktapur": {"latitude": 27.6710, "longitude": 85.4298},
-    "Bhojpur": {"latitude": 27.1700, "longitude": 87.0500},
-    "Chitwan": {"latitude": 27.5291, "longitude": 84.3542},
-    "Dadeldhura": {"latitude": 29.3000, "longitude": 80.5833},
-    "Dailekh": {"latitude": 28.8442, "longitude": 81.7101},
-    "Dang": {"latitude": 28.0500, "longitude": 82.3000},
-    "Darchula": {"latitude": 30.1500, "longitude": 80.5833},
-    "Dhading": {"latitude": 27.9000, "longitude": 84.9167},
-    "Dhankuta": {"latitude": 26.9833, "longitude": 87.3500},
-    "Dhanusha": {"latitude": 26.8167, "longitude": 86.0333},
-    "Dolakha": {"latitude": 27.6667, "longitude": 86.0500},
-    "Dolpa": {"latitude": 29.0694, "longitude": 83.5800},
-    "Doti": {"latitude": 29.2667, "longitude": 80.9333},
-    "Eastern Rukum": {"latitude": 28.6260, "longitude": 83.3604},
-    "Gorkha": {"latitude": 28.0000, "longitude": 84.6333},
-    "Gulmi": {"latitude": 28.0833, "longitude": 83.2500},
-    "Humla": {"latitude": 29.9667, "longitude": 81.8333},
-    "Ilam": {"latitude": 26.9110, "longitude": 87.9286},
-    "Jajarkot": {"latitude": 28.7000, "longitude": 82.1833},
-    "Jhapa": {"latitude": 26.5456, "longitude": 87.9036},
-    "Jumla": {"latitude": 29.2806, "longitude": 82.3033},
-    "Kailali": {"latitude": 28.5300, "longitude": 80.6200},
-    "Kalikot": {"latitude": 29.1333, "longitude": 82.0000},
-    "Kanchanpur": {"latitude": 28.8333, "longitude": 80.3333},
-    "Kapilvastu": {"latitude": 27.5500, "longitude": 83.0500},
-    "Kaski": {"latitude": 28.2333, "longitude": 83.9833},
-    "Kathmandu": {"latitude": 27.7172, "longitude": 85.3240},
-    "Kavrepalanchok": {"latitude": 27.6333, "longitude": 85.5333},
-    "Khotang": {"latitude": 27.2038, "longitude": 86.7893},
-    "Lalitpur": {"latitude": 27.6766, "longitude": 85.3188},
-    "Lamjung": {"latitude": 28.2667, "longitude": 84.3667},
-    "Mahottari": {"latitude": 26.6500, "longitude": 85.8167},
-    "Makwanpur": {"latitude": 27.4333, "longitude": 85.0333},
-    "Manang": {"latitude": 28.6667, "longitude": 84.0167},
-    "Morang": {"latitude": 26.6667, "longitude": 87.5000},
-    "Mugu": {"latitude": 29.6167, "longitude": 82.3833},
-    "Mustang": {"latitude": 28.9985, "longitude": 83.8963},
-    "Myagdi": {"latitude": 28.3500, "longitude": 83.5667},
-    "Nawalpur": {"latitude": 27.6928, "longitude": 84.1272},
-    "Nuwakot": {"latitude": 27.8700, "longitude": 85.1400},
-    "Okhaldhunga": {"latitude": 27.3167, "longitude": 86.5000},
-    "Palpa": {"latitude": 27.8667, "longitude": 83.5500},
-    "Panchthar": {"latitude": 27.1167, "longitude": 87.9333},
-    "Parbat": {"latitude": 28.2333, "longitude": 83.7000},
-    "Parsa": {"latitude": 27.0000, "longitude": 84.8667},
-    "Pyuthan": {"latitude": 28.0833, "longitude": 82.8500},
-    "Ramechhap": {"latitude": 27.3833, "longitude": 86.0833},
-    "Rasuwa": {"latitude": 28.0500, "longitude": 85.3333},
-    "Rautahat": {"latitude": 26.9333, "longitude": 85.3000},
-    "Rolpa": {"latitude": 28.3500, "longitude": 82.8667},
-    "Rupandehi": {"latitude": 27.6333, "longitude": 83.5500},
-    "Salyan": {"latitude": 28.3833, "longitude": 82.1500},
-    "Sankhuwasabha": {"latitude": 27.5833, "longitude": 87.3000},
-    "Saptari": {"latitude": 26.6167, "longitude": 86.7500},
-    "Sarlahi": {"latitude": 26.9833, "longitude": 85.5667},
-    "Sindhuli": {"latitude": 27.2500, "longitude": 85.9167},
-    "Sindhupalchok": {"latitude": 27.8014, "longitude": 85.7006},
-    "Siraha": {"latitude": 26.6500, "longitude": 86.2000},
-    "Solukhumbu": {"latitude": 27.6690, "longitude": 86.7140},
-    "Sunsari": {"latitude": 26.6167, "longitude": 87.2500},
-    "Surkhet": {"latitude": 28.6000, "longitude": 81.6333},
-    "Syangja": {"latitude": 28.0069, "longitude": 83.8622},
-    "Tanahun": {"latitude": 27.9316, "longitude": 84.2570},
-    "Taplejung": {"latitude": 27.3543, "longitude": 87.6792},
-    "Terhathum": {"latitude": 27.0000, "longitude": 87.6000},
-    "Udayapur": {"latitude": 26.7911, "longitude": 86.6913},
-    "Western Rukum": {"latitude": 28.6274, "longitude": 82.3425}
-}
+from .districts import DISTRICT_GEOLOCATION_MAP, district_for_point, nearest_district, parse_coordinates
 
 # --- Helper functions ---
-from .models import Weather
+from .models import NewsArticle, Weather
 from .serializers import WeatherSerializer
+from .observations import record_observation, recent_observation
+from .normals import temperature_anomaly
+from .history_store import query_history, RESOLUTIONS as HISTORY_RESOLUTIONS
+from .predictions import get_ml_forecast, get_prediction
+from .accuracy import accuracy_summary, district_accuracy, prediction_confidence
+from .inference import predict_live as run_live_prediction
+from .raster import LAYERS as RASTER_LAYERS, read_raster
+from .district_layer import DEFAULT_ZOOM, district_layer, remember_aqi
+from .alerts import alert_broadcaster, cached_alerts, fetch_alerts, remember_alerts
+from .offline_bundle import bundle_payload
+from .news import article_payloads, dhm_reports, latest_articles
+from .news_index import news_index
+from .hourly import FORECAST_CACHE_SECONDS, compact_hourly, daily_rollups, forecast_columns
+from .response_cache import accepted_encodings, cached_response, etag_matches
+from .edge_cache import surrogate_keys, tag_response
+from weatherwave_project.renderers import dumps
+from .aqi import POLLUTANTS, pollutant_aqi, score_reading, score_readings
+from .aqi_history import (
+    RESOLUTIONS as AQI_RESOLUTIONS, choose_resolution as choose_aqi_resolution,
+    query_aqi_history, recent_aqi_reading, record_aqi_reading,
+)
+from django.http import HttpResponse, HttpResponseNotAllowed, JsonResponse, StreamingHttpResponse
+from asgiref.sync import sync_to_async
+
+logger = logging.getLogger(__name__)
+
+DISTRICT_AQI_CACHE_SECONDS = 15 * 60
+# Batch predictions change at most once per pipeline run
+PREDICTION_CACHE_SECONDS = 10 * 60
+# Response cache lifetimes; clients may also reuse stale copies for as long
+# while they revalidate (see response_cache.cached_response)
+CURRENT_WEATHER_CACHE_SECONDS = 5 * 60
+HISTORY_CACHE_SECONDS = 30 * 60
+ALERT_CACHE_SECONDS = 5 * 60
+# Snapshot and prediction refreshes purge the map layer; AQI changes show within this
+DISTRICT_LAYER_CACHE_SECONDS = 5 * 60
+# News is refreshed by the ingest_news job, which purges the `news` key
+NEWS_CACHE_SECONDS = 15 * 60
+NEWS_SEARCH_PAGE_SIZE = 20
+NEWS_SEARCH_MAX_PAGE_SIZE = 100
+# Edge lifetime for data whose publishers purge it on change (edge_cache.purge)
+EDGE_PURGED_MAX_AGE = 24 * 3600
+# Seconds between keep-alive comments on the alert stream
+ALERT_STREAM_HEARTBEAT = 15
+# Seconds to wait for WeatherAPI before falling back to stored readings
+AIR_QUALITY_TIMEOUT = 5
 
 # Helper: Get geolocation from IP as fallback
 def get_geolocation():
@@ -148,25 +119,29 @@ def get_weather(lat, lon, api_key):
             "description": data['weather'][0]['description'],
             "humidity": data['main']['humidity'],
             "wind_speed": data['wind']['speed'],
+            "observed_at": data.get('dt'),
+            "pressure": data['main'].get('pressure'),
+            "temp_min": data['main'].get('temp_min'),
+            "temp_max": data['main'].get('temp_max'),
+            "rain_1h": data.get('rain', {}).get('1h', 0.0),
         }
     except requests.RequestException:
         return None
 
 def compute_pm25_aqi(concentration):
-    breakpoints = [
-        (0.0, 12.0, 0, 50),
-        (12.1, 35.4, 51, 100),
-        (35.5, 55.4, 101, 150),
-        (55.5, 150.4, 151, 200),
-        (150.5, 250.4, 201, 300),
-        (250.5, 350.4, 301, 400),
-        (350.5, 500.4, 401, 500),
-    ]
-    for c_lo, c_hi, i_lo, i_hi in breakpoints:
-        if c_lo <= concentration <= c_hi:
-            return round(((i_hi - i_lo) / (c_hi - c_lo)) * (concentration - c_lo) + i_lo)
-    return None  # Out of range
+    aqi = pollutant_aqi('pm2_5', concentration)
+    return None if np.isnan(aqi) else int(aqi)  # Out of range
+
+def get_air_quality(lat, lon, api_key):
+    url = (
+        f"http://api.weatherapi.com/v1/current.json?"
+        f"key={api_key}&q={lat},{lon}&aqi=yes"
+    )
+    response = requests.get(url, timeout=AIR_QUALITY_TIMEOUT)
+    response.raise_for_status()
+    return response.json().get("current", {}).get("air_quality", {})
 
+@cached_response(CURRENT_WEATHER_CACHE_SECONDS, surrogate_keys=surrogate_keys('current', 'openweather'))
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def get_current_weather(request):
@@ -178,9 +153,16 @@ def get_current_weather(request):
     if not API_KEY:
         return Response({"error": "OpenWeather API key not configured"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    # Observations are stored under a district or the name OpenWeather gives
+    # the point, never under an unchecked `city` parameter
     if lat and lon:
+        try:
+            lat, lon = parse_coordinates(lat, lon)
+        except ValueError:
+            return Response({"error": "lat and lon must be valid coordinates"}, status=status.HTTP_400_BAD_REQUEST)
         weather = get_weather(lat, lon, API_KEY)
         city_name = city if city else (weather.get("city_name") if weather else None)
+        observed_city = city if city and district_for_point(lat, lon) == city else None
     elif city:
         lat, lon = get_lat_lon_from_city(city)
         if not lat or not lon:
@@ -194,12 +176,28 @@ def get_current_weather(request):
         else:
             weather = None
             city_name = city
+        # The coordinates were looked up for `city` itself
+        observed_city = city if city in DISTRICT_GEOLOCATION_MAP else None
     else:
         geo = get_geolocation()
         lat = geo.get("latitude") if geo else None
         lon = geo.get("longitude") if geo else None
         weather = get_weather(lat, lon, API_KEY) if lat and lon else None
         city_name = geo.get("city") if geo else None
+        observed_city = None
+
+    if weather:
+        record_observation(observed_city or weather.get("city_name"), weather, lat, lon)
+    elif city_name:
+        # Upstream is down or slow: fall back to the last stored observation
+        stored = recent_observation(city_name)
+        if stored:
+            weather = {
+                "temp": stored.temperature,
+                "humidity": stored.humidity,
+                "description": stored.description,
+                "wind_speed": stored.wind_speed,
+            }
 
     if not weather:
         return Response({"error": "Could not fetch weather data"}, status=status.HTTP_400_BAD_REQUEST)
@@ -210,8 +208,10 @@ def get_current_weather(request):
         "humidity": weather["humidity"] if weather else None,
         "description": weather["description"] if weather else None,
         "wind_speed": weather["wind_speed"] if weather else None,
+        **temperature_anomaly(city_name, weather["temp"]),
     })
 
+@cached_response(CURRENT_WEATHER_CACHE_SECONDS, surrogate_keys=surrogate_keys('aqi', 'weatherapi'))
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def get_aqi(request):
@@ -239,36 +239,89 @@ def get_aqi(request):
 
     if not query_lat or not query_lon:
         return Response({"error": "Could not determine location"}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        query_lat, query_lon = parse_coordinates(query_lat, query_lon)
+    except ValueError:
+        return Response({"error": "lat and lon must be valid coordinates"}, status=status.HTTP_400_BAD_REQUEST)
 
-    url = (
-        f"http://api.weatherapi.com/v1/current.json?"
-        f"key={API_KEY}&q={query_lat},{query_lon}&aqi=yes"
-    )
-
+    # None outside Nepal: such readings are served but never attributed to a district
+    district = city if city in DISTRICT_GEOLOCATION_MAP else district_for_point(query_lat, query_lon)
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        data = response.json()
-        air_quality = data.get("current", {}).get("air_quality", {})
-        pm25 = air_quality.get("pm2_5")
+        air_quality = get_air_quality(query_lat, query_lon, API_KEY)
+        result = score_reading(air_quality)
+        if result["aqi"] is not None:
+            record_aqi_reading(district, query_lat, query_lon, air_quality, result)
+    except requests.RequestException as e:
+        # WeatherAPI is down or slow: fall back to the last stored reading
+        stored = recent_aqi_reading(district) if district else None
+        if not stored:
+            return Response({"error": "Error fetching AQI data", "details": str(e)}, status=500)
+        result = score_reading({name: getattr(stored, name) for name in POLLUTANTS})
 
-        if pm25 is None:
-            return Response({"error": "PM2.5 data not available"}, status=500)
+    if result["aqi"] is None:
+        return Response({"error": "Air quality data not available"}, status=500)
 
-        real_aqi = compute_pm25_aqi(pm25)
+    # Keep the latest value per district for the map layer
+    remember_aqi(district, result["aqi"])
 
-        return Response({
-            "AQI_Value": real_aqi,
-        })
-    except requests.RequestException as e:
-        return Response({"error": "Error fetching AQI data", "details": str(e)}, status=500)
+    return Response({
+        "AQI_Value": result["aqi"],
+        "dominant_pollutant": result["dominant_pollutant"],
+        "pollutants": result["pollutants"],
+    })
+
+@cached_response(DISTRICT_AQI_CACHE_SECONDS, surrogate_keys=surrogate_keys('aqi', 'weatherapi', per_district=False))
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def get_district_aqi(request):
+    """
+    AQI for every district. Readings are fetched concurrently and scored in
+    a single batch; the response is cached for DISTRICT_AQI_CACHE_SECONDS.
+    """
+    API_KEY = os.getenv('WEATHER_API_KEY')
+    if not API_KEY:
+        return Response({"error": "Weather API key not configured"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    def fetch(district):
+        geo = DISTRICT_GEOLOCATION_MAP[district]
+        try:
+            return get_air_quality(geo['latitude'], geo['longitude'], API_KEY)
+        except requests.RequestException:
+            return None
+
+    districts = list(DISTRICT_GEOLOCATION_MAP)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        readings = list(pool.map(fetch, districts))
+
+    results = {}
+    for district, reading, result in zip(districts, readings, score_readings(readings)):
+        if result["aqi"] is None:
+            continue
+        geo = DISTRICT_GEOLOCATION_MAP[district]
+        record_aqi_reading(district, geo['latitude'], geo['longitude'], reading, result)
+        remember_aqi(district, result["aqi"])
+        results[district] = result
+
+    if not results:
+        return Response({"error": "Air quality data not available"}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+    return Response({"districts": results})
 
+@cached_response(HISTORY_CACHE_SECONDS, surrogate_keys=surrogate_keys('history', 'weatherapi'))
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def get_weather_history(request):
     lat = request.query_params.get('lat')
     lon = request.query_params.get('lon')
     city = request.query_params.get('city')
+    start = request.query_params.get('start')
+    end = request.query_params.get('end')
+
+    # Date ranges are served from the ML pipeline's own daily dataset
+    # (2010 onwards) without any upstream calls
+    if start or end:
+        return get_long_range_history(request, city, lat, lon, start, end)
+
     API_KEY = os.getenv('WEATHER_API_KEY')
 
     if not API_KEY:
@@ -312,6 +365,43 @@ def get_weather_history(request):
 
     return Response({"history": history})
 
+def get_long_range_history(request, city, lat, lon, start, end):
+    resolution = request.query_params.get('resolution')
+    if resolution and resolution not in HISTORY_RESOLUTIONS:
+        return Response({"error": f"resolution must be one of: {', '.join(HISTORY_RESOLUTIONS)}"}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        end_date = datetime.date.fromisoformat(end) if end else datetime.date.today()
+        start_date = datetime.date.fromisoformat(start) if start else end_date - datetime.timedelta(days=30)
+    except ValueError:
+        return Response({"error": "start and end must be dates in YYYY-MM-DD format"}, status=status.HTTP_400_BAD_REQUEST)
+    if start_date > end_date:
+        return Response({"error": "start must not be after end"}, status=status.HTTP_400_BAD_REQUEST)
+
+    if city in DISTRICT_GEOLOCATION_MAP:
+        district = city
+    elif lat and lon:
+        try:
+            district = district_for_point(*parse_coordinates(lat, lon))
+        except ValueError:
+            return Response({"error": "Invalid latitude or longitude"}, status=status.HTTP_400_BAD_REQUEST)
+        if district is None:
+            return Response({"error": "lat and lon must be within Nepal"}, status=status.HTTP_400_BAD_REQUEST)
+    else:
+        return Response({"error": "A district name or lat/lon is required for date-range history"}, status=status.HTTP_400_BAD_REQUEST)
+
+    result = query_history(district, start_date, end_date, resolution)
+    if result is None:
+        return Response({"error": f"No historical data available for district: {district}"}, status=status.HTTP_404_NOT_FOUND)
+
+    return Response({
+        "district": district,
+        "start": start_date.isoformat(),
+        "end": end_date.isoformat(),
+        **result,
+    })
+
+@cached_response(FORECAST_CACHE_SECONDS, surrogate_keys=surrogate_keys('forecast', 'openweather'))
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def get_weather_forecast(request):
@@ -339,44 +429,68 @@ def get_weather_forecast(request):
 
     if not query_lat or not query_lon:
         return Response({"error": "Could not determine location"}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        query_lat, query_lon = parse_coordinates(query_lat, query_lon)
+    except ValueError:
+        return Response({"error": "lat and lon must be valid coordinates"}, status=status.HTTP_400_BAD_REQUEST)
 
-    forecast_url = (
-        f"http://api.openweathermap.org/data/2.5/forecast?"
-        f"lat={query_lat}&lon={query_lon}&appid={API_KEY}&units=metric"
-    )
-    forecast_data = []
     try:
-        resp = requests.get(forecast_url)
-        resp.raise_for_status()
-        forecast_json = resp.json()
-        # Group by date and get min/max/avg for each day
-        daily = {}
-        for entry in forecast_json.get('list', []):
-            date = entry['dt_txt'].split(' ')[0]
-            temp = entry['main']['temp']
-            if date not in daily:
-                daily[date] = {"temps": []}
-            daily[date]["temps"].append(temp)
-        # Only keep the next 5 days
-        for i, (date, vals) in enumerate(daily.items()):
-            if i >= 5:
-                break
-            temps = vals["temps"]
-            forecast_data.append({
-                "date": date,
-                "Weather": {
-                    "avg_temp": sum(temps) / len(temps),
-                    "max_temp": max(temps),
-                    "min_temp": min(temps),
-                }
-            })
+        columns = forecast_columns(query_lat, query_lon, API_KEY)
     except requests.RequestException as e:
         return Response({"error": f"Error fetching forecast data: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    # Group by date and get min/max/avg for the next 5 days
+    forecast_data = daily_rollups(columns, days=5)
+
     return Response({
         "forecast": forecast_data
     })
 
+@cached_response(FORECAST_CACHE_SECONDS, surrogate_keys=surrogate_keys('forecast', 'openweather'))
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def get_hourly_forecast(request):
+    """
+    OpenWeather's 3-hourly forecast as parallel arrays: `hourly.time` (Unix
+    seconds) plus temp (°C), humidity (%), wind_speed (m/s) and precip
+    (mm per step), quantized to fixed precision, and the daily rollups.
+    """
+    lat = request.query_params.get('lat')
+    lon = request.query_params.get('lon')
+    city = request.query_params.get('city')
+    API_KEY = os.getenv('OPENWEATHER_API_KEY')
+
+    if not API_KEY:
+        return Response({"error": "OpenWeather API key not configured"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    if lat and lon:
+        query_lat, query_lon = lat, lon
+    elif city in DISTRICT_GEOLOCATION_MAP:
+        geo = DISTRICT_GEOLOCATION_MAP[city]
+        query_lat, query_lon = geo['latitude'], geo['longitude']
+    elif city:
+        query_lat, query_lon = get_lat_lon_from_city(city)
+    else:
+        return Response({"error": "lat/lon or city is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+    if not query_lat or not query_lon:
+        return Response({"error": "Could not determine location"}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        query_lat, query_lon = parse_coordinates(query_lat, query_lon)
+    except ValueError:
+        return Response({"error": "lat and lon must be valid coordinates"}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        columns = forecast_columns(query_lat, query_lon, API_KEY)
+    except requests.RequestException as e:
+        return Response({"error": f"Error fetching forecast data: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    return Response({
+        "hourly": compact_hourly(columns),
+        "daily": daily_rollups(columns),
+    })
+
+@cached_response(ALERT_CACHE_SECONDS, surrogate_keys=surrogate_keys('alerts', 'weatherbit'))
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def get_alert(request):
@@ -404,16 +518,18 @@ def get_alert(request):
 
     if not query_lat or not query_lon:
         return Response({"error": "Could not determine location"}, status=status.HTTP_400_BAD_REQUEST)
-
-    alert_url = (
-        f"https://api.weatherbit.io/v2.0/alerts?lat={query_lat}&lon={query_lon}&key={API_KEY}"
-    )
+    try:
+        query_lat, query_lon = parse_coordinates(query_lat, query_lon)
+    except ValueError:
+        return Response({"error": "lat and lon must be valid coordinates"}, status=status.HTTP_400_BAD_REQUEST)
 
     try:
-        response = requests.get(alert_url)
-        response.raise_for_status()
-        data = response.json()
-        alerts = data.get('alerts', [])
+        alerts = fetch_alerts(query_lat, query_lon, API_KEY)
+        # Keep the latest alerts per district for the offline bundle and the
+        # poller; alerts for points outside Nepal belong to no district
+        district = city if city in DISTRICT_GEOLOCATION_MAP else district_for_point(query_lat, query_lon)
+        if district:
+            remember_alerts(district, alerts)
         if not alerts:
             return Response({"message": "No weather alerts at this time."})
         return Response({"alerts": alerts})
@@ -421,15 +537,6 @@ def get_alert(request):
         return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-from supabase import create_client
-load_dotenv()
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_KEY")
-BUCKET_NAME = "ml-files"
-PREDICTION_FILE = "predictions.csv"
-
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
-
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def predict_geo(request):
@@ -444,38 +551,96 @@ def predict_geo(request):
         lon = float(lon)
 
         # Resolve nearest district from lat/lon
-        min_dist = float('inf')
-        closest_district = None
-        for district, info in DISTRICT_GEOLOCATION_MAP.items():
-            dist = ((lat - info['latitude'])**2 + (lon - info['longitude'])**2)**0.5
-            if dist < min_dist:
-                min_dist = dist
-                closest_district = district
+        closest_district = nearest_district(lat, lon)
 
         if closest_district is None:
             return Response({"error": "Could not resolve coordinates to a district."}, status=404)
 
-        # Load predictions.csv from Supabase
-        file_bytes = supabase.storage.from_(BUCKET_NAME).download(PREDICTION_FILE)
-        df = pd.read_csv(io.BytesIO(file_bytes))
-        df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
-
-        # Filter by closest_district
-        latest_data = df[df['District'] == closest_district]
-        if latest_data.empty:
+        # Latest batch prediction, kept in memory by forecast.predictions
+        prediction = get_prediction(closest_district)
+        if prediction is None:
             return Response({"error": f"No prediction found for district: {closest_district}"}, status=404)
 
-        latest_row = latest_data.sort_values(by='Date', ascending=False).iloc[0]
-
         return Response({
             "resolved_district": closest_district,
-            "predicted_temp": round(latest_row['predicted_Temp_2m_tomorrow'], 2)
+            "predicted_temp": prediction['predicted_temp'],
+            "confidence": prediction_confidence(closest_district),
         })
 
     except Exception as e:
         return Response({"error": str(e)}, status=500)
 
 
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def predict_live(request):
+    """
+    Next-day temperature for any location, predicted on demand from current
+    conditions rather than read from the nightly batch.
+    """
+    lat = request.data.get('lat')
+    lon = request.data.get('lon')
+
+    if not lat or not lon:
+        return Response({"error": "Latitude and Longitude are required."}, status=400)
+
+    try:
+        lat, lon = parse_coordinates(lat, lon)
+    except (TypeError, ValueError):
+        return Response({"error": "Latitude and Longitude must be valid coordinates."}, status=400)
+    if district_for_point(lat, lon) is None:
+        return Response({"error": "Latitude and Longitude must be within Nepal."}, status=400)
+
+    try:
+        prediction = run_live_prediction(lat, lon)
+    except LookupError as e:
+        return Response({"error": str(e)}, status=status.HTTP_502_BAD_GATEWAY)
+    except (RuntimeError, TimeoutError) as e:
+        return Response({"error": str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+    return Response({
+        **prediction,
+        "confidence": prediction_confidence(prediction["resolved_district"]),
+    })
+
+
+@cached_response(PREDICTION_CACHE_SECONDS, surrogate_keys=surrogate_keys('prediction', 'weatherwave-ml'), edge_max_age=EDGE_PURGED_MAX_AGE)
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def get_ml_forecast_view(request):
+    """
+    Day+1 to day+5 temperature forecast from the nightly ML batch for a
+    district (`city`) or the district nearest to `lat`/`lon`. Served from
+    memory with no upstream weather API call.
+    """
+    lat = request.query_params.get('lat')
+    lon = request.query_params.get('lon')
+    city = request.query_params.get('city')
+
+    if city in DISTRICT_GEOLOCATION_MAP:
+        district = city
+    elif lat and lon:
+        try:
+            district = district_for_point(*parse_coordinates(lat, lon))
+        except ValueError:
+            return Response({"error": "lat and lon must be valid coordinates"}, status=status.HTTP_400_BAD_REQUEST)
+        if district is None:
+            return Response({"error": "lat and lon must be within Nepal"}, status=status.HTTP_400_BAD_REQUEST)
+    else:
+        return Response({"error": "city must be a district name, or lat and lon must be given"}, status=status.HTTP_400_BAD_REQUEST)
+
+    forecast = get_ml_forecast(district)
+    if forecast is None:
+        return Response({"error": f"No ML forecast found for district: {district}"}, status=status.HTTP_404_NOT_FOUND)
+
+    return Response({
+        "district": district,
+        "base_date": forecast["base_date"],
+        "forecast": forecast["forecast"],
+        "confidence": prediction_confidence(district),
+    })
+
+
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def predict_city(request):
@@ -487,21 +652,15 @@ def predict_city(request):
         if city not in DISTRICT_GEOLOCATION_MAP:
             return Response({"error": f"City '{city}' not found in district map."}, status=404)
 
-        # Load predictions.csv from Supabase
-        file_bytes = supabase.storage.from_(BUCKET_NAME).download(PREDICTION_FILE)
-        df = pd.read_csv(io.BytesIO(file_bytes))
-        df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
-
-        # Filter by city
-        city_data = df[df['District'] == city]
-        if city_data.empty:
+        # Latest batch prediction, kept in memory by forecast.predictions
+        prediction = get_prediction(city)
+        if prediction is None:
             return Response({"error": f"No prediction data found for city: {city}"}, status=404)
 
-        latest = city_data.sort_values(by='Date', ascending=False).iloc[0]
-
         return Response({
             "city": city,
-            "predicted_temp": round(latest['predicted_Temp_2m_tomorrow'], 2)
+            "predicted_temp": prediction['predicted_temp'],
+            "confidence": prediction_confidence(city),
         })
 
     except Exception as e:
@@ -533,301 +692,65 @@ def get_current_weather_default(request):
             'humidity': data['main']['humidity'],
             'wind_speed': data['wind']['speed'],
         }
+        record_observation(weather['city'], {
+            'temp': weather['temperature'],
+            'description': weather['description'],
+            'humidity': weather['humidity'],
+            'wind_speed': weather['wind_speed'],
+            'observed_at': data.get('dt'),
+        }, data.get('coord', {}).get('lat'), data.get('coord', {}).get('lon'))
+        weather.update(temperature_anomaly(city, weather['temperature']))
         return Response(weather)
     except Exception as e:
         return Response({'error': str(e)}, status=500)
 
 
+@cached_response(NEWS_CACHE_SECONDS, surrogate_keys=surrogate_keys('news', per_district=False),
+                 edge_max_age=EDGE_PURGED_MAX_AGE)
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def get_weather_news(request):
     """
-    Smart 3-article Nepal weather news system:
-    1. Try RSS from Nepal sources first
-    2. Supplement with NewsAPI if needed
-    3. Generate dynamic DHM-style reports as fallback
-    Returns exactly 3 high-quality, Nepal-focused weather articles.
+    Exactly 3 Nepal weather articles:
+    1. The newest stories stored by the `ingest_news` job (RSS and NewsAPI),
+       with the sources of near-duplicate syndications listed together
+    2. Dynamic DHM-style reports from the latest Kathmandu observation
+    3. Generic DHM reports as a final fallback
+
+    Stored articles only change on ingest, which purges the `news` tag; the
+    fallback reports depend on the time and the latest observation, so a
+    response containing them is kept at the edge no longer than here.
     """
     try:
-        import feedparser
-        from datetime import datetime, timedelta
-        from django.core.cache import cache
-        
-        # Check cache first (cache for 45 minutes)
-        cached_news = cache.get('weather_news_compact')
-        if cached_news:
-            return Response(cached_news)
-        
-        all_weather_news = []
-        
-        # STEP 1: RSS FROM NEPAL NEWS SOURCES (PRIMARY)
-        nepal_rss_sources = {
-            'Kathmandu Post': 'https://kathmandupost.com/rss',
-            'The Himalayan Times': 'https://thehimalayantimes.com/rss',
-            'My Republica': 'https://myrepublica.nagariknetwork.com/rss',
-            'Online Khabar': 'https://www.onlinekhabar.com/feed'
-        }
-        
-        # Enhanced weather keywords
-        weather_keywords = [
-            'weather', 'monsoon', 'rainfall', 'rain', 'flood', 'drought',
-            'temperature', 'climate', 'storm', 'landslide', 'avalanche',
-            'forecast', 'thunderstorm', 'heavy rain', 'heat wave', 'cold wave'
-        ]
-        
-        # Nepal-specific locations
-        nepal_locations = [
-            'nepal', 'kathmandu', 'pokhara', 'chitwan', 'humla', 'mustang',
-            'biratnagar', 'bharatpur', 'birgunj', 'janakpur', 'bagmati', 
-            'gandaki', 'karnali', 'terai', 'himalaya', 'everest'
-        ]
-        
-        # Try RSS feeds (limit to 2 sources to avoid overload)
-        for source_name, rss_url in list(nepal_rss_sources.items())[:2]:
-            try:
-                feed = feedparser.parse(rss_url)
-                
-                for entry in feed.entries[:5]:  # Only check first 5 articles per source
-                    title = entry.get('title', '').lower()
-                    summary = entry.get('summary', entry.get('description', '')).lower()
-                    content = title + ' ' + summary
-                    
-                    # Must have weather content AND Nepal context
-                    has_weather = any(keyword in content for keyword in weather_keywords)
-                    has_nepal = any(location in content for location in nepal_locations)
-                    
-                    if has_weather and has_nepal:
-                        # Simple severity detection
-                        if any(term in content for term in ['disaster', 'emergency', 'destroyed', 'killed']):
-                            severity = 'high'
-                        elif any(term in content for term in ['flood', 'storm', 'damage', 'affected']):
-                            severity = 'moderate'
-                        else:
-                            severity = 'low'
-                        
-                        # Simple location detection
-                        location = 'Nepal'
-                        for loc in ['humla', 'kathmandu', 'pokhara', 'chitwan']:
-                            if loc in content:
-                                location = loc.title() + (' District' if loc != 'kathmandu' else ' Valley')
-                                break
-                        
-                        all_weather_news.append({
-                            'id': f'rss_{len(all_weather_news)}',
-                            'title': entry.get('title', 'Weather Update'),
-                            'description': (entry.get('summary', entry.get('description', ''))[:180] + '...').replace('\n', ' '),
-                            'source': source_name,
-                            'timestamp': datetime.now().strftime('%B %d, %Y'),
-                            'severity': severity,
-                            'location': location,
-                            'link': entry.get('link', '#')
-                        })
-                        
-                        # Stop after finding 2 good articles to keep it fast
-                        if len(all_weather_news) >= 2:
-                            break
-                            
-            except Exception as e:
-                print(f"RSS error for {source_name}: {e}")
-                continue
-        
-        # STEP 2: NEWSAPI (SUPPLEMENTARY)
-        if len(all_weather_news) < 3:
-            # Try NewsAPI
-            NEWS_API_KEY = os.getenv('NEWS_API_KEY')
-            if NEWS_API_KEY and len(all_weather_news) < 2:
-                try:
-                    url = f"https://newsapi.org/v2/everything"
-                    params = {
-                        'q': 'Nepal weather OR Nepal monsoon',
-                        'language': 'en',
-                        'sortBy': 'publishedAt',
-                        'pageSize': 5,
-                        'apiKey': NEWS_API_KEY
-                    }
-                    
-                    response = requests.get(url, params=params)
-                    if response.status_code == 200:
-                        data = response.json()
-                        
-                        for article in data.get('articles', [])[:2]:
-                            title = article.get('title', '').lower()
-                            description = article.get('description', '').lower()
-                            
-                            if any(loc in title + description for loc in nepal_locations):
-                                all_weather_news.append({
-                                    'id': f'newsapi_{len(all_weather_news)}',
-                                    'title': article.get('title', 'Weather Update'),
-                                    'description': (article.get('description', '')[:180] + '...'),
-                                    'source': article.get('source', {}).get('name', 'News Source'),
-                                    'timestamp': datetime.now().strftime('%B %d, %Y'),
-                                    'severity': 'moderate',
-                                    'location': 'Nepal',
-                                    'link': article.get('url', '#')
-                                })
-                                
-                                if len(all_weather_news) >= 3:
-                                    break
-                                    
-                except Exception as e:
-                    print(f"NewsAPI error: {e}")
-        
-        # STEP 3: DYNAMIC DHM-STYLE REPORTS (SMART FALLBACK)
-        if len(all_weather_news) < 3:
-            # Generate contextual DHM reports based on current weather conditions
-            current_date = datetime.now()
-            
-            # Get current weather for Kathmandu to create contextual reports
-            try:
-                api_key = os.getenv('OPENWEATHER_API_KEY')
-                if api_key:
-                    weather_url = f"http://api.openweathermap.org/data/2.5/weather?q=Kathmandu,NP&appid={api_key}&units=metric"
-                    weather_response = requests.get(weather_url)
-                    
-                    if weather_response.status_code == 200:
-                        weather_data = weather_response.json()
-                        current_temp = weather_data['main']['temp']
-                        current_condition = weather_data['weather'][0]['main'].lower()
-                        humidity = weather_data['main']['humidity']
-                        
-                        # Generate contextual reports based on actual conditions
-                        dynamic_reports = []
-                        
-                        if current_condition in ['rain', 'thunderstorm'] or humidity > 80:
-                            dynamic_reports.append({
-                                'id': 'dhm_monsoon',
-                                'title': f'Monsoon Activity Continues Across Nepal - {current_temp:.1f}°C in Kathmandu',
-                                'description': f'Department of Hydrology and Meteorology reports active monsoon conditions with {humidity}% humidity. Current temperature in Kathmandu Valley is {current_temp:.1f}°C with ongoing precipitation patterns affecting multiple regions.',
-                                'source': 'DHM Nepal',
-                                'timestamp': current_date.strftime('%B %d, %Y'),
-                                'severity': 'moderate',
-                                'location': 'Nepal'
-                            })
-                        elif current_temp > 30:
-                            dynamic_reports.append({
-                                'id': 'dhm_heat',
-                                'title': f'Above Average Temperatures Recorded - {current_temp:.1f}°C in Capital',
-                                'description': f'Weather monitoring stations across Nepal record elevated temperatures. Kathmandu Valley currently at {current_temp:.1f}°C. DHM advises precautionary measures during peak daytime hours.',
-                                'source': 'DHM Nepal',
-                                'timestamp': current_date.strftime('%B %d, %Y'),
-                                'severity': 'low',
-                                'location': 'Nepal'
-                            })
-                        elif current_temp < 15:
-                            dynamic_reports.append({
-                                'id': 'dhm_cold',
-                                'title': f'Cooler Weather Patterns Observed - {current_temp:.1f}°C in Kathmandu',
-                                'description': f'Temperature readings show cooler conditions across Nepal. Kathmandu Valley currently experiencing {current_temp:.1f}°C with similar patterns in other regions.',
-                                'source': 'DHM Nepal',
-                                'timestamp': current_date.strftime('%B %d, %Y'),
-                                'severity': 'low',
-                                'location': 'Nepal'
-                            })
-                        else:
-                            dynamic_reports.append({
-                                'id': 'dhm_normal',
-                                'title': f'Stable Weather Conditions - {current_temp:.1f}°C in Kathmandu Valley',
-                                'description': f'Current weather conditions remain stable across most regions. Kathmandu Valley recording {current_temp:.1f}°C with {humidity}% humidity. No significant weather warnings in effect.',
-                                'source': 'DHM Nepal',
-                                'timestamp': current_date.strftime('%B %d, %Y'),
-                                'severity': 'low',
-                                'location': 'Nepal'
-                            })
-                        
-                        # Add seasonal context
-                        month = current_date.month
-                        if month in [6, 7, 8, 9]:  # Monsoon season
-                            dynamic_reports.append({
-                                'id': 'dhm_seasonal',
-                                'title': 'Monsoon Season Weather Advisory for Nepal',
-                                'description': 'Department of Hydrology and Meteorology continues monitoring monsoon patterns. Citizens advised to stay updated on local weather conditions and follow safety guidelines for flood-prone areas.',
-                                'source': 'DHM Nepal',
-                                'timestamp': current_date.strftime('%B %d, %Y'),
-                                'severity': 'moderate',
-                                'location': 'All Nepal'
-                            })
-                        elif month in [12, 1, 2]:  # Winter season
-                            dynamic_reports.append({
-                                'id': 'dhm_winter',
-                                'title': 'Winter Weather Monitoring Across Nepal',
-                                'description': 'Cold weather patterns continue across Nepal. Mountain regions may experience significant temperature drops. DHM advises appropriate seasonal precautions.',
-                                'source': 'DHM Nepal',
-                                'timestamp': current_date.strftime('%B %d, %Y'),
-                                'severity': 'low',
-                                'location': 'Mountain Regions'
-                            })
-                        
-                        # Add reports to fill up to 3 articles
-                        for report in dynamic_reports:
-                            if len(all_weather_news) < 3:
-                                all_weather_news.append(report)
-                                
-            except Exception as e:
-                print(f"Weather API error for dynamic reports: {e}")
-                
-            # Final fallback if we still don't have 3 articles
-            generic_reports = [
-                {
-                    'id': 'dhm_general',
-                    'title': 'Nepal Weather Monitoring and Forecasting Services',
-                    'description': 'Department of Hydrology and Meteorology provides continuous weather monitoring across all 77 districts of Nepal. Real-time data collection and analysis for public safety.',
-                    'source': 'DHM Nepal',
-                    'timestamp': current_date.strftime('%B %d, %Y'),
-                    'severity': 'low',
-                    'location': 'Nepal'
-                },
-                {
-                    'id': 'dhm_districts',
-                    'title': 'Multi-District Weather Data Collection Network',
-                    'description': 'Comprehensive weather station network across Nepal continues operational monitoring. Data from mountain, hill, and Terai regions processed for accurate forecasting.',
-                    'source': 'DHM Nepal',
-                    'timestamp': (current_date - timedelta(hours=3)).strftime('%B %d, %Y'),
-                    'severity': 'low',
-                    'location': 'All Regions'
-                }
-            ]
-            
-            for report in generic_reports:
-                if len(all_weather_news) < 3:
-                    all_weather_news.append(report)
-        
-        # STEP 4: FINALIZE TO EXACTLY 3 ARTICLES
-        # Remove duplicates and prioritize by relevance
-        unique_news = []
-        seen_titles = set()
-        
-        for article in all_weather_news:
-            title_key = ' '.join(article['title'].lower().split()[:4])  # First 4 words
-            if title_key not in seen_titles:
-                seen_titles.add(title_key)
-                unique_news.append(article)
-        
-        # Sort by severity and take top 3
+        now = datetime.datetime.now()
+        all_weather_news = latest_articles(limit=3)
+        stored_only = len(all_weather_news) == 3
+        if not stored_only:
+            observation = recent_observation('Kathmandu', max_age=datetime.timedelta(hours=3))
+            all_weather_news += dhm_reports(now, observation)[:3 - len(all_weather_news)]
+
+        # Stored articles are already one per near-duplicate cluster; most severe first
         severity_order = {'high': 3, 'moderate': 2, 'low': 1}
-        unique_news.sort(key=lambda x: severity_order.get(x['severity'], 0), reverse=True)
-        
-        # Ensure exactly 3 articles
-        final_news = unique_news[:3]
-        
-        # If somehow we have less than 3, add a simple backup
+        all_weather_news.sort(key=lambda x: severity_order.get(x['severity'], 0), reverse=True)
+
+        final_news = all_weather_news[:3]
         while len(final_news) < 3:
             final_news.append({
                 'id': f'backup_{len(final_news)}',
                 'title': 'Nepal Weather Information Service',
                 'description': 'Regular weather updates and forecasting services for Nepal. Department of Hydrology and Meteorology continues monitoring weather patterns nationwide.',
                 'source': 'DHM Nepal',
-                'timestamp': datetime.now().strftime('%B %d, %Y'),
+                'timestamp': now.strftime('%B %d, %Y'),
                 'severity': 'low',
                 'location': 'Nepal'
             })
-        
-        # Cache for 45 minutes
-        cache.set('weather_news_compact', final_news, 45 * 60)
-        
-        return Response(final_news)
-        
-    except Exception as e:
-        print(f"Error in weather news system: {e}")
+        response = Response(final_news)
+        if not stored_only:
+            response['Surrogate-Control'] = f'max-age={NEWS_CACHE_SECONDS}'
+        return response
+
+    except Exception:
+        logger.exception("Weather news failed; serving the emergency articles")
         
         # Emergency 3-article fallback
         emergency_news = [
@@ -836,7 +759,7 @@ def get_weather_news(request):
                 'title': 'Nepal Weather Monitoring Service',
                 'description': 'Continuous weather monitoring and forecasting across Nepal through the Department of Hydrology and Meteorology network.',
                 'source': 'DHM Nepal',
-                'timestamp': datetime.now().strftime('%B %d, %Y'),
+                'timestamp': datetime.datetime.now().strftime('%B %d, %Y'),
                 'severity': 'low',
                 'location': 'Nepal'
             },
@@ -845,7 +768,7 @@ def get_weather_news(request):
                 'title': 'Regional Weather Data Collection',
                 'description': 'Weather stations across mountain, hill, and Terai regions provide real-time meteorological data for public information and safety.',
                 'source': 'DHM Nepal',
-                'timestamp': datetime.now().strftime('%B %d, %Y'),
+                'timestamp': datetime.datetime.now().strftime('%B %d, %Y'),
                 'severity': 'low',
                 'location': 'All Regions'
             },
@@ -854,11 +777,293 @@ def get_weather_news(request):
                 'title': 'National Weather Forecasting Updates',
                 'description': 'Regular weather forecasts and warnings issued to support agriculture, transportation, and public safety across Nepal.',
                 'source': 'DHM Nepal',
-                'timestamp': datetime.now().strftime('%B %d, %Y'),
+                'timestamp': datetime.datetime.now().strftime('%B %d, %Y'),
                 'severity': 'low',
                 'location': 'Nepal'
             }
         ]
         
-        return Response(emergency_news)
+        response = Response(emergency_news)
+        response['Surrogate-Control'] = f'max-age={NEWS_CACHE_SECONDS}'
+        return response
+
+
+@cached_response(NEWS_CACHE_SECONDS, surrogate_keys=surrogate_keys('news', per_district=False),
+                 edge_max_age=EDGE_PURGED_MAX_AGE)
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def search_weather_news(request):
+    """
+    Ranked search over all stored news articles, served from the in-memory
+    news index. `q` is matched against titles and summaries (newest first
+    when omitted), `district` keeps articles naming that district, `start`
+    and `end` (YYYY-MM-DD, inclusive) bound the publish date, and `page` /
+    `page_size` paginate.
+    """
+    district = request.query_params.get('district')
+    if district and district not in DISTRICT_GEOLOCATION_MAP:
+        return Response({"error": f"Unknown district: {district}"}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        start = request.query_params.get('start')
+        end = request.query_params.get('end')
+        start = datetime.date.fromisoformat(start) if start else None
+        end = datetime.date.fromisoformat(end) + datetime.timedelta(days=1) if end else None
+    except ValueError:
+        return Response({"error": "start and end must be dates in YYYY-MM-DD format"}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        page = int(request.query_params.get('page', 1))
+        page_size = int(request.query_params.get('page_size', NEWS_SEARCH_PAGE_SIZE))
+    except ValueError:
+        return Response({"error": "page and page_size must be integers"}, status=status.HTTP_400_BAD_REQUEST)
+    page = max(page, 1)
+    page_size = min(max(page_size, 1), NEWS_SEARCH_MAX_PAGE_SIZE)
+
+    def epoch(date):
+        return datetime.datetime.combine(date, datetime.time.min, tzinfo=datetime.timezone.utc).timestamp()
+
+    total, ids = news_index.search(
+        request.query_params.get('q', ''),
+        district=district,
+        start=epoch(start) if start else None,
+        end=epoch(end) if end else None,
+        offset=(page - 1) * page_size,
+        limit=page_size,
+    )
+    articles = NewsArticle.objects.in_bulk(ids)
+    articles = [articles[pk] for pk in ids if pk in articles]
+    results = [
+        {**payload, 'districts': article.districts}
+        for article, payload in zip(articles, article_payloads(articles))
+    ]
+    return Response({"count": total, "page": page, "page_size": page_size, "results": results})
+
+
+RASTER_CONTENT_TYPES = {
+    'bin': 'application/octet-stream',
+    'png': 'image/png',
+    'json': 'application/json',
+}
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def get_temperature_raster(request):
+    """
+    Interpolated temperature grid for all of Nepal, precomputed by the
+    `refresh_rasters` job. `encoding=bin` is a row-major int16 array in tenths
+    of a degree (see `encoding=json` for its shape and bounds), `encoding=png`
+    a colour-mapped image tile. (`format` is reserved by DRF.)
+    """
+    layer = request.query_params.get('layer', 'current')
+    fmt = request.query_params.get('encoding', 'png')
+    if layer not in RASTER_LAYERS or fmt not in RASTER_CONTENT_TYPES:
+        return Response({"error": f"layer must be one of {', '.join(RASTER_LAYERS)} and encoding one of {', '.join(RASTER_CONTENT_TYPES)}"}, status=status.HTTP_400_BAD_REQUEST)
+
+    data, etag = read_raster(layer, fmt)
+    if data is None:
+        return Response({"error": "Raster has not been generated yet"}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+    etag = f'"{etag}"'
+    if request.headers.get('If-None-Match') == etag:
+        response = HttpResponse(status=304)
+    else:
+        response = HttpResponse(data, content_type=RASTER_CONTENT_TYPES[fmt])
+    response['ETag'] = etag
+    response['Cache-Control'] = 'public, max-age=600, stale-while-revalidate=3600'
+    return tag_response(response, ['raster', f'raster:{layer}'], EDGE_PURGED_MAX_AGE)
+
+
+@cached_response(DISTRICT_LAYER_CACHE_SECONDS, stale_while_revalidate=15 * 60,
+                 surrogate_keys=lambda request: ['snapshot', 'aqi', 'prediction'],
+                 edge_max_age=EDGE_PURGED_MAX_AGE)
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def get_district_layer(request):
+    """
+    GeoJSON FeatureCollection of every district with its latest temperature,
+    AQI and prediction, so the map needs one request instead of one per
+    district. `zoom` picks the geometry simplification level. Cached hits
+    and revalidations are answered without reading the district values.
+    """
+    try:
+        zoom = int(request.query_params.get('zoom', DEFAULT_ZOOM))
+    except ValueError:
+        return Response({"error": "zoom must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+
+    document, _ = district_layer(zoom)
+    return HttpResponse(document, content_type='application/geo+json')
+
+
+@cached_response(HISTORY_CACHE_SECONDS, surrogate_keys=surrogate_keys('aqi_history'))
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def get_aqi_history(request):
+    """
+    AQI trend for a district from the hourly/daily rollups. Defaults to the
+    last 7 days; `resolution` (hour, day, month) is picked from the span
+    when not given.
+    """
+    lat = request.query_params.get('lat')
+    lon = request.query_params.get('lon')
+    city = request.query_params.get('city')
+    start = request.query_params.get('start')
+    end = request.query_params.get('end')
+    resolution = request.query_params.get('resolution')
+
+    if city in DISTRICT_GEOLOCATION_MAP:
+        district = city
+    elif lat and lon:
+        try:
+            district = district_for_point(*parse_coordinates(lat, lon))
+        except ValueError:
+            return Response({"error": "lat and lon must be valid coordinates"}, status=status.HTTP_400_BAD_REQUEST)
+        if district is None:
+            return Response({"error": "lat and lon must be within Nepal"}, status=status.HTTP_400_BAD_REQUEST)
+    else:
+        return Response({"error": "city must be a district name, or lat and lon must be given"}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        end_date = datetime.date.fromisoformat(end) if end else datetime.date.today()
+        start_date = datetime.date.fromisoformat(start) if start else end_date - datetime.timedelta(days=7)
+    except ValueError:
+        return Response({"error": "start and end must be dates in YYYY-MM-DD format"}, status=status.HTTP_400_BAD_REQUEST)
+    if start_date > end_date:
+        return Response({"error": "start must not be after end"}, status=status.HTTP_400_BAD_REQUEST)
+    if resolution and resolution not in AQI_RESOLUTIONS:
+        return Response({"error": f"resolution must be one of {', '.join(AQI_RESOLUTIONS)}"}, status=status.HTTP_400_BAD_REQUEST)
+
+    start_at = datetime.datetime.combine(start_date, datetime.time.min, tzinfo=datetime.timezone.utc)
+    end_at = datetime.datetime.combine(end_date + datetime.timedelta(days=1), datetime.time.min, tzinfo=datetime.timezone.utc)
+    resolution = resolution or choose_aqi_resolution(start_at, end_at)
+
+    return Response({
+        "district": district,
+        "start": start_date.isoformat(),
+        "end": end_date.isoformat(),
+        "resolution": resolution,
+        "history": query_aqi_history(district, start_at, end_at, resolution),
+    })
+
+
+@cached_response(PREDICTION_CACHE_SECONDS, surrogate_keys=surrogate_keys('prediction', 'weatherwave-ml'), edge_max_age=EDGE_PURGED_MAX_AGE)
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def get_prediction_accuracy(request):
+    """
+    Prediction error aggregates published by the ML pipeline. With `city`,
+    returns that district's overall, monthly and rolling 30-day metrics;
+    otherwise the nationwide figures.
+    """
+    summary = accuracy_summary.get()
+    if not summary:
+        return Response({"error": "Accuracy data not available"}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+    city = request.query_params.get('city')
+    if not city:
+        return Response({
+            "through_date": summary.get('through_date'),
+            "overall": summary.get('overall'),
+            "rolling_30d": summary.get('rolling_30d'),
+        })
+
+    accuracy = district_accuracy(city)
+    if accuracy is None:
+        return Response({"error": f"No accuracy data for district: {city}"}, status=status.HTTP_404_NOT_FOUND)
+    return Response({
+        "district": city,
+        "through_date": summary.get('through_date'),
+        "confidence": prediction_confidence(city),
+        **accuracy,
+    })
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def get_offline_bundle(request):
+    """
+    Current conditions, AQI, predictions, forecast and alerts for every
+    district in one gzip-compressed document for the PWA's offline cache.
+    Pass the `version` from the last bundle as `since` to receive only the
+    districts that changed after it.
+    """
+    since = request.query_params.get('since')
+    try:
+        since = int(since) if since else None
+    except ValueError:
+        return Response({"error": "since must be an integer version"}, status=status.HTTP_400_BAD_REQUEST)
+
+    payload = bundle_payload(since)
+    # Weak: the same ETag is served for the gzip and identity bodies
+    etag = f'W/"bundle-{payload["version"]}-{since or 0}"'
+    if etag_matches(request.headers.get('If-None-Match', ''), etag):
+        response = HttpResponse(status=304)
+    else:
+        document = dumps(payload)
+        response = HttpResponse(content_type='application/json')
+        if 'gzip' in accepted_encodings(request):
+            document = gzip.compress(document)
+            response['Content-Encoding'] = 'gzip'
+        response.content = document
+    response['ETag'] = etag
+    response['Vary'] = 'Accept-Encoding'
+    response['Cache-Control'] = 'public, max-age=60, stale-while-revalidate=300'
+    return tag_response(response, ['offline_bundle', 'snapshot', 'aqi', 'prediction', 'alerts'], EDGE_PURGED_MAX_AGE)
+
+
+def _sse(event, data, event_id=None):
+    lines = [f"id: {event_id}"] if event_id is not None else []
+    lines += [f"event: {event}", f"data: {dumps(data).decode()}"]
+    return "\n".join(lines) + "\n\n"
+
+
+async def _alert_events(request, queue, district, backlog):
+    try:
+        yield "retry: 5000\n\n"
+        if backlog is None:
+            # New client (or one too far behind to resume): current state first
+            alerts = await sync_to_async(cached_alerts)()
+            if district:
+                alerts = {district: alerts.get(district, [])}
+            yield _sse('snapshot', alerts)
+            backlog = []
+        for event in backlog:
+            if not district or event['district'] == district:
+                yield _sse(event['type'], event, event['id'])
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), ALERT_STREAM_HEARTBEAT)
+            except asyncio.TimeoutError:
+                # Comment line keeps proxies from closing an idle connection
+                yield ": keep-alive\n\n"
+                continue
+            if not district or event['district'] == district:
+                yield _sse(event['type'], event, event['id'])
+    finally:
+        alert_broadcaster.unsubscribe(queue)
+
+
+async def alerts_stream(request):
+    """
+    Server-Sent Events stream of weather alerts. Sends a `snapshot` event
+    with the current alerts per district, then `new` and `expired` events
+    as the poll_alerts command sees them. `?city=` limits the stream to one
+    district; reconnecting clients resume from Last-Event-ID. Serve it from
+    the ASGI app (weatherwave_project.asgi), where a connection costs no
+    worker thread.
+    """
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    district = request.GET.get('city')
+    if district and district not in DISTRICT_GEOLOCATION_MAP:
+        return JsonResponse({"error": f"Unknown district: {district}"}, status=400)
+
+    queue = alert_broadcaster.subscribe()
+    backlog = None
+    last_event_id = request.headers.get('Last-Event-ID')
+    if last_event_id and last_event_id.isdigit():
+        backlog = alert_broadcaster.events_since(int(last_event_id))
 
+    response = StreamingHttpResponse(_alert_events(request, queue, district, backlog), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx-style proxies from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,85 @@
+import hashlib
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.decorators import sync_and_async_middleware
+
+REPLICA_ALIAS = 'replica'
+
+# Set once the current request has written anything; its later reads then
+# stay on the primary so it never reads around its own write
+_wrote = ContextVar('db_wrote', default=False)
+# Set when the same client wrote in an earlier request that the replica
+# may not have caught up with yet
+_pinned = ContextVar('db_pinned', default=False)
+
+
+class ReplicaRouter:
+    """
+    Sends reads of the read-mostly models in DATABASE_REPLICA_MODELS to the
+    replica and everything else, including all writes and migrations, to
+    the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        if model._meta.label_lower in settings.DATABASE_REPLICA_MODELS and not (_wrote.get() or _pinned.get()):
+            return REPLICA_ALIAS
+        return None
+
+    def db_for_write(self, model, **hints):
+        _wrote.set(True)
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica mirrors the primary, so objects from either may be related
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != REPLICA_ALIAS
+
+
+def _pin_key(request):
+    # Keyed on the credentials, so API clients without cookies are pinned too
+    authorization = request.headers.get('Authorization')
+    if not authorization:
+        return None
+    return f"db_pinned:{hashlib.sha256(authorization.encode()).hexdigest()}"
+
+
+def _start(request):
+    key = _pin_key(request)
+    return key, _wrote.set(False), _pinned.set(bool(key and cache.get(key)))
+
+
+def _finish(key, wrote_token, pinned_token):
+    if key and _wrote.get():
+        cache.set(key, True, settings.DATABASE_REPLICA_STICKY_SECONDS)
+    _wrote.reset(wrote_token)
+    _pinned.reset(pinned_token)
+
+
+@sync_and_async_middleware
+def replica_stickiness_middleware(get_response):
+    """
+    Scopes the router's read-your-writes flag to a single request, and pins
+    a client's reads to the primary for DATABASE_REPLICA_STICKY_SECONDS
+    after a request of theirs wrote, so the next request (e.g. the favorites
+    list after adding one) does not read a lagging replica.
+    """
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            state = _start(request)
+            try:
+                return await get_response(request)
+            finally:
+                _finish(*state)
+    else:
+        def middleware(request):
+            state = _start(request)
+            try:
+                return get_response(request)
+            finally:
+                _finish(*state)
+    return middleware
@@ -0,0 +1,120 @@
+import datetime
+import decimal
+import math
+import uuid
+
+import numpy as np
+import orjson
+from django.utils.functional import Promise
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+from rest_framework.renderers import BaseRenderer
+
+try:
+    import msgpack
+except ImportError:  # MessagePack is opt-in; JSON works without it
+    msgpack = None
+
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def normalize(obj):
+    """
+    Plain-Python form of the values orjson and msgpack do not handle
+    natively. NaN and NaT (pandas' missing values) become None, datetimes
+    ISO 8601 strings, so JSON and MessagePack responses carry the same data.
+    """
+    if isinstance(obj, np.datetime64):
+        # .item() returns a date, datetime or int depending on the unit; go
+        # through microseconds to match orjson's native datetime64 output
+        return None if np.isnat(obj) else obj.astype('datetime64[us]').item().isoformat()
+    if isinstance(obj, np.generic):
+        obj = obj.item()
+        return None if isinstance(obj, float) and not math.isfinite(obj) else obj
+    if isinstance(obj, np.ndarray):
+        if obj.dtype.kind == 'M':
+            return [normalize(value) for value in obj]
+        return obj.tolist()
+    if isinstance(obj, (datetime.datetime, datetime.date, datetime.time)):
+        # pandas' NaT is a datetime subclass without a usable isoformat
+        return None if obj != obj else obj.isoformat()
+    if isinstance(obj, datetime.timedelta):
+        return str(obj.total_seconds())
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    if isinstance(obj, (uuid.UUID, Promise)):
+        return str(obj)
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    if hasattr(obj, '__iter__'):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not serializable")
+
+
+def dumps(data):
+    try:
+        return orjson.dumps(data, default=normalize, option=ORJSON_OPTIONS)
+    except orjson.JSONEncodeError:
+        # orjson encodes numpy datetimes itself and rejects NaT without
+        # calling `default`; convert everything up front and retry
+        return orjson.dumps(_msgpack_ready(data), default=normalize, option=ORJSON_OPTIONS)
+
+
+def _msgpack_ready(obj):
+    # msgpack only calls `default` for unknown types, so floats, tuples and
+    # datetimes are walked here to match what the JSON renderer produces
+    if isinstance(obj, dict):
+        return {key if isinstance(key, str) else str(key): _msgpack_ready(value) for key, value in obj.items()}
+    if isinstance(obj, list):
+        return [_msgpack_ready(value) for value in obj]
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if obj is None or isinstance(obj, (str, int, bytes)):
+        return obj
+    return _msgpack_ready(normalize(obj))
+
+
+class ORJSONRenderer(BaseRenderer):
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return dumps(data)
+
+
+class ORJSONParser(BaseParser):
+    media_type = 'application/json'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as e:
+            raise ParseError(f'JSON parse error - {e}')
+
+
+class MessagePackRenderer(BaseRenderer):
+    """Opt-in binary responses, picked with `Accept: application/msgpack`."""
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(_msgpack_ready(data), use_bin_type=True)
+
+
+class MessagePackParser(BaseParser):
+    media_type = 'application/msgpack'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read(), raw=False)
+        except (ValueError, msgpack.UnpackException) as e:
+            raise ParseError(f'MessagePack parse error - {e}')
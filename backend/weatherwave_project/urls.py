@@ -56,12 +56,23 @@ urlpatterns = router.urls + [
         path('current-weather/', get_current_weather, name='api-current-weather'),
         path('default-weather/', get_current_weather_default, name='api-default-weather'),
         path('aqi/', get_aqi, name='api-aqi'),
+        path('aqi/districts/', get_district_aqi, name='api-district-aqi'),
+        path('aqi/history/', get_aqi_history, name='api-aqi-history'),
         path('history/', get_weather_history, name='api-history'),
         path('forecast/', get_weather_forecast, name='api-forecast'),
+        path('forecast/hourly/', get_hourly_forecast, name='api-hourly-forecast'),
         path('alert/', get_alert, name='api-alert'),
+        path('alerts/stream/', alerts_stream, name='api-alerts-stream'),
         path('weather-news/', get_weather_news, name='api-weather-news'),
+        path('news/search/', search_weather_news, name='api-news-search'),
         path('predict-city/', predict_city, name='api-predict-city'),
         path('predict-geo/', predict_geo, name='api-predict-geo'),
+        path('predict-live/', predict_live, name='api-predict-live'),
+        path('ml-forecast/', get_ml_forecast_view, name='api-ml-forecast'),
+        path('prediction-accuracy/', get_prediction_accuracy, name='api-prediction-accuracy'),
+        path('raster/temperature/', get_temperature_raster, name='api-temperature-raster'),
+        path('districts/geojson/', get_district_layer, name='api-district-layer'),
+        path('offline-bundle/', get_offline_bundle, name='api-offline-bundle'),
 
         # Favorites app URLs (included from its own urls.py)
         # Note the empty string path; this means favorites.urls' paths
@@ -28,6 +28,10 @@ BUCKET_NAME = "ml-files"
 INPUT_FILE = "cleaned_basic.csv"
 OUTPUT_FILE = "with_target.csv"
 
+# Temp_2m this many days ahead; horizon 1 keeps its original column name
+HORIZONS = [1, 2, 3, 4, 5]
+HORIZON_TARGETS = ['Temp_2m_tomorrow'] + [f'Temp_2m_day{h}' for h in HORIZONS[1:]]
+
 def initialize_supabase() -> Optional[Client]:
     """Initialize and return Supabase client with error handling"""
     try:
@@ -50,7 +54,7 @@ def validate_dataframe(df: pd.DataFrame) -> Tuple[bool, str]:
     return True, ""
 
 def add_target_column(df: pd.DataFrame) -> pd.DataFrame:
-    """Add Temp_2m_tomorrow target column by shifting Temp_2m within District groups"""
+    """Add one target column per forecast horizon by shifting Temp_2m within District groups"""
     try:
         # Ensure 'Date' is datetime
         df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
@@ -61,10 +65,17 @@ def add_target_column(df: pd.DataFrame) -> pd.DataFrame:
         # Sort by District and Date for correct shifting
         df = df.sort_values(by=['District', 'Date']).reset_index(drop=True)
 
-        # Create target column by shifting Temp_2m within each District
-        df['Temp_2m_tomorrow'] = df.groupby('District')['Temp_2m'].shift(-1)
-
-        # Drop rows where Temp_2m_tomorrow is NaN
+        # Create one target column per horizon by shifting Temp_2m within
+        # each District. A shifted value only counts if it really is h days
+        # later, so gaps in the record never leak a wrong day into a target
+        grouped = df.groupby('District')
+        for horizon, target in zip(HORIZONS, HORIZON_TARGETS):
+            later_date = grouped['Date'].shift(-horizon)
+            same_gap = (later_date - df['Date']) == pd.Timedelta(days=horizon)
+            df[target] = grouped['Temp_2m'].shift(-horizon).where(same_gap)
+
+        # Drop rows where Temp_2m_tomorrow is NaN; later horizons may stay
+        # missing near the end of the record and are handled by training
         initial_rows = df.shape[0]
         df = df.dropna(subset=['Temp_2m_tomorrow'])
         rows_dropped = initial_rows - df.shape[0]
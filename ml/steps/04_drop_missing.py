@@ -28,6 +28,10 @@ BUCKET_NAME = "ml-files"
 INPUT_FILE = "with_target.csv"
 OUTPUT_FILE = "no_missing.csv"
 
+# Targets for horizons 2-5 (see 03_add_target_column.py) are missing for
+# the last days of every district; those rows are still usable
+OPTIONAL_COLUMNS = ['Temp_2m_day2', 'Temp_2m_day3', 'Temp_2m_day4', 'Temp_2m_day5']
+
 def initialize_supabase() -> Optional[Client]:
     """Initialize and return Supabase client with error handling"""
     try:
@@ -60,7 +64,7 @@ def validate_dataframe(df: pd.DataFrame) -> Tuple[bool, str]:
     return True, ""
 
 def drop_missing_values(df: pd.DataFrame) -> pd.DataFrame:
-    """Drop rows with any missing values"""
+    """Drop rows with any missing values outside OPTIONAL_COLUMNS"""
     try:
         # Ensure 'Date' is datetime
         df['Date'] = pd.to_datetime(df['Date'], format='%Y-%m-%d', errors='coerce')
@@ -71,7 +75,7 @@ def drop_missing_values(df: pd.DataFrame) -> pd.DataFrame:
 
         # Drop rows with any missing values
         initial_rows = len(df)
-        df = df.dropna()
+        df = df.dropna(subset=[col for col in df.columns if col not in OPTIONAL_COLUMNS])
         rows_dropped = initial_rows - len(df)
         if rows_dropped > 0:
             logger.info(f"Dropped {rows_dropped} rows with missing values.")
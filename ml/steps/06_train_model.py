@@ -1,5 +1,6 @@
 import pandas as pd
 import io
+import hashlib
 from supabase import create_client, Client
 import logging
 import sys
@@ -13,6 +14,8 @@ import json
 import base64
 from googleapiclient.errors import HttpError
 
+from flat_forest import FlatForest
+
 # Google Drive API imports for service account
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
@@ -31,7 +34,11 @@ SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 BUCKET_NAME = "ml-files"
 INPUT_FILE = "encoded_districts.csv"
+# Flattened copy of the model the backend loads for online inference
+MODEL_FILE = "weather_model.npz"
 TARGET_COLUMN = "Temp_2m_tomorrow"
+# One output per forecast horizon (day+1 .. day+5), see 03_add_target_column.py
+TARGET_COLUMNS = [TARGET_COLUMN, "Temp_2m_day2", "Temp_2m_day3", "Temp_2m_day4", "Temp_2m_day5"]
 TEST_SIZE = 0.2
 RANDOM_STATE = 42
 
@@ -102,13 +109,18 @@ def train_model(df: pd.DataFrame) -> Tuple[Optional[RandomForestRegressor], floa
         df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
         df.dropna(subset=['Date'], inplace=True)
 
-        excluded = ['Date', 'District', TARGET_COLUMN, 'Unnamed: 0']
+        excluded = ['Date', 'District', 'Unnamed: 0'] + TARGET_COLUMNS
         features = [c for c in df.columns if c not in excluded]
         if 'District_encoded' in df.columns and 'District_encoded' not in features:
             features.append('District_encoded')
 
+        # A single multi-output forest learns every horizon in one fit; it
+        # needs rows where all horizons are known
+        targets = [c for c in TARGET_COLUMNS if c in df.columns]
+        df = df.dropna(subset=targets)
+
         X = df[features].astype('float32')
-        y = df[TARGET_COLUMN].astype('float32')
+        y = df[targets].astype('float32')
 
         X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=TEST_SIZE, random_state=RANDOM_STATE)
 
@@ -119,6 +131,9 @@ def train_model(df: pd.DataFrame) -> Tuple[Optional[RandomForestRegressor], floa
         mae = mean_absolute_error(y_test, y_pred)
         r2 = r2_score(y_test, y_pred)
 
+        horizon_mae = mean_absolute_error(y_test, y_pred, multioutput='raw_values')
+        for target, target_mae in zip(targets, horizon_mae):
+            logger.info(f"  {target}: MAE {target_mae:.2f}")
         logger.info(f"Model Evaluation - MAE: {mae:.2f}, R2: {r2:.2f}")
         return model, mae, r2
     except Exception as e:
@@ -171,6 +186,41 @@ def upload_model_to_drive_service_account(model) -> bool:
         logger.error(f"Drive upload failed: {str(e)}")
         return False
 
+def upload_model_to_supabase(supabase: Client, model, df: pd.DataFrame, training_data_digest: str) -> bool:
+    """
+    Upload the model as flat arrays (see flat_forest.py) with its district
+    encoding and the SHA-256 of the training file, which 07_predict.py
+    checks so it never predicts with a model left over from an earlier run
+    """
+    try:
+        districts = df[['District', 'District_encoded']].drop_duplicates()
+        flat_model = FlatForest.from_sklearn(model, metadata={
+            'district_names': districts['District'].astype(str).to_numpy(),
+            'district_codes': districts['District_encoded'].astype('int32').to_numpy(),
+            'training_data_sha256': training_data_digest,
+        })
+        model_bytes = flat_model.to_npz()
+
+        # Remove existing file if it exists
+        try:
+            files = supabase.storage.from_(BUCKET_NAME).list()
+            if any(f['name'] == MODEL_FILE for f in files):
+                supabase.storage.from_(BUCKET_NAME).remove([MODEL_FILE])
+                logger.info(f"Removed existing file: {MODEL_FILE}")
+        except Exception as e:
+            logger.warning(f"Error removing existing file (might not exist): {e}")
+
+        supabase.storage.from_(BUCKET_NAME).upload(
+            MODEL_FILE,
+            model_bytes,
+            {"content-type": "application/octet-stream"}
+        )
+        logger.info(f"Model uploaded to Supabase: {MODEL_FILE}")
+        return True
+    except Exception as e:
+        logger.error(f"Supabase model upload failed: {str(e)}")
+        return False
+
 def main():
     logger.info("Starting model training and upload process.")
 
@@ -196,6 +246,7 @@ def main():
         logger.info(f"Downloading {INPUT_FILE} from Supabase")
         response = supabase.storage.from_(BUCKET_NAME).download(INPUT_FILE)
         df = pd.read_csv(io.BytesIO(response))
+        training_data_digest = hashlib.sha256(response).hexdigest()
         logger.info(f"Loaded data with shape: {df.shape}")
 
         is_valid, msg = validate_dataframe(df)
@@ -211,6 +262,11 @@ def main():
 
         logger.info("Starting model upload to Google Drive")
         success = upload_model_to_drive_service_account(model)
+
+        # The backend serves online predictions from the Supabase copy
+        if not upload_model_to_supabase(supabase, model, df, training_data_digest):
+            logger.warning("Online inference will keep using the previous model.")
+
         if success:
             logger.info("Process completed successfully.")
         else:
@@ -1,5 +1,6 @@
 import pandas as pd
 import io
+import hashlib
 from supabase import create_client, Client
 import logging
 import sys
@@ -15,6 +16,8 @@ from google.oauth2 import service_account
 from googleapiclient.discovery import build
 from googleapiclient.http import MediaIoBaseDownload
 
+from flat_forest import FlatForest
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -29,7 +32,11 @@ SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 BUCKET_NAME = "ml-files"
 INPUT_FILE = "encoded_districts.csv"
 OUTPUT_FILE = "predictions.csv"
+# Latest day+1..day+5 forecast per district, served by the backend
+HORIZONS_FILE = "forecast_horizons.json"
+PREDICTION_COLUMNS = ['predicted_Temp_2m_tomorrow'] + [f'predicted_Temp_2m_day{h}' for h in range(2, 6)]
 LABEL_ENCODER_PATH = "label_encoder.pkl"
+FLAT_MODEL_FILE = "weather_model.npz"
 
 MODEL_FEATURES = [
     'Latitude', 'Longitude', 'Precip', 'Pressure', 'Humidity_2m', 'RH_2m',
@@ -131,9 +138,15 @@ def make_predictions(df: pd.DataFrame, model, label_encoder: LabelEncoder) -> pd
             return pd.DataFrame()
 
         X = df[MODEL_FEATURES].astype('float32')
-        predictions = model.predict(X)
-        df['predicted_Temp_2m_tomorrow'] = predictions
-        logger.info(f"Batch predictions completed for {len(df)} samples")
+        if len(getattr(model, 'feature_names_in_', [])):
+            # The flat model has no column-name check, so order columns as trained
+            X = X[list(model.feature_names_in_)]
+        # Every district, date and horizon in one call; single-output
+        # models from before the multi-horizon change give one column
+        predictions = model.predict(X).reshape(len(X), -1)
+        for column, values in zip(PREDICTION_COLUMNS, predictions.T):
+            df[column] = values
+        logger.info(f"Batch predictions completed for {len(df)} samples, {predictions.shape[1]} horizon(s)")
 
         # Show latest Kathmandu prediction (encoded value = 35)
         kathmandu_encoded_val = 35
@@ -161,6 +174,26 @@ def make_predictions(df: pd.DataFrame, model, label_encoder: LabelEncoder) -> pd
         logger.error(f"Error making predictions: {str(e)}")
         return pd.DataFrame()
 
+def build_horizon_forecasts(df: pd.DataFrame) -> dict:
+    """Latest row per district turned into dated day+1..day+5 forecasts"""
+    columns = [col for col in PREDICTION_COLUMNS if col in df.columns]
+    latest = df.sort_values('Date').groupby('District').tail(1)
+    forecasts = {}
+    for row in latest[['District', 'Date'] + columns].itertuples(index=False):
+        base_date = row.Date
+        forecasts[row.District] = {
+            "base_date": base_date.strftime('%Y-%m-%d'),
+            "forecast": [
+                {
+                    "horizon": horizon,
+                    "date": (base_date + pd.Timedelta(days=horizon)).strftime('%Y-%m-%d'),
+                    "predicted_temp": round(float(value), 2),
+                }
+                for horizon, value in enumerate(row[2:], start=1)
+            ],
+        }
+    return {"generated_at": pd.Timestamp.now(tz='UTC').isoformat(), "districts": forecasts}
+
 def upload_to_supabase(supabase: Client, data: bytes, output_file: str, content_type: str) -> bool:
     try:
         try:
@@ -179,6 +212,23 @@ def upload_to_supabase(supabase: Client, data: bytes, output_file: str, content_
         logger.error(f"Upload error for {output_file}: {str(e)}")
         return False
 
+def load_flat_model(supabase: Client, training_data_digest: str) -> Optional[FlatForest]:
+    """
+    Flattened model written by 06_train_model.py, or None if unavailable or
+    not trained on the current input file (its upload in this run failed)
+    """
+    try:
+        response = supabase.storage.from_(BUCKET_NAME).download(FLAT_MODEL_FILE)
+        model = FlatForest.from_npz(response)
+        if str(model.metadata.get('training_data_sha256', '')) != training_data_digest:
+            logger.warning(f"{FLAT_MODEL_FILE} was not trained on the current {INPUT_FILE}, falling back to Google Drive")
+            return None
+        logger.info(f"Loaded flat model from Supabase: {FLAT_MODEL_FILE} ({model.n_trees} trees)")
+        return model
+    except Exception as e:
+        logger.warning(f"Flat model not available, falling back to Google Drive: {str(e)}")
+        return None
+
 def download_model_from_drive() -> Optional[io.BytesIO]:
     try:
         service = get_drive_service()
@@ -226,16 +276,27 @@ def predict_weather() -> bool:
         return False
 
     try:
-        # Download model file from Google Drive
-        logger.info("Downloading model from Google Drive")
-        model_file_bytes = download_model_from_drive()
-        if model_file_bytes is None:
-            logger.error("Failed to download model file from Google Drive.")
+        # Load input data
+        logger.info(f"Downloading {INPUT_FILE} from Supabase")
+        response = supabase.storage.from_(BUCKET_NAME).download(INPUT_FILE)
+        if not response:
+            logger.error(f"Could not fetch {INPUT_FILE} from Supabase bucket")
             return False
 
-        # Load model from in-memory bytes buffer
-        model = joblib.load(model_file_bytes)
-        logger.info("Model loaded successfully from Google Drive.")
+        # The flat model predicts identically to the pickled forest but
+        # evaluates every tree in one vectorized pass
+        model = load_flat_model(supabase, hashlib.sha256(response).hexdigest())
+        if model is None:
+            # Download model file from Google Drive
+            logger.info("Downloading model from Google Drive")
+            model_file_bytes = download_model_from_drive()
+            if model_file_bytes is None:
+                logger.error("Failed to download model file from Google Drive.")
+                return False
+
+            # Load model from in-memory bytes buffer
+            model = joblib.load(model_file_bytes)
+            logger.info("Model loaded successfully from Google Drive.")
 
         # Load label encoder
         logger.info("Loading label encoder from Supabase")
@@ -244,13 +305,6 @@ def predict_weather() -> bool:
             logger.error("Failed to load label encoder")
             return False
 
-        # Load input data
-        logger.info(f"Downloading {INPUT_FILE} from Supabase")
-        response = supabase.storage.from_(BUCKET_NAME).download(INPUT_FILE)
-        if not response:
-            logger.error(f"Could not fetch {INPUT_FILE} from Supabase bucket")
-            return False
-
         df = pd.read_csv(io.BytesIO(response))
         logger.info(f"Loaded data from Supabase: {INPUT_FILE}")
         logger.info(f"Data shape: {df.shape}")
@@ -277,6 +331,10 @@ def predict_weather() -> bool:
         success = upload_to_supabase(supabase, csv_bytes, OUTPUT_FILE, "text/csv")
         if success:
             logger.info(f"Predictions successfully saved to {OUTPUT_FILE}")
+
+        horizons = build_horizon_forecasts(df_pred)
+        horizons_bytes = json.dumps(horizons, separators=(',', ':')).encode("utf-8")
+        success = upload_to_supabase(supabase, horizons_bytes, HORIZONS_FILE, "application/json") and success
         return success
 
     except Exception as e:
@@ -0,0 +1,187 @@
+import pandas as pd
+import numpy as np
+import io
+from supabase import create_client, Client
+import logging
+import sys
+from typing import Optional, Tuple
+import os
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+logger = logging.getLogger(__name__)
+
+# Supabase credentials
+SUPABASE_URL = os.getenv("SUPABASE_URL")
+SUPABASE_KEY = os.getenv("SUPABASE_KEY")
+BUCKET_NAME = "ml-files"
+INPUT_FILE = "raw_data_interpolated.csv"
+OUTPUT_FILE = "climate_normals.csv"
+
+# Output variable -> candidate column names in the interpolated dataset
+NORMAL_VARIABLES = {
+    'temp': ['Temp_2m', 'Temp'],
+    'precip': ['Precip'],
+    'humidity': ['RH_2m', 'RelativeHumidity'],
+}
+PERCENTILES = [0.1, 0.5, 0.9]
+# Each day-of-year normal pools observations from +/- this many days so
+# ~15 years of data gives a stable estimate instead of 15 noisy samples
+WINDOW_DAYS = 7
+DAYS_IN_YEAR = 366
+
+def initialize_supabase() -> Optional[Client]:
+    """Initialize and return Supabase client with error handling"""
+    try:
+        return create_client(SUPABASE_URL, SUPABASE_KEY)
+    except Exception as e:
+        logger.error(f"Failed to initialize Supabase client: {str(e)}")
+        return None
+
+def resolve_columns(df: pd.DataFrame) -> dict:
+    """Map each normal variable to the column that holds it in this dataset"""
+    resolved = {}
+    for name, candidates in NORMAL_VARIABLES.items():
+        for col in candidates:
+            if col in df.columns:
+                resolved[name] = col
+                break
+    return resolved
+
+def validate_dataframe(df: pd.DataFrame) -> Tuple[bool, str]:
+    """Validate DataFrame structure and required columns"""
+    required_columns = ['Date', 'District']
+    missing_columns = [col for col in required_columns if col not in df.columns]
+
+    if missing_columns:
+        return False, f"Missing required columns: {', '.join(missing_columns)}"
+
+    missing_variables = [name for name in NORMAL_VARIABLES if name not in resolve_columns(df)]
+    if missing_variables:
+        return False, f"No column found for variables: {', '.join(missing_variables)}"
+
+    if df.empty:
+        return False, "DataFrame is empty"
+
+    return True, ""
+
+def day_of_year(dates: pd.Series) -> np.ndarray:
+    """Day of year on a fixed 366-day calendar, so March 1st is day 61 in every year"""
+    doy = dates.dt.dayofyear.to_numpy()
+    shift = (~dates.dt.is_leap_year.to_numpy()) & (dates.dt.month.to_numpy() > 2)
+    return doy + shift
+
+def compute_normals(df: pd.DataFrame) -> pd.DataFrame:
+    """Mean, stddev and percentiles per District and day-of-year"""
+    try:
+        columns = resolve_columns(df)
+        df['Date'] = pd.to_datetime(df['Date'].astype(str), format='%Y%m%d', errors='coerce')
+        df = df.dropna(subset=['Date'])
+
+        base = pd.DataFrame({'District': df['District'].to_numpy(), 'DayOfYear': day_of_year(df['Date'])})
+        for name, col in columns.items():
+            base[name] = pd.to_numeric(df[col], errors='coerce').to_numpy()
+
+        # Replicate every row into the neighbouring days of its window in one
+        # vectorized pass, then let a single groupby do the aggregation
+        offsets = np.arange(-WINDOW_DAYS, WINDOW_DAYS + 1)
+        windowed = base.loc[base.index.repeat(len(offsets))].reset_index(drop=True)
+        windowed['DayOfYear'] = (windowed['DayOfYear'].to_numpy() - 1 + np.tile(offsets, len(base))) % DAYS_IN_YEAR + 1
+
+        grouped = windowed.groupby(['District', 'DayOfYear'])[list(columns)]
+        stats = grouped.agg(['mean', 'std'])
+        stats.columns = [f"{name}_{stat}" for name, stat in stats.columns]
+
+        quantiles = grouped.quantile(PERCENTILES).unstack()
+        quantiles.columns = [f"{name}_p{int(q * 100)}" for name, q in quantiles.columns]
+
+        normals = stats.join(quantiles).round(2).reset_index()
+        logger.info(f"Computed normals for {normals['District'].nunique()} districts, {len(normals)} rows")
+        return normals
+    except Exception as e:
+        logger.error(f"Normals computation error: {str(e)}")
+        return pd.DataFrame()
+
+def upload_to_supabase(supabase: Client, df: pd.DataFrame, output_file: str) -> bool:
+    """Upload DataFrame to Supabase storage"""
+    try:
+        csv_buffer = io.StringIO()
+        df.to_csv(csv_buffer, index=False)
+        csv_bytes = csv_buffer.getvalue().encode("utf-8")
+
+        # Remove existing file if it exists
+        try:
+            files = supabase.storage.from_(BUCKET_NAME).list()
+            if any(file['name'] == output_file for file in files):
+                supabase.storage.from_(BUCKET_NAME).remove([output_file])
+                logger.info(f"Removed existing file: {output_file}")
+        except Exception as e:
+             # Handle API errors, e.g., file not found
+             logger.warning(f"Error removing existing file (might not exist): {e}")
+
+        # Upload file
+        supabase.storage.from_(BUCKET_NAME).upload(
+            output_file,
+            csv_bytes,
+            {"content-type": "text/csv"}
+        )
+        logger.info(f"Successfully uploaded climate normals to: {output_file}")
+        return True
+    except Exception as e:
+        logger.error(f"Upload error: {str(e)}")
+        return False
+
+def compute_normals_data() -> bool:
+    """Main function to compute climatological normals and upload to Supabase"""
+    logger.info("Starting climatological normals computation")
+
+    # Initialize Supabase client
+    supabase = initialize_supabase()
+    if not supabase:
+        return False
+
+    try:
+        # Fetch CSV from Supabase
+        response = supabase.storage.from_(BUCKET_NAME).download(INPUT_FILE)
+        if not response:
+            logger.error(f"Could not fetch {INPUT_FILE} from Supabase bucket")
+            return False
+
+        # Read and validate DataFrame
+        df = pd.read_csv(io.BytesIO(response))
+        logger.info(f"Loaded data from Supabase: {INPUT_FILE}")
+        logger.info(f"Initial shape: {df.shape}")
+
+        is_valid, validation_message = validate_dataframe(df)
+        if not is_valid:
+            logger.error(validation_message)
+            return False
+
+        normals = compute_normals(df)
+        if normals.empty:
+            logger.error("No normals computed")
+            return False
+
+        logger.info(f"Normals columns: {normals.columns.tolist()}")
+
+        # Upload to Supabase
+        return upload_to_supabase(supabase, normals, OUTPUT_FILE)
+
+    except Exception as e:
+        logger.error(f"Unexpected error: {str(e)}", exc_info=True)
+        return False
+    finally:
+        logger.info("Finished climatological normals computation")
+
+if __name__ == "__main__":
+    success = compute_normals_data()
+    if success:
+        logger.info("Script completed successfully!")
+    else:
+        logger.error("Script failed!")
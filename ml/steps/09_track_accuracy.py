@@ -0,0 +1,226 @@
+import pandas as pd
+import numpy as np
+import io
+import json
+from supabase import create_client, Client
+import logging
+import sys
+from typing import Optional, Tuple
+import os
+from datetime import datetime, timezone
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+logger = logging.getLogger(__name__)
+
+# Supabase credentials
+SUPABASE_URL = os.getenv("SUPABASE_URL")
+SUPABASE_KEY = os.getenv("SUPABASE_KEY")
+BUCKET_NAME = "ml-files"
+INPUT_FILE = "predictions.csv"
+STATE_FILE = "accuracy_state.json"
+OUTPUT_FILE = "accuracy_summary.json"
+
+ACTUAL_COLUMN = 'Temp_2m_tomorrow'
+PREDICTED_COLUMN = 'predicted_Temp_2m_tomorrow'
+ROLLING_DAYS = 30
+# Months kept in the published summary; the state keeps every month
+SUMMARY_MONTHS = 24
+
+def initialize_supabase() -> Optional[Client]:
+    """Initialize and return Supabase client with error handling"""
+    try:
+        return create_client(SUPABASE_URL, SUPABASE_KEY)
+    except Exception as e:
+        logger.error(f"Failed to initialize Supabase client: {str(e)}")
+        return None
+
+def validate_dataframe(df: pd.DataFrame) -> Tuple[bool, str]:
+    """Validate DataFrame structure and required columns"""
+    required_columns = ['Date', 'District', ACTUAL_COLUMN, PREDICTED_COLUMN]
+    missing_columns = [col for col in required_columns if col not in df.columns]
+
+    if missing_columns:
+        return False, f"Missing required columns: {', '.join(missing_columns)}"
+
+    if df.empty:
+        return False, "DataFrame is empty"
+
+    return True, ""
+
+def load_state(supabase: Client) -> dict:
+    """Previous run's running sums, or an empty state on the first run"""
+    try:
+        response = supabase.storage.from_(BUCKET_NAME).download(STATE_FILE)
+        state = json.loads(response)
+        logger.info(f"Loaded accuracy state through {state.get('last_date')}")
+        return state
+    except Exception as e:
+        logger.warning(f"No previous accuracy state ({e}), starting from scratch")
+        return {"last_date": None, "monthly": {}, "daily": {}}
+
+def bucket_sums(df: pd.DataFrame, key: str) -> pd.DataFrame:
+    """Error sums per District and `key` column in one groupby"""
+    sums = df.groupby(['District', key]).agg(
+        n=('error', 'size'),
+        err=('error', 'sum'),
+        abs_err=('abs_error', 'sum'),
+        sq_err=('sq_error', 'sum'),
+    )
+    return sums.reset_index()
+
+def merge_sums(target: dict, sums: pd.DataFrame, key: str) -> None:
+    """
+    Add new bucket sums into the nested {district: {bucket: sums}} state,
+    where sums is [count, sum(error), sum(|error|), sum(error^2)]
+    """
+    for row in sums.itertuples(index=False):
+        buckets = target.setdefault(row.District, {})
+        current = buckets.get(getattr(row, key), [0, 0.0, 0.0, 0.0])
+        buckets[getattr(row, key)] = [
+            current[0] + int(row.n),
+            current[1] + float(row.err),
+            current[2] + float(row.abs_err),
+            current[3] + float(row.sq_err),
+        ]
+
+def update_state(state: dict, df: pd.DataFrame) -> int:
+    """Fold only the dates newer than the last run into the running sums"""
+    df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
+    df = df.dropna(subset=['Date', ACTUAL_COLUMN, PREDICTED_COLUMN])
+    if state['last_date']:
+        df = df[df['Date'] > pd.Timestamp(state['last_date'])]
+    if df.empty:
+        return 0
+
+    df = df[['Date', 'District']].assign(error=(df[PREDICTED_COLUMN] - df[ACTUAL_COLUMN]).astype('float64'))
+    df['abs_error'] = df['error'].abs()
+    df['sq_error'] = df['error'] ** 2
+    df['Month'] = df['Date'].dt.strftime('%Y-%m')
+    df['Day'] = df['Date'].dt.strftime('%Y-%m-%d')
+
+    merge_sums(state['monthly'], bucket_sums(df, 'Month'), 'Month')
+    merge_sums(state['daily'], bucket_sums(df, 'Day'), 'Day')
+
+    last_date = df['Date'].max()
+    state['last_date'] = last_date.strftime('%Y-%m-%d')
+
+    # Daily sums only back the rolling window, so drop the ones outside it
+    cutoff = (last_date - pd.Timedelta(days=ROLLING_DAYS - 1)).strftime('%Y-%m-%d')
+    for district, days in state['daily'].items():
+        state['daily'][district] = {day: sums for day, sums in days.items() if day >= cutoff}
+    return len(df)
+
+def metrics(sums) -> dict:
+    n, err, abs_err, sq_err = np.sum(np.asarray(sums, dtype=np.float64).reshape(-1, 4), axis=0)
+    if n == 0:
+        return {"n": 0, "mae": None, "bias": None, "rmse": None}
+    return {
+        "n": int(n),
+        "mae": round(float(abs_err / n), 3),
+        "bias": round(float(err / n), 3),
+        "rmse": round(float(np.sqrt(sq_err / n)), 3),
+    }
+
+def build_summary(state: dict) -> dict:
+    """Turn running sums into the small artifact the backend serves"""
+    districts = {}
+    for district, months in state['monthly'].items():
+        recent_months = sorted(months)[-SUMMARY_MONTHS:]
+        districts[district] = {
+            "overall": metrics(list(months.values())),
+            "rolling_30d": metrics(list(state['daily'].get(district, {}).values())),
+            "monthly": {month: metrics(months[month]) for month in recent_months},
+        }
+    all_months = [sums for months in state['monthly'].values() for sums in months.values()]
+    all_days = [sums for days in state['daily'].values() for sums in days.values()]
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "through_date": state['last_date'],
+        "rolling_days": ROLLING_DAYS,
+        "overall": metrics(all_months),
+        "rolling_30d": metrics(all_days),
+        "districts": districts,
+    }
+
+def upload_to_supabase(supabase: Client, payload: dict, output_file: str) -> bool:
+    """Upload a JSON document to Supabase storage"""
+    try:
+        json_bytes = json.dumps(payload, separators=(',', ':')).encode("utf-8")
+
+        # Remove existing file if it exists
+        try:
+            files = supabase.storage.from_(BUCKET_NAME).list()
+            if any(file['name'] == output_file for file in files):
+                supabase.storage.from_(BUCKET_NAME).remove([output_file])
+                logger.info(f"Removed existing file: {output_file}")
+        except Exception as e:
+             # Handle API errors, e.g., file not found
+             logger.warning(f"Error removing existing file (might not exist): {e}")
+
+        # Upload file
+        supabase.storage.from_(BUCKET_NAME).upload(
+            output_file,
+            json_bytes,
+            {"content-type": "application/json"}
+        )
+        logger.info(f"Successfully uploaded: {output_file}")
+        return True
+    except Exception as e:
+        logger.error(f"Upload error: {str(e)}")
+        return False
+
+def track_accuracy() -> bool:
+    """Main function to update prediction accuracy aggregates and upload them"""
+    logger.info("Starting prediction accuracy tracking")
+
+    # Initialize Supabase client
+    supabase = initialize_supabase()
+    if not supabase:
+        return False
+
+    try:
+        # Fetch CSV from Supabase
+        response = supabase.storage.from_(BUCKET_NAME).download(INPUT_FILE)
+        if not response:
+            logger.error(f"Could not fetch {INPUT_FILE} from Supabase bucket")
+            return False
+
+        # Read and validate DataFrame
+        df = pd.read_csv(io.BytesIO(response), usecols=lambda c: c in ('Date', 'District', ACTUAL_COLUMN, PREDICTED_COLUMN))
+        logger.info(f"Loaded data from Supabase: {INPUT_FILE}")
+        logger.info(f"Initial shape: {df.shape}")
+
+        is_valid, validation_message = validate_dataframe(df)
+        if not is_valid:
+            logger.error(validation_message)
+            return False
+
+        state = load_state(supabase)
+        added = update_state(state, df)
+        logger.info(f"Folded {added} new prediction/actual pairs into the aggregates")
+
+        summary = build_summary(state)
+        logger.info(f"Overall: {summary['overall']}, rolling {ROLLING_DAYS}d: {summary['rolling_30d']}")
+
+        # Upload the state first so a failed summary upload never double counts
+        return upload_to_supabase(supabase, state, STATE_FILE) and upload_to_supabase(supabase, summary, OUTPUT_FILE)
+
+    except Exception as e:
+        logger.error(f"Unexpected error: {str(e)}", exc_info=True)
+        return False
+    finally:
+        logger.info("Finished prediction accuracy tracking")
+
+if __name__ == "__main__":
+    success = track_accuracy()
+    if success:
+        logger.info("Script completed successfully!")
+    else:
+        logger.error("Script failed!")
@@ -0,0 +1,125 @@
+"""
+Flattened-array form of a fitted RandomForestRegressor.
+
+Every tree's nodes are concatenated into a handful of contiguous NumPy
+arrays, so a forest can be saved as a small .npz and evaluated for a whole
+batch with no scikit-learn import. The backend keeps an identical copy in
+backend/forecast/flat_forest.py; keep the two in sync.
+"""
+import io
+
+import numpy as np
+
+LEAF = -1
+
+
+class FlatForest:
+    def __init__(self, feature, threshold, left, right, value, missing_left, roots,
+                 feature_names, metadata=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.missing_left = missing_left
+        self.roots = roots
+        self.feature_names_in_ = np.asarray(feature_names, dtype=object)
+        # Extra arrays stored alongside the trees (e.g. district names)
+        self.metadata = metadata or {}
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def n_outputs(self):
+        return self.value.shape[1]
+
+    @classmethod
+    def from_sklearn(cls, model, metadata=None):
+        """Flatten a fitted RandomForestRegressor (or a single DecisionTreeRegressor)."""
+        estimators = getattr(model, 'estimators_', [model])
+        features, thresholds, lefts, rights, values, missing, roots = [], [], [], [], [], [], []
+        offset = 0
+        for estimator in estimators:
+            tree = estimator.tree_
+            is_leaf = tree.children_left == LEAF
+            roots.append(offset)
+            features.append(np.where(is_leaf, 0, tree.feature).astype(np.int32))
+            thresholds.append(tree.threshold.astype(np.float64))
+            # Child indices become positions in the concatenated arrays
+            lefts.append(np.where(is_leaf, LEAF, tree.children_left + offset).astype(np.int32))
+            rights.append(np.where(is_leaf, LEAF, tree.children_right + offset).astype(np.int32))
+            values.append(tree.value[:, :, 0].astype(np.float64))
+            missing_left = getattr(tree, 'missing_go_to_left', None)
+            missing.append(np.zeros(tree.node_count, dtype=bool) if missing_left is None else missing_left.astype(bool))
+            offset += tree.node_count
+        return cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            left=np.concatenate(lefts),
+            right=np.concatenate(rights),
+            value=np.concatenate(values),
+            missing_left=np.concatenate(missing),
+            roots=np.array(roots, dtype=np.int32),
+            feature_names=getattr(model, 'feature_names_in_', []),
+            metadata=metadata,
+        )
+
+    def to_npz(self):
+        buffer = io.BytesIO()
+        np.savez_compressed(
+            buffer,
+            feature=self.feature, threshold=self.threshold, left=self.left, right=self.right,
+            value=self.value, missing_left=self.missing_left, roots=self.roots,
+            feature_names=np.asarray(self.feature_names_in_, dtype=str),
+            **{f"meta_{key}": np.asarray(array) for key, array in self.metadata.items()},
+        )
+        return buffer.getvalue()
+
+    @classmethod
+    def from_npz(cls, file_bytes):
+        with np.load(io.BytesIO(file_bytes), allow_pickle=False) as data:
+            return cls(
+                feature=data['feature'], threshold=data['threshold'], left=data['left'],
+                right=data['right'], value=data['value'], missing_left=data['missing_left'],
+                roots=data['roots'],
+                feature_names=data['feature_names'].tolist(),
+                metadata={key[5:]: data[key] for key in data.files if key.startswith('meta_')},
+            )
+
+    def apply(self, X):
+        """Leaf index reached in every tree: (n_samples, n_trees)."""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n_samples, n_features = X.shape
+        flat_X = X.ravel()
+        # One cursor per (sample, tree), advanced a level at a time. Only the
+        # cursors still on an internal node are touched in each pass.
+        node = np.tile(self.roots, n_samples)
+        row_start = np.repeat(np.arange(n_samples, dtype=np.int64) * n_features, self.n_trees)
+        active = np.flatnonzero(self.left[node] != LEAF)
+        while active.size:
+            current = node[active]
+            x = flat_X[row_start[active] + self.feature[current]]
+            # float32 input against float64 threshold, exactly as sklearn compares
+            go_left = x <= self.threshold[current]
+            missing = np.isnan(x)
+            if missing.any():
+                go_left = np.where(missing, self.missing_left[current], go_left)
+            current = np.where(go_left, self.left[current], self.right[current])
+            node[active] = current
+            active = active[self.left[current] != LEAF]
+        return node.reshape(n_samples, self.n_trees)
+
+    def predict(self, X):
+        """
+        Mean of the tree outputs. Trees are summed one after another in
+        float64 and then divided by the tree count, the same order of
+        operations as RandomForestRegressor.predict, so results match it
+        bit for bit.
+        """
+        leaf_values = self.value[self.apply(X)]  # (n_samples, n_trees, n_outputs)
+        # cumsum accumulates strictly in tree order (np.sum would not)
+        total = np.cumsum(leaf_values, axis=1)[:, -1, :]
+        prediction = total / self.n_trees
+        return prediction[:, 0] if self.n_outputs == 1 else prediction